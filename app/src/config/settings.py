@@ -25,6 +25,20 @@ class LLMProvider(str, Enum):
 
     OPENAI = "openai"    # Any OpenAI-compatible API (Ollama, LM Studio, vLLM, OpenAI)
     BEDROCK = "bedrock"  # AWS Bedrock
+    FAKE = "fake"        # Deterministic local stand-in (offline runs, benchmarks)
+
+class RerankerType(str, Enum):
+    """Re-ranker applied to over-fetched retrieval candidates."""
+
+    NONE = "none"
+    LEXICAL = "lexical"              # Query term overlap, no model
+    CROSS_ENCODER = "cross_encoder"  # Local sentence-transformers cross-encoder (CPU)
+
+class LLMTier(str, Enum):
+    """LLM model tier a call is routed to."""
+
+    FAST = "fast"      # Routing / classification (invoke_structured)
+    STRONG = "strong"  # Answer synthesis and the agent
 
 class Settings(BaseSettings):
     '''Application settings'''
@@ -44,6 +58,23 @@ class Settings(BaseSettings):
     llm_api_key: str = ""  # Local models don't need this
     llm_temperature: float = 0.1
     llm_max_tokens: int = 1000
+    llm_fast_model: str = ""  # Fast tier for routing / classification ("" = use llm_model)
+    llm_fast_temperature: float = 0.0
+    llm_fast_max_tokens: int = 64
+    llm_fake_latency_seconds: float = 0.5  # Fake provider: delay before the first token
+    llm_fake_tokens_per_second: float = 50.0
+    llm_fake_answer_tokens: int = 120
+    llm_cache_enabled: bool = True  # Disk cache of non-streamed responses
+    llm_cache_max_entries: int = 10_000
+    llm_cache_ttl_seconds: float = 86_400
+    llm_max_concurrent: int = 8  # Upstream calls in flight per provider (0 = unlimited)
+    llm_queue_timeout_seconds: float | None = 30  # Max wait for a slot (None = forever)
+    llm_coalesce: bool = True  # Concurrent identical prompts share one upstream call
+    llm_deadline_seconds: float | None = 60  # Per-call budget, retries included (None = no limit)
+    llm_max_retries: int = 3  # Retries on throttling / transient errors (jittered backoff)
+    llm_retry_backoff_seconds: float = 0.5  # First backoff ceiling, doubled per retry
+    llm_hedge: bool = False  # Duplicate calls slower than the observed latency percentile
+    llm_hedge_percentile: float = 95
 
     # AWS (only for Bedrock)
     aws_region: str = "us-west-2"
@@ -59,10 +90,40 @@ class Settings(BaseSettings):
     chroma_database: str | None = None
     chroma_cloud_api_key: str | None = None
     chroma_collection_name: str = "sentio_reviews"
+    facet_fields: list[str] = ["app_name", "category"]  # Metadata value -> count index
+    facet_index_persist: bool = True
+    collection_version_refresh_seconds: float = 5.0  # Re-read the write token (other processes' writes)
     
+    # Embedding cache
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 200_000
+
     # Retrieval
     retrieval_top_k: int = 5
     retrieval_threshold: float = 1.2
+    source_matcher_enabled: bool = True  # Resolve app/category names locally before asking the LLM
+    source_aliases: dict[str, str] = {}  # Extra alias -> app_name mappings
+    retrieval_speculative: bool = True  # Retrieve while the LLM selects sources
+    retrieval_speculative_factor: int = 4  # Wide retrieval = top_k * factor
+    exact_search_max_candidates: int = 5000  # Brute-force filtered queries this small (0 = off)
+    exact_search_cache_entries: int = 8  # Filtered candidate sets kept in memory
+    retrieval_hybrid: bool = False  # Fuse BM25 lexical results with vector results (RRF); disables speculative
+    lexical_index_enabled: bool = False  # Maintain the BM25 index on ingest even with hybrid off
+    retrieval_mmr: bool = False  # Re-rank over-fetched candidates for diversity (MMR)
+    retrieval_mmr_lambda: float = 0.5  # 1.0 = pure relevance, 0.0 = pure diversity
+    retrieval_fetch_k: int = 20  # Candidates retrieved before re-ranking down to top_k
+    reranker: RerankerType = RerankerType.NONE
+    reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    reranker_batch_size: int = 32  # (query, doc) pairs per cross-encoder forward pass
+    reranker_cache_entries: int = 10000  # Cached (query, doc) scores
+    query_batch_concurrency: int = 8  # Max concurrent LLM calls per /query/batch request
+    context_max_tokens: int | None = 1500  # Prompt context budget (None = no packing)
+
+    # Answer cache
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 1000
+    answer_cache_ttl_seconds: float = 3600
+    answer_cache_similarity: float | None = 0.95  # None = exact matches only
 
     # Chunking
     chunk_size: int = 500
@@ -70,6 +131,15 @@ class Settings(BaseSettings):
 
     # Ingestion
     ingest_limit: int | None = 1000  # None = no limit
+    ingest_read_rows: int | None = 50_000  # Rows per streamed read (None = load whole file)
+    ingest_pipeline: bool = False  # Overlap chunk / embed / write stages
+    ingest_chunk_workers: int = 2
+    ingest_embed_workers: int = 2
+    ingest_write_workers: int = 1
+    ingest_queue_size: int = 4  # Batches buffered between pipeline stages
+    ingest_checkpoints: bool = True  # Record committed batches so failed ingests can resume
+    ingest_max_concurrent_jobs: int = 1  # Background ingests running at once
+    ingest_job_history: int = 100  # Finished jobs kept for status lookups
 
     # Logging
     log_level: str = "INFO"
@@ -94,6 +164,39 @@ class Settings(BaseSettings):
     def cache_dir(self) -> Path:
         """Path to cache directory."""
         return self.data_dir / "cache"
+
+    @property
+    def checkpoint_dir(self) -> Path:
+        """Path to ingestion checkpoint manifests."""
+        return self.cache_dir / "checkpoints"
+
+    @property
+    def embedding_cache_path(self) -> Path:
+        """Path to the embedding cache database."""
+        return self.cache_dir / "embeddings.sqlite"
+
+    @property
+    def llm_cache_path(self) -> Path:
+        """Path to the LLM response cache database."""
+        return self.cache_dir / "llm_responses.sqlite"
+
+    @property
+    def facet_index_path(self) -> Path | None:
+        """Path to persisted facet index (next to Chroma data when local)."""
+        if not self.facet_index_persist:
+            return None
+        filename = f"{self.chroma_collection_name}_facets.json"
+        if self.chroma_client_type == ChromaClientType.PERSISTENT:
+            return self.chroma_persist_path / filename
+        return self.cache_dir / filename
+
+    @property
+    def lexical_index_path(self) -> Path:
+        """Path to persisted lexical index (next to Chroma data when local)."""
+        filename = f"{self.chroma_collection_name}_lexical.npz"
+        if self.chroma_client_type == ChromaClientType.PERSISTENT:
+            return self.chroma_persist_path / filename
+        return self.cache_dir / filename
     
 @lru_cache
 def get_settings() -> Settings:
@@ -3,12 +3,25 @@
 from functools import lru_cache
 
 from src.config.logging import get_logger
-from src.config.settings import Settings, get_settings
+from src.config.settings import LLMProvider, RerankerType, Settings, get_settings
 from src.services.agent import AgentService
+from src.services.answer_cache import AnswerCache
+from src.services.checkpoints import CheckpointStore
+from src.services.context_packer import ContextPacker
+from src.services.embedding_cache import EmbeddingCache
+from src.services.exact_search import ExactSearch
 from src.services.ingest import IngestionService
+from src.services.jobs import JobManager
+from src.services.lexical_index import LexicalIndex
 from src.services.llm import LLMClient
+from src.services.llm_cache import LLMResponseCache
+from src.services.llm_limiter import ConcurrencyLimiter
+from src.services.llm_resilience import ResiliencePolicy
+from src.services.pipeline import IngestionPipeline
 from src.services.rag import RAGService
-from src.services.vector_store import VectorStore
+from src.services.reranker import CrossEncoderReranker, LexicalReranker, Reranker
+from src.services.source_matcher import SourceMatcher
+from src.services.vector_store import EMBEDDING_MODEL_ID, VectorStore
 
 logger = get_logger(__name__)
 
@@ -22,6 +35,13 @@ def get_config() -> Settings:
 def get_vector_store() -> VectorStore:
     '''Provide ChromaDB vector store instance'''
     settings = get_settings()
+    embedding_cache = None
+    if settings.embedding_cache_enabled:
+        embedding_cache = EmbeddingCache(
+            path=settings.embedding_cache_path,
+            model_id=EMBEDDING_MODEL_ID,
+            max_entries=settings.embedding_cache_max_entries,
+        )
     return VectorStore(
         client_type=settings.chroma_client_type,
         collection_name=settings.chroma_collection_name,
@@ -31,21 +51,66 @@ def get_vector_store() -> VectorStore:
         chroma_cloud_api_key=settings.chroma_cloud_api_key,
         chroma_tenant_id=settings.chroma_tenant_id,
         chroma_database=settings.chroma_database,
+        facet_fields=settings.facet_fields,
+        facet_index_path=settings.facet_index_path,
+        version_refresh_seconds=settings.collection_version_refresh_seconds,
+        embedding_cache=embedding_cache,
+        lexical_index=LexicalIndex(
+            filter_fields=settings.facet_fields,
+            path=settings.lexical_index_path,
+        ) if settings.retrieval_hybrid or settings.lexical_index_enabled else None,
+        exact_search=ExactSearch(
+            max_candidates=settings.exact_search_max_candidates,
+            cache_entries=settings.exact_search_cache_entries,
+        ) if settings.exact_search_max_candidates > 0 else None,
     )
 
 def get_ingest_service() -> IngestionService:
     """Provide ingest service instance."""
     settings = get_settings()
+    pipeline = None
+    if settings.ingest_pipeline:
+        pipeline = IngestionPipeline(
+            chunk_workers=settings.ingest_chunk_workers,
+            embed_workers=settings.ingest_embed_workers,
+            write_workers=settings.ingest_write_workers,
+            queue_size=settings.ingest_queue_size,
+        )
     return IngestionService(
         vector_store=get_vector_store(),
         chunk_size=settings.chunk_size,
         chunk_overlap=settings.chunk_overlap,
+        read_rows=settings.ingest_read_rows,
+        pipeline=pipeline,
+        checkpoints=CheckpointStore(settings.checkpoint_dir) if settings.ingest_checkpoints else None,
+    )
+
+@lru_cache
+def get_job_manager() -> JobManager:
+    """Provide background ingestion job manager."""
+    settings = get_settings()
+    return JobManager(
+        max_concurrent=settings.ingest_max_concurrent_jobs,
+        history=settings.ingest_job_history,
+    )
+
+@lru_cache
+def get_llm_limiter(provider: LLMProvider) -> ConcurrencyLimiter | None:
+    """Provide the concurrency limiter shared by all clients of a provider."""
+    settings = get_settings()
+    if settings.llm_max_concurrent <= 0:
+        return None
+    return ConcurrencyLimiter(
+        max_concurrent=settings.llm_max_concurrent,
+        queue_timeout=settings.llm_queue_timeout_seconds,
+        name=provider.value,
     )
 
 @lru_cache
 def get_llm() -> LLMClient:
     """Provide LLM client instance."""
     settings = get_settings()
+    limiter = get_llm_limiter(settings.llm_provider)
     return LLMClient(
         provider=settings.llm_provider,
         model=settings.llm_model,
@@ -56,16 +121,80 @@ def get_llm() -> LLMClient:
         aws_region=settings.aws_region,
         aws_access_key_id=settings.aws_access_key_id,
         aws_secret_access_key=settings.aws_secret_access_key,
+        fake_latency_seconds=settings.llm_fake_latency_seconds,
+        fake_tokens_per_second=settings.llm_fake_tokens_per_second,
+        fake_answer_tokens=settings.llm_fake_answer_tokens,
+        response_cache=LLMResponseCache(
+            path=settings.llm_cache_path,
+            max_entries=settings.llm_cache_max_entries,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+        ) if settings.llm_cache_enabled else None,
+        limiter=limiter,
+        coalesce=settings.llm_coalesce,
+        fast_model=settings.llm_fast_model or None,
+        fast_temperature=settings.llm_fast_temperature,
+        fast_max_tokens=settings.llm_fast_max_tokens,
+        resilience=ResiliencePolicy(
+            deadline=settings.llm_deadline_seconds,
+            max_retries=settings.llm_max_retries,
+            backoff_base=settings.llm_retry_backoff_seconds,
+            hedge=settings.llm_hedge,
+            hedge_percentile=settings.llm_hedge_percentile,
+            # One worker per slot: abandoned attempts keep theirs until the provider answers
+            max_workers=limiter.max_concurrent if limiter is not None else 32,
+        ),
     )
 
+@lru_cache
+def get_source_matcher() -> SourceMatcher | None:
+    """Provide local source matcher (None when disabled)."""
+    settings = get_settings()
+    if not settings.source_matcher_enabled:
+        return None
+    return SourceMatcher(aliases=settings.source_aliases)
+
+@lru_cache
+def get_reranker() -> Reranker | None:
+    """Provide the retrieval re-ranker (None when disabled)."""
+    settings = get_settings()
+    if settings.reranker == RerankerType.LEXICAL:
+        return LexicalReranker(cache_entries=settings.reranker_cache_entries)
+    if settings.reranker == RerankerType.CROSS_ENCODER:
+        return CrossEncoderReranker(
+            model_name=settings.reranker_model,
+            batch_size=settings.reranker_batch_size,
+            cache_entries=settings.reranker_cache_entries,
+        )
+    return None
+
+@lru_cache
 def get_rag_service() -> RAGService:
     """Provide RAG service instance."""
     settings = get_settings()
+    vector_store = get_vector_store()
+    answer_cache = None
+    if settings.answer_cache_enabled:
+        answer_cache = AnswerCache(
+            max_entries=settings.answer_cache_max_entries,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            similarity_threshold=settings.answer_cache_similarity,
+            embed=vector_store.embed,
+        )
     return RAGService(
         llm=get_llm(),
-        vector_store=get_vector_store(),
+        vector_store=vector_store,
         top_k=settings.retrieval_top_k,
         threshold=settings.retrieval_threshold,
+        source_matcher=get_source_matcher(),
+        speculative=settings.retrieval_speculative,
+        speculative_factor=settings.retrieval_speculative_factor,
+        answer_cache=answer_cache,
+        batch_concurrency=settings.query_batch_concurrency,
+        context_packer=ContextPacker(settings.context_max_tokens) if settings.context_max_tokens else None,
+        hybrid=settings.retrieval_hybrid,
+        mmr_lambda=settings.retrieval_mmr_lambda if settings.retrieval_mmr else None,
+        fetch_k=settings.retrieval_fetch_k,
+        reranker=get_reranker(),
     )
 
 
@@ -81,7 +210,7 @@ def get_agent_service() -> AgentService:
     llm_client = get_llm()
     
     return AgentService(
-        llm=llm_client.llm,  # Pass the underlying LangChain model
+        llm=llm_client.chat_model(),  # LangChain model, calls limited with the client's
         rag_service=get_rag_service(),
         ingest_service=get_ingest_service(),
         vector_store=get_vector_store(),
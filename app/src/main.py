@@ -30,6 +30,7 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    vector_store.save_indexes()
     logger.info("Shutting down Sentio+ API")
 
 
@@ -1,9 +1,12 @@
 """Chat routes for LangChain agent."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from src.config.logging import get_logger
 from src.dependencies import get_agent_service
+from src.routes.errors import llm_http_error
+from src.routes.streaming import sse_response
 from src.schemas.api import ChatRequest, ChatResponse
 from src.services.agent import AgentService
 
@@ -13,7 +16,7 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.post("", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
     agent_service: AgentService = Depends(get_agent_service),
 ) -> ChatResponse:
@@ -25,14 +28,33 @@ def chat(
     logger.info(f"Chat request [thread={request.thread_id}]: {request.message[:50]}...")
 
     try:
-        result = agent_service.invoke(
+        result = await agent_service.ainvoke(
             message=request.message,
             thread_id=request.thread_id,
         )
         return ChatResponse(**result)
     except Exception as e:
-        logger.error(f"Chat failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise llm_http_error(e, "Chat")
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    agent_service: AgentService = Depends(get_agent_service),
+) -> StreamingResponse:
+    """Chat with the agent, streaming server-sent events.
+
+    Emits "tool" when the agent calls a tool, "token" events as the model
+    writes, then "done" with the thread_id (or "error").
+    """
+    logger.info(f"Chat stream [thread={request.thread_id}]: {request.message[:50]}...")
+
+    return sse_response(
+        agent_service.astream(
+            message=request.message,
+            thread_id=request.thread_id,
+        )
+    )
 
 
 @router.get("/history/{thread_id}")
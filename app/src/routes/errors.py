@@ -0,0 +1,28 @@
+"""Mapping of LLM failures to HTTP errors."""
+
+from fastapi import HTTPException
+
+from src.config.logging import get_logger
+from src.services.llm_limiter import LLMQueueTimeout
+from src.services.llm_resilience import LLMDeadlineExceeded, is_retryable
+
+logger = get_logger(__name__)
+
+
+def llm_http_error(e: Exception, action: str) -> HTTPException:
+    """Map a failed query / chat to an HTTP error.
+
+    503 when no LLM slot freed up in time, 504 when the call ran past its
+    deadline, 429 when the provider kept throttling after retries, else 500.
+    """
+    if isinstance(e, LLMQueueTimeout):
+        logger.warning(f"{action} rejected: {e}")
+        return HTTPException(status_code=503, detail=str(e))
+    if isinstance(e, LLMDeadlineExceeded):
+        logger.warning(f"{action} timed out: {e}")
+        return HTTPException(status_code=504, detail=str(e))
+    if is_retryable(e):
+        logger.warning(f"{action} throttled: {e}")
+        return HTTPException(status_code=429, detail=str(e))
+    logger.error(f"{action} failed: {e}")
+    return HTTPException(status_code=500, detail=str(e))
@@ -1,14 +1,19 @@
 """Ingest routes."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
+from typing import Any, Callable
+import asyncio
 import shutil
 import tempfile
 
 from src.config.logging import get_logger
 from src.config.settings import Settings, get_settings
-from src.dependencies import get_ingest_service
-from src.services.ingest import IngestionService
+from src.dependencies import get_ingest_service, get_job_manager
+from src.services.ingest import FILE_FORMATS, IngestionService
+from src.services.jobs import IngestJob, JobManager
+from src.services.stream_reader import ByteQueueReader
 from chromadb.errors import ChromaError
 
 logger = get_logger(__name__)
@@ -16,7 +21,7 @@ logger = get_logger(__name__)
 router = APIRouter(prefix="/ingest", tags=["ingest"])
 
 # Allowed filenames (or load dynamically)
-ALLOWED_EXTENSIONS = {".csv"}
+ALLOWED_EXTENSIONS = set(FILE_FORMATS)
 
 
 def _validate_filename(filename: str) -> Path:
@@ -73,7 +78,7 @@ def _validate_filename(filename: str) -> Path:
 def list_available_files(
     settings: Settings = Depends(get_settings),
 ) -> dict:
-    """List available CSV files for ingestion."""
+    """List available CSV, Parquet and Arrow files for ingestion."""
     processed_dir = settings.processed_data_dir
     
     if not processed_dir.exists():
@@ -88,10 +93,10 @@ def list_available_files(
 
 
 @router.post("")
-def ingest_csv(
+async def ingest_csv(
     filename: str = Query(
         ...,
-        description="CSV filename (must exist in processed data directory)",
+        description="CSV, Parquet or Arrow filename (must exist in processed data directory)",
         examples=["sentio_plus_rag_ready.csv"],
     ),
     clear_existing: bool = Query(
@@ -109,18 +114,57 @@ def ingest_csv(
         ge=1,
         description="Max rows to ingest (None = all)",
     ),
+    incremental: bool = Query(
+        default=False,
+        description="Only upsert new/changed chunks and delete orphaned ones",
+    ),
+    prune_missing: bool = Query(
+        default=False,
+        description="With incremental and no limit, delete this file's chunks whose rows are gone",
+    ),
+    resume: bool = Query(
+        default=False,
+        description="Skip batches committed by a previous failed ingest of this file",
+    ),
+    background: bool = Query(
+        default=False,
+        description="Run as a background job and return its id immediately",
+    ),
     ingest_service: IngestionService = Depends(get_ingest_service),
+    job_manager: JobManager = Depends(get_job_manager),
 ) -> dict:
-    """Ingest a CSV file into the vector store."""
+    """Ingest a CSV, Parquet or Arrow file into the vector store."""
     file_path = _validate_filename(filename)
     logger.info(f"Ingest request: {file_path.name}")
 
+    if background:
+        job = job_manager.submit(
+            _file_job(
+                ingest_service,
+                file_path,
+                batch_size=batch_size,
+                clear_existing=clear_existing,
+                limit=limit,
+                incremental=incremental,
+                resume=resume,
+                prune_missing=prune_missing,
+            ),
+            description=file_path.name,
+            total_rows=limit,
+        )
+        return {"success": True, "job_id": job.id, "status": job.status.value}
+
     try:
-        result = ingest_service.ingest_csv(
+        # Parsing, embedding and writes are blocking; keep them off the event loop
+        result = await run_in_threadpool(
+            ingest_service.ingest_file,
             file_path=file_path,
             batch_size=batch_size,
             clear_existing=clear_existing,
             limit=limit,
+            incremental=incremental,
+            resume=resume,
+            prune_missing=prune_missing,
         )
         return {"success": True, **result}
     except ValueError as e:
@@ -130,40 +174,66 @@ def ingest_csv(
 
 @router.post("/upload")
 async def upload_and_ingest(
-    file: UploadFile = File(..., description="CSV file to ingest"),
+    file: UploadFile = File(..., description="CSV, Parquet or Arrow file to ingest"),
     clear_existing: bool = Query(default=False),
     batch_size: int = Query(default=500, ge=1, le=5000),
     limit: int | None = Query(default=None, ge=1),
+    incremental: bool = Query(default=False),
+    prune_missing: bool = Query(default=False),
+    resume: bool = Query(default=False),
+    background: bool = Query(default=False),
     settings: Settings = Depends(get_settings),
     ingest_service: IngestionService = Depends(get_ingest_service),
+    job_manager: JobManager = Depends(get_job_manager),
 ) -> dict:
-    """Upload and ingest a CSV file."""
+    """Upload and ingest a CSV, Parquet or Arrow file."""
     # Validate extension
-    if not file.filename or not file.filename.endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only CSV files allowed")
+    suffix = Path(file.filename or "").suffix.lower()
+    if suffix not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {ALLOWED_EXTENSIONS}",
+        )
 
     logger.info(f"Upload ingest request: {file.filename}")
 
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = Path(tmp.name)
+    # Save to temp file (suffix selects the reader)
+    tmp_path = await run_in_threadpool(_save_upload, file, suffix)
+
+    if background:
+        job = job_manager.submit(
+            _file_job(
+                ingest_service,
+                tmp_path,
+                batch_size=batch_size,
+                clear_existing=clear_existing,
+                limit=limit,
+                incremental=incremental,
+                resume=resume,
+                prune_missing=prune_missing,
+                source=file.filename,
+            ),
+            description=file.filename,
+            total_rows=limit,
+            cleanup=lambda: tmp_path.unlink(missing_ok=True),
+        )
+        return {"success": True, "filename": file.filename, "job_id": job.id, "status": job.status.value}
 
     try:
-        result = ingest_service.ingest_csv(
+        result = await run_in_threadpool(
+            ingest_service.ingest_file,
             file_path=tmp_path,
             batch_size=batch_size,
             clear_existing=clear_existing,
             limit=limit,
+            incremental=incremental,
+            resume=resume,
+            prune_missing=prune_missing,
+            source=file.filename,
         )
         return {"success": True, "filename": file.filename, **result}
     except ChromaError as e:
-        error_msg = str(e)
-        if "Quota exceeded" in error_msg:
-            logger.warning(f"ChromaDB quota exceeded: {e}")
-            raise HTTPException(status_code=429, detail=error_msg)
-        logger.error(f"ChromaDB error: {e}")
-        raise HTTPException(status_code=500, detail=error_msg)
+        raise _chroma_http_error(e, resumable=settings.ingest_checkpoints)
     except ValueError as e:
         logger.error(f"Validation error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -171,6 +241,130 @@ async def upload_and_ingest(
         tmp_path.unlink(missing_ok=True)  # Cleanup temp file
 
 
+def _file_job(
+    ingest_service: IngestionService,
+    file_path: Path,
+    **kwargs: Any,
+) -> Callable[[IngestJob], dict]:
+    """Background job work ingesting a file.
+
+    Without a limit the row count is estimated when the job starts (a CSV
+    estimate reads the whole file), so submitting never waits on it.
+    """
+    def work(job: IngestJob) -> dict:
+        if job.total_rows is None:
+            job.total_rows = ingest_service.estimate_rows(file_path)
+        return ingest_service.ingest_file(file_path=file_path, on_progress=job.update_progress, **kwargs)
+
+    return work
+
+
+def _save_upload(file: UploadFile, suffix: str) -> Path:
+    """Copy an uploaded file to a named temp file and return its path."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+        return Path(tmp.name)
+
+
+@router.post("/upload/stream")
+async def stream_and_ingest(
+    request: Request,
+    filename: str = Query(default="upload.csv", description="Label for the streamed CSV"),
+    clear_existing: bool = Query(default=False),
+    batch_size: int = Query(default=500, ge=1, le=5000),
+    limit: int | None = Query(default=None, ge=1),
+    incremental: bool = Query(default=False),
+    prune_missing: bool = Query(default=False),
+    ingest_service: IngestionService = Depends(get_ingest_service),
+) -> dict:
+    """Ingest a raw CSV request body (Content-Type: text/csv) while it uploads.
+
+    Records are parsed straight from the body stream and indexed batch by
+    batch, so nothing is spilled to disk or held in memory as a whole.
+    """
+    logger.info(f"Stream ingest request: {filename}")
+    reader = ByteQueueReader()
+
+    def run() -> dict:
+        try:
+            return ingest_service.ingest_csv_stream(
+                reader,
+                source=filename,
+                batch_size=batch_size,
+                clear_existing=clear_existing,
+                limit=limit,
+                incremental=incremental,
+                prune_missing=prune_missing,
+            )
+        finally:
+            reader.abort()  # Unblock the body loop if ingestion stops early
+
+    ingest_task = asyncio.ensure_future(run_in_threadpool(run))
+
+    try:
+        async for chunk in request.stream():
+            if not await run_in_threadpool(reader.feed, chunk):
+                break  # Ingestion finished (limit) or failed
+        await run_in_threadpool(reader.finish)
+    except BaseException:
+        reader.abort()
+        await asyncio.gather(ingest_task, return_exceptions=True)
+        raise
+
+    try:
+        result = await ingest_task
+        return {"success": True, "filename": filename, **result}
+    except ChromaError as e:
+        raise _chroma_http_error(e)
+    except ValueError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _chroma_http_error(e: ChromaError, resumable: bool = False) -> HTTPException:
+    """Map a ChromaDB error to an HTTP error (429 for quota)."""
+    error_msg = str(e)
+    if "Quota exceeded" in error_msg:
+        logger.warning(f"ChromaDB quota exceeded: {e}")
+        if resumable:
+            error_msg += " (committed batches are checkpointed; retry with resume=true)"
+        return HTTPException(status_code=429, detail=error_msg)
+    logger.error(f"ChromaDB error: {e}")
+    return HTTPException(status_code=500, detail=error_msg)
+
+
+@router.get("/jobs")
+def list_jobs(
+    job_manager: JobManager = Depends(get_job_manager),
+) -> dict:
+    """List background ingestion jobs, newest first."""
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
+
+
+@router.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager),
+) -> dict:
+    """Get progress, throughput and ETA of a background ingestion job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(
+    job_id: str,
+    job_manager: JobManager = Depends(get_job_manager),
+) -> dict:
+    """Cancel a queued or running ingestion job."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+
 @router.get("/stats")
 def get_stats(
     ingest_service: IngestionService = Depends(get_ingest_service),
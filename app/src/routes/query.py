@@ -1,10 +1,25 @@
 """Query routes."""
 
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import time
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 
 from src.config.logging import get_logger
 from src.dependencies import get_llm, get_rag_service
-from src.schemas.api import ModelInfoResponse, QueryRequest, QueryResponse
+from src.routes.errors import llm_http_error
+from src.routes.streaming import sse_response
+from src.schemas.api import (
+    BatchQueryError,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    BatchQueryResult,
+    ModelInfoResponse,
+    QueryRequest,
+    QueryResponse,
+)
 from src.services.llm import LLMClient
 from src.services.rag import RAGService
 
@@ -14,7 +29,7 @@ router = APIRouter(prefix="/query", tags=["query"])
 
 
 @router.post("", response_model=QueryResponse)
-def query(
+async def query(
     request: QueryRequest,
     rag_service: RAGService = Depends(get_rag_service),
 ) -> QueryResponse:
@@ -22,19 +37,98 @@ def query(
     logger.info(f"Query: {request.question[:50]}...")
 
     try:
-        result = rag_service.query(
+        result = await rag_service.aquery(
             question=request.question,
             filter_by_source=request.filter_by_source,
         )
         return QueryResponse(**result)
     except Exception as e:
-        logger.error(f"Query failed: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        raise llm_http_error(e, "Query")
+
+
+@router.post("/stream")
+async def query_stream(
+    request: QueryRequest,
+    rag_service: RAGService = Depends(get_rag_service),
+) -> StreamingResponse:
+    """Query the RAG system, streaming server-sent events.
+
+    Emits "sources" once retrieval is done, "token" events as the answer is
+    generated, then "done" with stage timings (or "error").
+    """
+    logger.info(f"Query stream: {request.question[:50]}...")
+
+    return sse_response(
+        rag_service.aquery_stream(
+            question=request.question,
+            filter_by_source=request.filter_by_source,
+        )
+    )
+
+
+@router.post("/batch", response_model=BatchQueryResponse)
+async def query_batch(
+    request: BatchQueryRequest,
+    rag_service: RAGService = Depends(get_rag_service),
+):
+    """Answer a batch of questions with shared embedding and retrieval.
+
+    With stream=true, results are sent as NDJSON lines as soon as each one
+    finishes; otherwise they are returned together in request order. A
+    question that fails gets an {"index", "question", "error"} item; the
+    others are still answered.
+    """
+    logger.info(f"Batch query: {len(request.questions)} questions")
+
+    results = rag_service.aquery_many(
+        questions=request.questions,
+        filter_by_source=request.filter_by_source,
+    )
+
+    if request.stream:
+
+        async def lines() -> AsyncIterator[str]:
+            try:
+                async for result in results:
+                    yield _batch_item(result).model_dump_json() + "\n"
+            except Exception as e:
+                logger.error(f"Batch query failed: {e}")
+                yield json.dumps({"error": str(e)}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    started = time.perf_counter()
+    try:
+        collected = [result async for result in results]
+    except Exception as e:
+        raise llm_http_error(e, "Batch query")
+
+    return BatchQueryResponse(
+        results=[_batch_item(r) for r in sorted(collected, key=lambda r: r["index"])],
+        total_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+def _batch_item(result: dict) -> BatchQueryResult | BatchQueryError:
+    """Response model for one batch result (answer or per-question error)."""
+    return BatchQueryError(**result) if "error" in result else BatchQueryResult(**result)
 
 
 @router.get("/model", response_model=ModelInfoResponse)
-def get_model_info(
+async def get_model_info(
     llm: LLMClient = Depends(get_llm),
 ) -> ModelInfoResponse:
     """Get current LLM model information."""
-    return ModelInfoResponse(**llm.get_model_info())
\ No newline at end of file
+    return ModelInfoResponse(**llm.get_model_info())
+
+
+@router.get("/model/stats")
+async def get_model_stats(
+    llm: LLMClient = Depends(get_llm),
+) -> dict:
+    """Get LLM concurrency (queue depth, wait times), coalescing and cache statistics.
+
+    Agent model calls count towards the limiter but bypass coalescing, the
+    response cache and retries / hedging, so they are absent from those stats.
+    """
+    return llm.get_stats()
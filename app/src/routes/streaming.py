@@ -0,0 +1,51 @@
+"""Server-sent event helpers for streaming routes."""
+
+import json
+from typing import Any, AsyncIterator, Iterator
+
+from fastapi.responses import StreamingResponse
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(
+    events: Iterator[tuple[str, Any]] | AsyncIterator[tuple[str, Any]],
+) -> StreamingResponse:
+    """Stream (event, data) pairs as text/event-stream.
+
+    Accepts sync or async iterators. Errors raised while streaming are sent
+    as a final "error" event, since the status code has already gone out
+    with the first byte.
+    """
+    if hasattr(events, "__aiter__"):
+
+        async def body() -> AsyncIterator[str]:
+            try:
+                async for event, data in events:
+                    yield format_sse(event, data)
+            except Exception as e:
+                logger.error(f"Stream failed: {e}")
+                yield format_sse("error", {"detail": str(e)})
+
+    else:
+
+        def body() -> Iterator[str]:
+            try:
+                for event, data in events:
+                    yield format_sse(event, data)
+            except Exception as e:
+                logger.error(f"Stream failed: {e}")
+                yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
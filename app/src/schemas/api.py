@@ -1,5 +1,7 @@
 """API request/response schemas."""
 
+from typing import Annotated
+
 from pydantic import BaseModel, Field
 
 
@@ -17,7 +19,7 @@ class QueryRequest(BaseModel):
     )
     filter_by_source: bool = Field(
         default=True,
-        description="Use LLM to pre-filter relevant apps",
+        description="Pre-filter relevant apps (local name matcher, LLM when ambiguous)",
     )
 
 
@@ -28,6 +30,64 @@ class QueryResponse(BaseModel):
     sources: list[str]
     num_docs: int
     selected_sources: list[str] = []
+    timings: dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-stage latency in milliseconds",
+    )
+    cache_hit: str | None = Field(
+        default=None,
+        description="Answer cache tier that served the response (exact / semantic)",
+    )
+    context: dict[str, int] = Field(
+        default_factory=dict,
+        description="Context packing stats (chunks, passages, tokens retrieved / packed / saved)",
+    )
+    llm: dict[str, int] = Field(
+        default_factory=dict,
+        description="Upstream LLM calls, attempts, retries and hedged requests for this query",
+    )
+
+
+class BatchQueryRequest(BaseModel):
+    """Request to answer a batch of questions."""
+
+    questions: list[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Questions to ask about product reviews",
+        examples=[["What do users think about Google Wallet?", "Common complaints about Venmo?"]],
+    )
+    filter_by_source: bool = Field(
+        default=True,
+        description="Pre-filter relevant apps (local name matcher, LLM when ambiguous)",
+    )
+    stream: bool = Field(
+        default=False,
+        description="Stream results as NDJSON lines in completion order",
+    )
+
+
+class BatchQueryResult(QueryResponse):
+    """Result for one question of a batch."""
+
+    index: int = Field(..., description="Position of the question in the request")
+    question: str
+
+
+class BatchQueryError(BaseModel):
+    """A question of a batch that could not be answered."""
+
+    index: int = Field(..., description="Position of the question in the request")
+    question: str
+    error: str
+
+
+class BatchQueryResponse(BaseModel):
+    """Response from a batch query."""
+
+    results: list[BatchQueryResult | BatchQueryError]
+    total_ms: float
 
 
 # --- Ingest Schemas ---
@@ -1,27 +1,30 @@
 """LangChain agent service with tools for RAG queries."""
 
-from typing import Any
+from typing import Any, AsyncIterator, Iterator
 
 from langchain.agents import create_agent
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool, tool
 from langgraph.checkpoint.memory import InMemorySaver
 
 from src.config.logging import get_logger
 from src.services.ingest import IngestionService
+from src.services.llm import content_text
 from src.services.rag import RAGService
 from src.services.vector_store import VectorStore
 from src.prompts.templates import AGENT_SYSTEM_PROMPT
 
 logger = get_logger(__name__)
 
+# Graph node of create_agent that calls the agent's model (tools run in "tools")
+AGENT_MODEL_NODE = "model"
+
 # Global references to services (set by AgentService)
 _rag_service: RAGService | None = None
 _ingest_service: IngestionService | None = None
 _vector_store: VectorStore | None = None
 
 
-@tool
-def search_reviews(question: str) -> str:
+def _search_reviews(question: str) -> str:
     """Search product reviews to answer questions about user feedback, app features, 
     ratings, complaints, or comparisons between apps.
     
@@ -43,20 +46,42 @@ def search_reviews(question: str) -> str:
         return "Error: RAG service not initialized."
     
     try:
-        result = _rag_service.query(question=question, filter_by_source=True)
-        
-        answer = result["answer"]
-        sources = result.get("sources", [])
-        num_docs = result.get("num_docs", 0)
-        
-        if sources:
-            return f"{answer}\n\n[Based on {num_docs} reviews from: {', '.join(sources)}]"
-        return answer
+        return _format_search_result(_rag_service.query(question=question, filter_by_source=True))
     except Exception as e:
         logger.error(f"search_reviews failed: {e}")
         return f"Error searching reviews: {str(e)}"
 
 
+async def _asearch_reviews(question: str) -> str:
+    """Async implementation of search_reviews, used when the agent runs async."""
+    if _rag_service is None:
+        return "Error: RAG service not initialized."
+
+    try:
+        return _format_search_result(await _rag_service.aquery(question=question, filter_by_source=True))
+    except Exception as e:
+        logger.error(f"search_reviews failed: {e}")
+        return f"Error searching reviews: {str(e)}"
+
+
+def _format_search_result(result: dict[str, Any]) -> str:
+    """Format a RAG result as the search_reviews tool output."""
+    answer = result["answer"]
+    sources = result.get("sources", [])
+    num_docs = result.get("num_docs", 0)
+
+    if sources:
+        return f"{answer}\n\n[Based on {num_docs} reviews from: {', '.join(sources)}]"
+    return answer
+
+
+search_reviews = StructuredTool.from_function(
+    func=_search_reviews,
+    coroutine=_asearch_reviews,
+    name="search_reviews",
+)
+
+
 @tool
 def get_collection_stats() -> str:
     """Get statistics about the review collection including total documents, 
@@ -181,35 +206,144 @@ class AgentService:
                 {"configurable": {"thread_id": thread_id}},
             )
             
-            # Extract the last assistant message
-            messages = result.get("messages", [])
-            response_content = ""
-            
-            for msg in reversed(messages):
-                if hasattr(msg, "content") and hasattr(msg, "type"):
-                    if msg.type == "ai":
-                        response_content = msg.content
-                        break
-                elif isinstance(msg, dict) and msg.get("role") == "assistant":
-                    response_content = msg.get("content", "")
-                    break
-            
-            if not response_content and messages:
-                # Fallback: get last message content
-                last_msg = messages[-1]
-                if hasattr(last_msg, "content"):
-                    response_content = last_msg.content
-                elif isinstance(last_msg, dict):
-                    response_content = last_msg.get("content", "")
-            
             return {
-                "response": response_content,
+                "response": self._last_response(result.get("messages", [])),
                 "thread_id": thread_id,
             }
         except Exception as e:
             logger.error(f"Agent invoke failed: {e}")
             raise
+
+    async def ainvoke(self, message: str, thread_id: str) -> dict[str, Any]:
+        """Async version of ``invoke`` (model and search calls are awaited).
+
+        Args:
+            message: User's message/question.
+            thread_id: Unique thread ID for conversation memory.
+
+        Returns:
+            Dict with response and thread_id.
+        """
+        try:
+            result = await self.agent.ainvoke(
+                {"messages": [{"role": "user", "content": message}]},
+                {"configurable": {"thread_id": thread_id}},
+            )
+            return {
+                "response": self._last_response(result.get("messages", [])),
+                "thread_id": thread_id,
+            }
+        except Exception as e:
+            logger.error(f"Agent invoke failed: {e}")
+            raise
+
+    @staticmethod
+    def _last_response(messages: list[Any]) -> str:
+        """Extract the last assistant message content."""
+        response_content = ""
+        
+        for msg in reversed(messages):
+            if hasattr(msg, "content") and hasattr(msg, "type"):
+                if msg.type == "ai":
+                    response_content = msg.content
+                    break
+            elif isinstance(msg, dict) and msg.get("role") == "assistant":
+                response_content = msg.get("content", "")
+                break
+        
+        if not response_content and messages:
+            # Fallback: get last message content
+            last_msg = messages[-1]
+            if hasattr(last_msg, "content"):
+                response_content = last_msg.content
+            elif isinstance(last_msg, dict):
+                response_content = last_msg.get("content", "")
+        
+        return response_content
     
+    def stream(self, message: str, thread_id: str) -> Iterator[tuple[str, Any]]:
+        """Invoke the agent, streaming model tokens and tool calls as they happen.
+
+        Args:
+            message: User's message/question.
+            thread_id: Unique thread ID for conversation memory.
+
+        Yields:
+            ("tool", dict) when the agent runs a tool, ("token", str) for each
+            fragment of model output, then ("done", dict) with the thread_id.
+        """
+        streamed: set[str] = set()
+        try:
+            for chunk, metadata in self.agent.stream(
+                {"messages": [{"role": "user", "content": message}]},
+                {"configurable": {"thread_id": thread_id}},
+                stream_mode="messages",
+            ):
+                event = self._stream_event(chunk, metadata, streamed)
+                if event is not None:
+                    yield event
+        except Exception as e:
+            logger.error(f"Agent stream failed: {e}")
+            raise
+
+        yield "done", {"thread_id": thread_id}
+
+    async def astream(self, message: str, thread_id: str) -> AsyncIterator[tuple[str, Any]]:
+        """Async version of ``stream``.
+
+        Args:
+            message: User's message/question.
+            thread_id: Unique thread ID for conversation memory.
+
+        Yields:
+            ("tool", dict) when the agent runs a tool, ("token", str) for each
+            fragment of model output, then ("done", dict) with the thread_id.
+        """
+        streamed: set[str] = set()
+        try:
+            async for chunk, metadata in self.agent.astream(
+                {"messages": [{"role": "user", "content": message}]},
+                {"configurable": {"thread_id": thread_id}},
+                stream_mode="messages",
+            ):
+                event = self._stream_event(chunk, metadata, streamed)
+                if event is not None:
+                    yield event
+        except Exception as e:
+            logger.error(f"Agent stream failed: {e}")
+            raise
+
+        yield "done", {"thread_id": thread_id}
+
+    @staticmethod
+    def _stream_event(
+        chunk: Any,
+        metadata: dict[str, Any],
+        streamed: set[str],
+    ) -> tuple[str, Any] | None:
+        """Map a streamed message chunk to a (event, data) pair, if it carries one.
+
+        LangGraph streams every LLM call made inside the graph, including
+        those inside tools (source selection, the RAG answer); only the
+        agent model's own output becomes tokens. ``streamed`` collects ids
+        of messages already sent as chunks, so their complete message is
+        not sent again.
+        """
+        msg_type = getattr(chunk, "type", None)
+        if msg_type == "tool":
+            return "tool", {"name": getattr(chunk, "name", None)}
+        if metadata.get("langgraph_node") != AGENT_MODEL_NODE:
+            return None
+        if msg_type == "AIMessageChunk":
+            if chunk.id is not None:
+                streamed.add(chunk.id)
+        elif msg_type != "ai" or chunk.id in streamed:
+            return None
+        text = content_text(chunk.content)
+        if text:
+            return "token", text
+        return None
+
     def get_conversation_history(self, thread_id: str) -> list[dict[str, str]]:
         """Get conversation history for a thread.
         
@@ -0,0 +1,150 @@
+"""Exact and semantic answer cache for RAG queries."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnswerCache:
+    """Bounded LRU/TTL cache of RAG answers.
+
+    Entries live in a scope (e.g. filter_by_source, top_k and the collection
+    data version), so answers never outlive the data they were built from.
+    Lookups try an exact match on the normalized question first, then the
+    most similar cached question in the same scope by embedding cosine
+    similarity.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float | None = 0.95,
+        embed: Callable[[list[str]], list[Any]] | None = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Max cached answers (least recently used evicted first).
+            ttl_seconds: Max age of a cached answer.
+            similarity_threshold: Min cosine similarity for a semantic hit (None disables).
+            embed: Embedding function for the semantic tier.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold if embed is not None else None
+        self.embed = embed
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        # (scope, normalized question) -> (answer, created_at, unit vector or None)
+        self._entries: OrderedDict[tuple, tuple[dict[str, Any], float, np.ndarray | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        """Normalize a question for exact matching."""
+        return " ".join(question.lower().split()).rstrip("?!. ")
+
+    def lookup(
+        self,
+        question: str,
+        scope: Hashable,
+        vector: Any | None = None,
+    ) -> tuple[dict[str, Any] | None, str | None, np.ndarray | None]:
+        """Find a cached answer.
+
+        Args:
+            question: User question.
+            scope: Hashable key the answer must have been stored under.
+            vector: Precomputed question embedding (computed if missing).
+
+        Returns:
+            Tuple of (answer or None, hit tier "exact"/"semantic" or None,
+            question vector to pass back to ``store`` on a miss).
+        """
+        key = (scope, self.normalize(question))
+        now = time.time()
+
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits["exact"] += 1
+                return entry[0], "exact", None
+
+        if self.similarity_threshold is None:
+            with self._lock:
+                self.misses += 1
+            return None, None, None
+
+        vector = self._unit(self.embed([question])[0] if vector is None else vector)
+
+        with self._lock:
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if k[0] == scope and e[2] is not None
+            ]
+            if candidates:
+                similarities = np.stack([e[2] for _, e in candidates]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    best_key, best_entry = candidates[best]
+                    self._entries.move_to_end(best_key)
+                    self.hits["semantic"] += 1
+                    return best_entry[0], "semantic", vector
+            self.misses += 1
+
+        return None, None, vector
+
+    def store(
+        self,
+        question: str,
+        scope: Hashable,
+        answer: dict[str, Any],
+        vector: np.ndarray | None = None,
+    ) -> None:
+        """Cache an answer.
+
+        Args:
+            question: User question.
+            scope: Hashable key the answer is valid for.
+            answer: Answer dict to return on later hits.
+            vector: Question vector from ``lookup`` (computed if missing).
+        """
+        if vector is not None:
+            vector = self._unit(vector)
+        elif self.similarity_threshold is not None:
+            vector = self._unit(self.embed([question])[0])
+
+        key = (scope, self.normalize(question))
+        with self._lock:
+            self._entries[key] = (answer, time.time(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Return entry count and hit/miss counters."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": dict(self.hits), "misses": self.misses}
+
+    def _expire(self, now: float) -> None:
+        """Drop entries older than the TTL (caller holds the lock)."""
+        expired = [k for k, e in self._entries.items() if now - e[1] > self.ttl_seconds]
+        for k in expired:
+            del self._entries[k]
+
+    @staticmethod
+    def _unit(vector: Any) -> np.ndarray:
+        """Return a float32 unit-length copy of a vector."""
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
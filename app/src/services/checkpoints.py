@@ -0,0 +1,115 @@
+"""Batch-level checkpoints for resumable ingestion."""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes hashed from each end of a file for its fingerprint
+FINGERPRINT_SAMPLE_BYTES = 1 << 20
+
+
+class IngestCheckpoint:
+    """Append-only manifest of committed batch row offsets for one ingest."""
+
+    def __init__(self, path: Path, header: dict[str, Any], committed: set[int]):
+        """Initialize a checkpoint (use CheckpointStore.open).
+
+        Args:
+            path: Manifest file path.
+            header: Identifying info written as the first line.
+            committed: Row offsets of batches already committed.
+        """
+        self.path = path
+        self.header = header
+        self.committed = committed
+        self._lock = threading.Lock()
+
+    def commit(self, offset: int) -> None:
+        """Record that the batch starting at a row offset was written."""
+        with self._lock:
+            if offset in self.committed:
+                return
+            self.committed.add(offset)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(f"{offset}\n")
+
+    def complete(self) -> None:
+        """Remove the manifest after a successful ingest."""
+        self.path.unlink(missing_ok=True)
+        logger.debug(f"Checkpoint removed: {self.path.name}")
+
+
+class CheckpointStore:
+    """Creates and loads ingest checkpoints keyed by file fingerprint."""
+
+    def __init__(self, directory: Path):
+        """Initialize the store.
+
+        Args:
+            directory: Directory holding checkpoint manifests.
+        """
+        self.directory = directory
+
+    @staticmethod
+    def fingerprint(file_path: Path) -> str:
+        """Hash of a file's size and first and last MiB.
+
+        Reads at most 2 MiB however large the file is. Independent of the
+        file's name and mtime, so a re-uploaded copy (a new temp file) still
+        resumes; an edit that keeps the size and both ends intact goes unnoticed.
+        """
+        size = file_path.stat().st_size
+        digest = hashlib.sha256(str(size).encode("utf-8"))
+        with open(file_path, "rb") as f:
+            digest.update(f.read(FINGERPRINT_SAMPLE_BYTES))
+            if size > FINGERPRINT_SAMPLE_BYTES:
+                f.seek(max(FINGERPRINT_SAMPLE_BYTES, size - FINGERPRINT_SAMPLE_BYTES))
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def open(
+        self,
+        file_path: Path,
+        batch_size: int,
+        params: dict[str, Any] | None = None,
+        resume: bool = False,
+    ) -> IngestCheckpoint:
+        """Open the checkpoint for an ingest of a file.
+
+        Args:
+            file_path: File being ingested.
+            batch_size: Rows per batch (offsets are only valid for the same size).
+            params: Other settings that change batch contents (e.g. column names).
+            resume: Load committed offsets from a previous run instead of starting fresh.
+
+        Returns:
+            Checkpoint with any previously committed offsets.
+        """
+        header = {
+            "fingerprint": self.fingerprint(file_path),
+            "batch_size": batch_size,
+            **(params or {}),
+        }
+        key = hashlib.sha256(json.dumps(header, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+        path = self.directory / f"{key}.manifest"
+
+        committed: set[int] = set()
+        if resume and path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            for line in lines[1:]:
+                if line.strip().isdigit():  # Ignore a torn last line
+                    committed.add(int(line))
+            logger.info(f"Resuming {file_path.name}: {len(committed)} batches already committed")
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({**header, "file": file_path.name}) + "\n")
+
+        return IngestCheckpoint(path=path, header=header, committed=committed)
@@ -0,0 +1,175 @@
+"""Token-budgeted packing of retrieved chunks into prompt context."""
+
+import re
+from typing import Any, Callable
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Shortest suffix/prefix match treated as chunk overlap rather than coincidence
+_MIN_OVERLAP_CHARS = 8
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse whitespace for duplicate detection."""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def _merge_overlap(left: str, right: str) -> str:
+    """Join two consecutive chunks, dropping the text they overlap on."""
+    for k in range(min(len(left), len(right)), _MIN_OVERLAP_CHARS - 1, -1):
+        if left.endswith(right[:k]):
+            return left + right[k:]
+    return f"{left} {right}"
+
+
+def _format_passage(metadata: dict[str, Any], text: str) -> str:
+    """Format one passage as it appears in the prompt."""
+    app = metadata.get("app_name", "Unknown")
+    rating = metadata.get("rating", "?")
+    return f"[{app} - {rating}★]\n{text}"
+
+
+class ContextPacker:
+    """Packs retrieved chunks into a context string within a token budget.
+
+    Chunks of the same review are merged in chunk_index order with their
+    overlap removed, duplicate or contained passages are dropped, and
+    passages are added in retrieval rank order (a review ranks by its best
+    chunk) until the budget is spent, truncating the last one at a
+    sentence boundary if it helps.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        count_tokens: Callable[[str], int] = approx_tokens,
+        min_passage_tokens: int = 32,
+    ):
+        """Initialize the packer.
+
+        Args:
+            max_tokens: Token budget for the packed context.
+            count_tokens: Token counter (defaults to a character-based estimate).
+            min_passage_tokens: Smallest truncated passage worth including.
+        """
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.min_passage_tokens = min_passage_tokens
+
+    def pack(self, docs: list[dict[str, Any]]) -> tuple[str, dict[str, int]]:
+        """Pack retrieved docs into a context string.
+
+        Args:
+            docs: Retrieved docs with 'text' and 'metadata', best first.
+
+        Returns:
+            Tuple of (context string, stats with tokens before/after packing,
+            tokens saved, passages, duplicates dropped and truncated passages).
+        """
+        separator_tokens = self.count_tokens("\n\n")
+        tokens_in = sum(
+            self.count_tokens(_format_passage(doc["metadata"], doc["text"])) for doc in docs
+        ) + separator_tokens * max(len(docs) - 1, 0)
+
+        passages: list[str] = []
+        kept_texts: list[str] = []
+        duplicates = truncated = 0
+        budget = self.max_tokens
+
+        for metadata, text in self._merge_reviews(docs):
+            normalized = _normalize(text)
+            if any(normalized in kept for kept in kept_texts):
+                duplicates += 1
+                continue
+
+            passage = _format_passage(metadata, text)
+            cost = self.count_tokens(passage) + (separator_tokens if passages else 0)
+            if cost > budget:
+                passage = self._truncate(metadata, text, budget - (separator_tokens if passages else 0))
+                if passage is None:
+                    break
+                truncated += 1
+                cost = budget
+
+            passages.append(passage)
+            kept_texts.append(normalized)
+            budget -= cost
+            if budget <= 0:
+                break
+
+        context = "\n\n".join(passages)
+        tokens_out = self.count_tokens(context)
+        stats = {
+            "chunks": len(docs),
+            "passages": len(passages),
+            "duplicates": duplicates,
+            "truncated": truncated,
+            "tokens_retrieved": tokens_in,
+            "tokens_packed": tokens_out,
+            "tokens_saved": max(tokens_in - tokens_out, 0),
+        }
+        logger.debug(f"Packed context: {stats}")
+        return context, stats
+
+    @staticmethod
+    def _merge_reviews(docs: list[dict[str, Any]]) -> list[tuple[dict[str, Any], str]]:
+        """Merge chunks of the same review, ordered by their best-ranked chunk.
+
+        Returns:
+            List of (metadata, merged text) per review (or per chunk without a review_id).
+        """
+        groups: dict[Any, list[dict[str, Any]]] = {}
+        for i, doc in enumerate(docs):
+            meta = doc["metadata"]
+            review_id = meta.get("review_id")
+            key = (meta.get("app_name"), review_id) if review_id is not None else i
+            groups.setdefault(key, []).append(doc)
+
+        # Dicts keep insertion order, so groups are already ranked by their first chunk
+        merged = []
+        for chunks in groups.values():
+            chunks.sort(key=lambda d: d["metadata"].get("chunk_index", 0))
+            text = chunks[0]["text"]
+            for prev, chunk in zip(chunks, chunks[1:]):
+                prev_index = prev["metadata"].get("chunk_index", 0)
+                if chunk["metadata"].get("chunk_index", 0) == prev_index + 1:
+                    text = _merge_overlap(text, chunk["text"])
+                else:
+                    text = f"{text} … {chunk['text']}"
+            merged.append((chunks[0]["metadata"], text))
+
+        return merged
+
+    def _truncate(self, metadata: dict[str, Any], text: str, budget: int) -> str | None:
+        """Cut a passage to fit a token budget, preferring a sentence boundary.
+
+        Returns:
+            Truncated passage, or None if too little budget remains.
+        """
+        header_tokens = self.count_tokens(_format_passage(metadata, ""))
+        if budget - header_tokens < self.min_passage_tokens:
+            return None
+
+        # Start from a proportional cut, then shrink until the counter agrees it fits
+        limit = int(len(text) * (budget - header_tokens) / max(self.count_tokens(text), 1))
+        while limit > 0:
+            cut = text[:limit]
+            sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+            if sentence_end > limit // 2:
+                cut = cut[: sentence_end + 1]
+            elif " " in cut:
+                cut = cut[: cut.rfind(" ")]
+            passage = _format_passage(metadata, cut.rstrip() + " …")
+            if self.count_tokens(passage) <= budget:
+                return passage
+            limit = int(limit * 0.9)
+        return None
@@ -0,0 +1,187 @@
+"""Disk-backed embedding cache keyed by content hash."""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingCache:
+    """SQLite store of float32 embeddings keyed by hash(model id + normalized text).
+
+    Entries are evicted least-recently-used once ``max_entries`` is exceeded,
+    down to ``evict_to`` of the limit. Hits only rewrite the LRU timestamp
+    when it is older than ``touch_interval``, and the row count is tracked in
+    memory (recounted once it passes the limit).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        model_id: str,
+        max_entries: int = 200_000,
+        touch_interval: float = 60.0,
+        evict_to: float = 0.95,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path.
+            model_id: Embedding model identifier, part of every key.
+            max_entries: Max cached embeddings before LRU eviction.
+            touch_interval: Min seconds between LRU timestamp updates of an entry.
+            evict_to: Share of max_entries kept after an eviction.
+        """
+        self.path = path
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.evict_to = evict_to
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._entries = self.size()  # Approximate, see _put_many
+        logger.info(f"Embedding cache opened: {path} ({self._entries} entries)")
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so trivially different copies share a key."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under the current model."""
+        payload = f"{self.model_id}\x00{self.normalize(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def embed(
+        self,
+        texts: list[str],
+        embed_fn: Callable[[list[str]], list[Any]],
+    ) -> list[np.ndarray]:
+        """Return embeddings for texts, computing only cache misses.
+
+        Args:
+            texts: Texts to embed.
+            embed_fn: Underlying embedding function for misses.
+
+        Returns:
+            One float32 vector per text, in input order.
+        """
+        keys = [self.key(t) for t in texts]
+        found = self._get_many(set(keys))
+
+        # Embed each missing key once, even if repeated in the batch
+        missing: dict[str, str] = {}
+        for k, text in zip(keys, texts):
+            if k not in found and k not in missing:
+                missing[k] = text
+
+        if missing:
+            vectors = embed_fn(list(missing.values()))
+            computed = {
+                k: np.asarray(v, dtype=np.float32) for k, v in zip(missing.keys(), vectors)
+            }
+            self._put_many(computed)
+            found.update(computed)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+
+        return [found[k] for k in keys]
+
+    def size(self) -> int:
+        """Return number of cached embeddings."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters."""
+        total = self.hits + self.misses
+        return {
+            "entries": self.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def _get_many(self, keys: set[str]) -> dict[str, np.ndarray]:
+        """Fetch cached vectors and refresh LRU timestamps older than touch_interval."""
+        if not keys:
+            return {}
+        found: dict[str, np.ndarray] = {}
+        stale: list[str] = []
+        key_list = list(keys)
+        now = time.time()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(key_list), 900):
+                part = key_list[i : i + 900]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({placeholders})",
+                    part,
+                ).fetchall()
+                for k, blob, last_used in rows:
+                    found[k] = np.frombuffer(blob, dtype=np.float32)
+                    if now - last_used > self.touch_interval:
+                        stale.append(k)
+            if stale:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, k) for k in stale],
+                )
+                self._conn.commit()
+        return found
+
+    def _put_many(self, vectors: dict[str, np.ndarray]) -> None:
+        """Store vectors and evict least-recently-used entries over the limit."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(k, v.tobytes(), now) for k, v in vectors.items()],
+            )
+            # Overcounts replaced keys and misses other processes' writes until the next recount
+            self._entries += len(vectors)
+            if self._entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries down to evict_to of the limit (caller holds the lock)."""
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if self._entries <= self.max_entries:
+            return
+        overflow = self._entries - int(self.max_entries * self.evict_to)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        )
+        self._entries -= overflow
+        logger.debug(f"Evicted {overflow} cached embeddings")
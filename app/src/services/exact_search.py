@@ -0,0 +1,182 @@
+"""Exact brute-force vector search over small filtered candidate sets."""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+from src.config.logging import get_logger
+from src.services.facets import FacetIndex
+
+logger = get_logger(__name__)
+
+
+class CandidateSet:
+    """Documents matching one metadata filter, with unit-length embeddings."""
+
+    def __init__(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        embeddings: Any,
+    ):
+        """Stack and normalize candidate embeddings.
+
+        Args:
+            ids: Candidate document ids.
+            documents: Candidate texts.
+            metadatas: Candidate metadata.
+            embeddings: One stored embedding per candidate.
+        """
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        if not ids:  # Filter matched nothing (reshape cannot infer a width from no rows)
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        else:
+            matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms > 0, norms, 1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class ExactSearch:
+    """Exact cosine search for queries whose filter leaves few candidates.
+
+    Candidate counts are estimated from the facet index, so the decision
+    costs no Chroma call. Candidate embeddings are loaded once per filter
+    and kept in a small LRU tagged with the store's data version, so repeated
+    per-app questions are a single matrix-vector product.
+    """
+
+    def __init__(self, max_candidates: int = 5000, cache_entries: int = 8):
+        """Initialize the searcher.
+
+        Args:
+            max_candidates: Largest filtered set searched exactly.
+            cache_entries: Candidate sets kept in memory (least recently used evicted).
+        """
+        self.max_candidates = max_candidates
+        self.cache_entries = cache_entries
+        self._cache: OrderedDict[str, tuple[Hashable, CandidateSet]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def applies(self, where: dict[str, Any] | None, facets: FacetIndex) -> bool:
+        """Whether a filter provably leaves at most ``max_candidates`` documents."""
+        if not where or not facets.built:
+            return False
+        estimate = self.estimate(where, facets)
+        return estimate is not None and estimate <= self.max_candidates
+
+    @classmethod
+    def estimate(cls, where: dict[str, Any], facets: FacetIndex) -> int | None:
+        """Upper bound on documents matching a where-filter (None if unknown).
+
+        Supports $in / $eq / equality on facet fields, combined with $or / $and.
+        """
+        if "$or" in where:
+            counts = [cls.estimate(clause, facets) for clause in where["$or"]]
+            return None if None in counts else sum(counts)
+        if "$and" in where:
+            counts = [c for c in (cls.estimate(clause, facets) for clause in where["$and"]) if c is not None]
+            return min(counts) if counts else None
+
+        estimate = None
+        for field, condition in where.items():
+            if not facets.covers(field):
+                return None
+            if isinstance(condition, dict):
+                if set(condition) - {"$in", "$eq"}:
+                    return None
+                values = condition.get("$in", [])
+                if "$eq" in condition:
+                    values = [condition["$eq"]]
+            else:
+                values = [condition]
+            counts = facets.counts(field)
+            count = sum(counts.get(v, 0) for v in values)
+            estimate = count if estimate is None else min(estimate, count)
+        return estimate
+
+    def candidates(
+        self,
+        where: dict[str, Any],
+        version: Hashable,
+        load: Callable[[], CandidateSet],
+    ) -> CandidateSet:
+        """Get the cached candidate set for a filter, loading it if missing or stale.
+
+        Args:
+            where: Metadata filter.
+            version: Data version the set must have been loaded at (see ``VectorStore.data_version``).
+            load: Loads the candidate set.
+        """
+        key = json.dumps(where, sort_keys=True, default=str)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == version:
+                self._cache.move_to_end(key)
+                return entry[1]
+
+        candidate_set = load()
+        with self._lock:
+            self._cache[key] = (version, candidate_set)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        logger.debug(f"Exact search candidates loaded: {len(candidate_set)} for {key}")
+        return candidate_set
+
+    @staticmethod
+    def search(
+        candidate_set: CandidateSet,
+        query_embeddings: list[Any],
+        n_results: int,
+        threshold: float,
+        include_embeddings: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """Rank candidates by cosine distance for each query embedding.
+
+        Args:
+            candidate_set: Candidates to search.
+            query_embeddings: One embedding per query.
+            n_results: Max results per query.
+            threshold: Max cosine distance (1 - cosine similarity).
+            include_embeddings: Also return each doc's (unit-length) 'embedding'.
+
+        Returns:
+            One list of docs per query, as returned by ``VectorStore.query``.
+        """
+        if not len(candidate_set):
+            return [[] for _ in query_embeddings]
+
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1)
+        distances = 1.0 - queries @ candidate_set.matrix.T
+
+        k = min(n_results, len(candidate_set))
+        results = []
+        for row in distances:
+            top = np.argpartition(row, k - 1)[:k]
+            top = top[np.argsort(row[top])]
+            docs = []
+            for j in top:
+                if row[j] > threshold:
+                    continue
+                doc = {
+                    "id": candidate_set.ids[j],
+                    "text": candidate_set.documents[j],
+                    "metadata": candidate_set.metadatas[j],
+                    "distance": float(row[j]),
+                }
+                if include_embeddings:
+                    doc["embedding"] = candidate_set.matrix[j]
+                docs.append(doc)
+            results.append(docs)
+        return results
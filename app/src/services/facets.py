@@ -0,0 +1,171 @@
+"""Metadata facet index for the vector store."""
+
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+from chromadb.api.models.Collection import Collection
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class FacetIndex:
+    """Incrementally maintained value -> count index over metadata fields.
+
+    Built once from the collection (or loaded from disk), then kept in sync
+    by the vector store on every add/delete/clear so lookups never have to
+    scan the collection.
+    """
+
+    def __init__(self, fields: Iterable[str], path: Path | None = None):
+        """Initialize an empty index.
+
+        Args:
+            fields: Metadata fields to index (e.g. app_name, category).
+            path: Optional JSON file to persist the index to.
+        """
+        self.fields = tuple(fields)
+        self.path = path
+        self.total = 0
+        self.built = False
+        # Collection write token the index reflects; a persisted index is stale once it changes
+        self.write_token: str | None = None
+        self._counts: dict[str, Counter] = {f: Counter() for f in self.fields}
+        self._lock = threading.Lock()
+
+    def covers(self, field: str) -> bool:
+        """Return whether a field is tracked by the index."""
+        return field in self._counts
+
+    def build(self, collection: Collection, page_size: int = 5000) -> None:
+        """Rebuild the index by paging through the collection's metadata.
+
+        Args:
+            collection: ChromaDB collection to scan.
+            page_size: Metadata rows fetched per request.
+        """
+        counts = {f: Counter() for f in self.fields}
+        total = 0
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            metadatas = page["metadatas"] or []
+            if not metadatas:
+                break
+            self._count_into(counts, metadatas, 1)
+            total += len(metadatas)
+            offset += len(metadatas)
+            if len(metadatas) < page_size:
+                break
+
+        with self._lock:
+            self._counts = counts
+            self.total = total
+            self.built = True
+        logger.info(f"Facet index built over {total} documents ({', '.join(self.fields)})")
+        self.save()
+
+    def load(self, expected_total: int, write_token: str | None = None) -> bool:
+        """Load a persisted index if it matches the collection's size and last write.
+
+        Args:
+            expected_total: Current collection count.
+            write_token: Current collection write token (see ``VectorStore``).
+
+        Returns:
+            True if the index was loaded, False if missing or stale.
+        """
+        if not self.path or not self.path.exists():
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read facet index {self.path}: {e}")
+            return False
+
+        if (
+            data.get("total") != expected_total
+            or data.get("write_token") != write_token
+            or set(data.get("fields", {})) != set(self.fields)
+        ):
+            logger.info("Persisted facet index is stale, rebuilding")
+            return False
+
+        with self._lock:
+            self._counts = {f: Counter(data["fields"][f]) for f in self.fields}
+            self.total = expected_total
+            self.write_token = write_token
+            self.built = True
+        logger.info(f"Facet index loaded from {self.path}")
+        return True
+
+    def save(self) -> None:
+        """Persist the index to disk (no-op without a path or before build)."""
+        if not self.path or not self.built:
+            return
+        with self._lock:
+            data = {
+                "total": self.total,
+                "write_token": self.write_token,
+                "fields": {f: dict(c) for f, c in self._counts.items()},
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist facet index {self.path}: {e}")
+
+    def add(self, metadatas: list[dict[str, Any]]) -> None:
+        """Count newly added documents."""
+        with self._lock:
+            self._count_into(self._counts, metadatas, 1)
+            self.total += len(metadatas)
+
+    def remove(self, metadatas: list[dict[str, Any]]) -> None:
+        """Uncount deleted (or replaced) documents."""
+        with self._lock:
+            self._count_into(self._counts, metadatas, -1)
+            self.total = max(0, self.total - len(metadatas))
+
+    def reset(self) -> None:
+        """Empty the index (collection was cleared)."""
+        with self._lock:
+            self._counts = {f: Counter() for f in self.fields}
+            self.total = 0
+            self.built = True
+
+    def values(self, field: str) -> set[Any]:
+        """Return the distinct values of a field."""
+        with self._lock:
+            return {v for v, n in self._counts[field].items() if n > 0}
+
+    def counts(self, field: str) -> dict[Any, int]:
+        """Return value -> document count for a field."""
+        with self._lock:
+            return {v: n for v, n in self._counts[field].items() if n > 0}
+
+    @staticmethod
+    def _count_into(
+        counts: dict[str, Counter],
+        metadatas: list[dict[str, Any]],
+        sign: int,
+    ) -> None:
+        """Add (sign=1) or subtract (sign=-1) metadata values into counters."""
+        for meta in metadatas:
+            if not meta:
+                continue
+            for field, counter in counts.items():
+                value = meta.get(field)
+                if value is None:
+                    continue
+                counter[value] += sign
+                if counter[value] <= 0:
+                    del counter[value]
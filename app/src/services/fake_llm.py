@@ -0,0 +1,204 @@
+"""Deterministic stand-in chat model for offline runs and latency benchmarks."""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.services.llm import content_text
+
+# Match SOURCE_SELECTION_PROMPT and RAG_PROMPT (src/prompts/templates.py)
+_SOURCE_SELECTION = re.compile(r"Apps:\n(?P<sources>.*?)\n\nQuestion:\n(?P<query>.*?)\n\nReturn format", re.DOTALL)
+_RAG = re.compile(r"Reviews:\n(?P<context>.*)\n\nQuestion: (?P<question>.*?)\n\nAnswer:", re.DOTALL)
+_REVIEW_HEADER = re.compile(r"^\[(?P<app>.+?) - [^\]]*★\]$", re.MULTILINE)
+_TOKEN = re.compile(r"\S+\s*")
+
+# Tool picked for the user's message by keyword; search_reviews otherwise
+_TOOL_KEYWORDS = {
+    "list_available_apps": ("which apps", "what apps", "available apps", "list apps", "list the apps"),
+    "get_collection_stats": ("how many", "statistic", "stats", "categories"),
+}
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers the app's prompts deterministically, with simulated latency.
+
+    Source selection prompts get the listed apps named in the question (or
+    "none"), RAG prompts an answer built from the review excerpts. With
+    tools bound (the agent), a user message gets a tool call picked by
+    keyword and a tool result gets a summary of it. Every response waits
+    ``latency_seconds`` before the first token, then streams at
+    ``tokens_per_second`` (one token per word), so the pipeline's own
+    overhead can be measured without a provider.
+    """
+
+    model: str = "fake"
+    max_tokens: int = 1000
+    answer_tokens: int = 120
+    latency_seconds: float = 0.5
+    tokens_per_second: float = 50.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "answer_tokens": self.answer_tokens,
+            "latency_seconds": self.latency_seconds,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable:
+        """Bind tools; their schemas are passed back to ``_generate`` / ``_stream``."""
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._respond(messages, kwargs.get("tools"))
+        time.sleep(self._duration(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._respond(messages, kwargs.get("tools"))
+        await asyncio.sleep(self._duration(message))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages, kwargs.get("tools"))
+        time.sleep(self.latency_seconds)
+        for chunk, delay in self._chunks(message):
+            time.sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._respond(messages, kwargs.get("tools"))
+        await asyncio.sleep(self.latency_seconds)
+        for chunk, delay in self._chunks(message):
+            await asyncio.sleep(delay)
+            yield chunk
+
+    def _respond(self, messages: list[BaseMessage], tools: list[dict] | None) -> AIMessage:
+        """Build the response to a conversation (no waiting)."""
+        last = messages[-1]
+        text = content_text(last.content)
+
+        if tools and isinstance(last, HumanMessage):
+            return self._tool_call(text, tools)
+        if isinstance(last, ToolMessage):
+            return AIMessage(content=self._truncate(text))
+
+        match = _SOURCE_SELECTION.search(text)
+        if match:
+            return AIMessage(content=self._select_sources(match["sources"], match["query"]))
+        match = _RAG.search(text)
+        if match:
+            return AIMessage(content=self._answer(match["context"]))
+        return AIMessage(content=self._truncate(text))
+
+    @staticmethod
+    def _select_sources(sources: str, query: str) -> str:
+        """Apps from the list whose name appears in the question, or "none"."""
+        query = query.lower()
+        selected = [app for app in sources.split(", ") if app and app.lower() in query]
+        return ", ".join(selected) or "none"
+
+    def _answer(self, context: str) -> str:
+        """Answer made of the review excerpts, naming the reviewed apps."""
+        apps = list(dict.fromkeys(_REVIEW_HEADER.findall(context)))
+        excerpts = _REVIEW_HEADER.sub("", context).split()
+        if not excerpts:
+            return "The reviews don't contain relevant information to answer this question."
+        intro = f"Based on reviews of {', '.join(apps)}, users mention:" if apps else "Reviews mention:"
+        return self._truncate(f"{intro} {' '.join(excerpts)}")
+
+    def _tool_call(self, text: str, tools: list[dict]) -> AIMessage:
+        """Call the tool matching the user's message, passing it as every argument."""
+        functions = {tool["function"]["name"]: tool["function"] for tool in tools}
+        lowered = text.lower()
+        name = next(
+            (
+                tool for tool, keywords in _TOOL_KEYWORDS.items()
+                if tool in functions and any(keyword in lowered for keyword in keywords)
+            ),
+            "search_reviews" if "search_reviews" in functions else next(iter(functions)),
+        )
+        properties = functions[name].get("parameters", {}).get("properties", {})
+        call_id = "call_" + hashlib.sha256(f"{name}:{text}".encode("utf-8")).hexdigest()[:16]
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": {arg: text for arg in properties}, "id": call_id, "type": "tool_call"}],
+        )
+
+    def _truncate(self, text: str) -> str:
+        """Limit text to the answer length (and max tokens)."""
+        tokens = _TOKEN.findall(text)
+        return "".join(tokens[: min(self.answer_tokens, self.max_tokens)]).strip()
+
+    def _token_count(self, message: AIMessage) -> int:
+        """Simulated output tokens of a response (words; tool calls count their arguments)."""
+        if message.tool_calls:
+            return 1 + sum(len(str(value).split()) for call in message.tool_calls for value in call["args"].values())
+        return len(message.content.split())
+
+    def _duration(self, message: AIMessage) -> float:
+        """Simulated time to produce a whole response."""
+        return self.latency_seconds + self._token_count(message) / self.tokens_per_second
+
+    def _chunks(self, message: AIMessage) -> Iterator[tuple[ChatGenerationChunk, float]]:
+        """Stream chunks of a response, each with the delay before it."""
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[{
+                    "name": call["name"],
+                    "args": json.dumps(call["args"]),
+                    "id": call["id"],
+                    "index": 0,
+                }],
+            )
+            yield ChatGenerationChunk(message=chunk), self._token_count(message) / self.tokens_per_second
+            return
+        for token in _TOKEN.findall(message.content):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token)), 1 / self.tokens_per_second
@@ -1,28 +1,77 @@
 """Ingestion service for text data."""
 
+import csv
+import hashlib
+import io
+import json
+import threading
+from collections import Counter
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
+from src.services.checkpoints import CheckpointStore, IngestCheckpoint
+from src.services.pipeline import IngestionPipeline
 from src.services.vector_store import VectorStore
 from src.config.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Metadata columns every review file must provide (besides text and id)
+REVIEW_COLUMNS = ["app_name", "category", "rating", "review_date", "helpful_count"]
+
+# Supported file suffixes (see IngestionService.readers)
+FILE_FORMATS = (".csv", ".parquet", ".arrow", ".feather", ".ipc")
+
+# Chunk metadata left out of the content hash: where the chunk was ingested
+# from (a dated export name would otherwise rewrite every chunk) and values
+# derived from the text or the hash itself
+UNHASHED_METADATA = frozenset({"source", "content_hash", "chunk_index", "total_chunks"})
+
 
 class IngestionService:
     """Handles ingestion of raw text data into a vector store."""
 
     def __init__(
-        self, vector_store: VectorStore, chunk_size: int = 500, chunk_overlap: int = 100
+        self,
+        vector_store: VectorStore,
+        chunk_size: int = 500,
+        chunk_overlap: int = 100,
+        read_rows: int | None = None,
+        pipeline: IngestionPipeline | None = None,
+        checkpoints: CheckpointStore | None = None,
     ):
-        """Initialize with vector store and chunking config."""
+        """Initialize with vector store and chunking config.
+
+        Args:
+            vector_store: Target vector store.
+            chunk_size: Characters per text chunk.
+            chunk_overlap: Overlap between text chunks.
+            read_rows: Rows per streamed file read (None = load whole file).
+            pipeline: Optional pipeline running chunk/embed/write concurrently.
+            checkpoints: Optional store recording committed batches for resume.
+        """
         self.vector_store = vector_store
+        self.read_rows = read_rows
+        self.pipeline = pipeline
+        self.checkpoints = checkpoints
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
         )
+        # File suffix -> frame reader
+        self.readers: dict[str, Callable[[Path, list[str]], Iterable[pd.DataFrame]]] = {
+            ".csv": self._csv_frames,
+            ".parquet": self._parquet_frames,
+            ".arrow": self._arrow_frames,
+            ".feather": self._arrow_frames,
+            ".ipc": self._arrow_frames,
+        }
 
     def ingest_text(
         self,
@@ -78,25 +127,11 @@ class IngestionService:
         total = 0  # total number of added documents (chunks)
 
         for i in range(0, len(raw_texts), batch_size):
-            batch_chunks = []
-            batch_metadatas = []
-            batch_ids = [] if ids else None
-
-            for j in range(i, min(i + batch_size, len(raw_texts))):
-                chunks = self.splitter.split_text(raw_texts[j])
-
-                for k, chunk in enumerate(chunks):
-                    batch_chunks.append(chunk)
-                    batch_metadatas.append(
-                        {
-                            **metadatas[j],
-                            "chunk_index": k,
-                            "total_chunks": len(chunks),
-                        }
-                    )
-                    # Generate chunk ID if ids are provided
-                    if ids is not None:
-                        batch_ids.append(f"{ids[j]}_chunk_{k}")
+            batch_chunks, batch_metadatas, batch_ids = self._chunk_texts(
+                raw_texts[i : i + batch_size],
+                metadatas[i : i + batch_size],
+                ids[i : i + batch_size] if ids is not None else None,
+            )
 
             total += self.vector_store.add_documents(
                 documents=batch_chunks,
@@ -106,7 +141,179 @@ class IngestionService:
 
         return total
 
-    def ingest_csv(
+    def _chunk_texts(
+        self,
+        raw_texts: list[str],
+        metadatas: list[dict],
+        ids: list[str] | None = None,
+    ) -> tuple[list[str], list[dict], list[str] | None]:
+        """Split texts into chunks with per-chunk metadata and ids.
+
+        Args:
+            raw_texts: Texts to chunk.
+            metadatas: Metadata for each text.
+            ids: Optional id for each text.
+        Returns:
+            Tuple of (chunks, chunk metadatas, chunk ids or None).
+        """
+        batch_chunks = []
+        batch_metadatas = []
+        batch_ids = [] if ids is not None else None
+
+        for j, raw_text in enumerate(raw_texts):
+            chunks = self.splitter.split_text(raw_text)
+
+            for k, chunk in enumerate(chunks):
+                chunk_metadata = {
+                    **metadatas[j],
+                    "chunk_index": k,
+                    "total_chunks": len(chunks),
+                }
+                chunk_metadata["content_hash"] = self._content_hash(chunk, chunk_metadata)
+                batch_chunks.append(chunk)
+                batch_metadatas.append(chunk_metadata)
+                # Generate chunk ID if ids are provided
+                if ids is not None:
+                    batch_ids.append(f"{ids[j]}_chunk_{k}")
+
+        return batch_chunks, batch_metadatas, batch_ids
+
+    @staticmethod
+    def _content_hash(text: str, metadata: dict[str, Any]) -> str:
+        """Hash of chunk text and metadata (except ``UNHASHED_METADATA``), used for change detection."""
+        hashed = {key: value for key, value in metadata.items() if key not in UNHASHED_METADATA}
+        payload = json.dumps([text, hashed], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def upsert_texts(
+        self,
+        raw_texts: list[str],
+        metadatas: list[dict],
+        ids: list[str],
+        batch_size: int = 500,
+        seen_ids: set[str] | None = None,
+    ) -> dict[str, int]:
+        """Incrementally ingest texts, writing only new or changed chunks.
+
+        Chunk ids are deterministic (``{id}_chunk_{k}``), so each chunk's
+        stored content hash tells whether it changed. Changed chunks are
+        re-embedded only if their text changed; metadata-only changes are
+        written without embedding. Chunks left over from a previously longer
+        version of a text are deleted.
+
+        Args:
+            raw_texts: List of texts to chunk and ingest.
+            metadatas: Metadata for each text.
+            ids: Id for each text (required for change detection).
+            batch_size: Amount to process per batch.
+            seen_ids: Optional set collecting every chunk id produced.
+        Returns:
+            Dict with chunks_added, chunks_updated (metadata only),
+            chunks_unchanged and chunks_deleted.
+        """
+        if len(raw_texts) != len(metadatas) or len(raw_texts) != len(ids):
+            raise ValueError("Length of raw_texts, metadatas and ids must be the same.")
+
+        totals: Counter = Counter()
+        lock = threading.Lock()
+
+        for i in range(0, len(raw_texts), batch_size):
+            chunks, chunk_metadatas, chunk_ids = self._changed_chunks(
+                *self._chunk_texts(
+                    raw_texts[i : i + batch_size],
+                    metadatas[i : i + batch_size],
+                    ids[i : i + batch_size],
+                ),
+                totals=totals,
+                lock=lock,
+                seen_ids=seen_ids,
+            )
+            if chunks:
+                totals["chunks_added"] += self.vector_store.upsert_documents(
+                    documents=chunks,
+                    metadatas=chunk_metadatas,
+                    ids=chunk_ids,
+                )
+
+        return {
+            "chunks_added": totals["chunks_added"],
+            "chunks_updated": totals["chunks_updated"],
+            "chunks_unchanged": totals["chunks_unchanged"],
+            "chunks_deleted": totals["chunks_deleted"],
+        }
+
+    def _changed_chunks(
+        self,
+        chunks: list[str],
+        metadatas: list[dict],
+        ids: list[str],
+        totals: Counter,
+        lock: threading.Lock,
+        seen_ids: set[str] | None = None,
+    ) -> tuple[list[str], list[dict], list[str]]:
+        """Drop unchanged chunks, update metadata-only changes and delete orphaned chunks.
+
+        Args:
+            chunks: Chunk texts.
+            metadatas: Chunk metadatas (with content_hash).
+            ids: Chunk ids.
+            totals: Counter updated with chunks_updated / chunks_unchanged / chunks_deleted.
+            lock: Guards totals and seen_ids across pipeline workers.
+            seen_ids: Optional set collecting every chunk id produced.
+        Returns:
+            Tuple of (chunks, metadatas, ids) that are new or whose text changed.
+        """
+        existing = self.vector_store.get_metadatas(ids)
+
+        changed = [
+            i for i, (chunk_id, meta) in enumerate(zip(ids, metadatas))
+            if existing.get(chunk_id, {}).get("content_hash") != meta["content_hash"]
+        ]
+
+        # Stored chunks whose text is unchanged only need their metadata rewritten
+        stored_texts = self.vector_store.get_documents([ids[i] for i in changed if ids[i] in existing])
+        relabeled = [i for i in changed if stored_texts.get(ids[i]) == chunks[i]]
+        if relabeled:
+            self.vector_store.update_metadatas([ids[i] for i in relabeled], [metadatas[i] for i in relabeled])
+            relabeled_set = set(relabeled)
+            changed = [i for i in changed if i not in relabeled_set]
+
+        # Texts that now split into fewer chunks leave trailing chunks behind
+        orphan_ids = []
+        for chunk_id, meta in zip(ids, metadatas):
+            if meta["chunk_index"] != 0 or chunk_id not in existing:
+                continue
+            parent_id = chunk_id.rsplit("_chunk_", 1)[0]
+            previous_total = existing[chunk_id].get("total_chunks", 0)
+            orphan_ids.extend(
+                f"{parent_id}_chunk_{k}" for k in range(meta["total_chunks"], previous_total)
+            )
+        deleted = self.vector_store.delete_documents(orphan_ids) if orphan_ids else 0
+
+        with lock:
+            totals["chunks_updated"] += len(relabeled)
+            totals["chunks_unchanged"] += len(ids) - len(changed) - len(relabeled)
+            totals["chunks_deleted"] += deleted
+            if seen_ids is not None:
+                seen_ids.update(ids)
+
+        return (
+            [chunks[i] for i in changed],
+            [metadatas[i] for i in changed],
+            [ids[i] for i in changed],
+        )
+
+    def _prune_missing(self, seen_ids: set[str], source: str) -> int:
+        """Delete chunks of a source whose id was not produced by the last full run of it."""
+        orphan_ids = [
+            doc_id for doc_id in self.vector_store.iter_ids(where={"source": source})
+            if doc_id not in seen_ids
+        ]
+        if orphan_ids:
+            logger.info(f"Pruning {len(orphan_ids):,} chunks missing from {source}")
+        return self.vector_store.delete_documents(orphan_ids)
+
+    def ingest_file(
         self,
         file_path: Path,
         text_column: str = "enriched_text",
@@ -114,96 +321,500 @@ class IngestionService:
         batch_size: int = 500,
         clear_existing: bool = False,
         limit: int | None = None,
+        incremental: bool = False,
+        on_progress: Callable[[int, int], None] | None = None,
+        resume: bool = False,
+        prune_missing: bool = False,
+        source: str | None = None,
     ) -> dict[str, Any]:
-        """Ingest a preprocessed CSV file.
+        """Ingest a preprocessed CSV, Parquet or Arrow IPC file.
+
+        Only the required columns are read. When ``read_rows`` is set CSV
+        files are streamed in chunks of that many rows and Parquet files in
+        record batches, so memory stays flat regardless of file size.
 
         Args:
-            file_path: Path to a preprocessed CSV file.
+            file_path: Path to a preprocessed file (.csv, .parquet, .arrow/.feather/.ipc).
             text_column: column name for the documents.
             id_column: column name for the ids.
             batch_size: Amount to process per batch.
             clear_existing: Whether to clear any existing collection.
             limit: Maximum number of rows to ingest.
+            incremental: Upsert only new/changed chunks and delete orphaned ones.
+            on_progress: Optional callback(rows, chunks) after each batch; raising aborts.
+            resume: Skip batches committed by a previous failed run of the same file.
+            prune_missing: Also delete chunks of this source whose rows are no
+                longer in the file (incremental, no limit).
+            source: Label stored on every chunk as ``source`` (defaults to the file name).
         Returns:
             Dict with ingestion stats.
         """
 
         if not file_path.exists():
-            raise FileNotFoundError(f"CSV not found: {file_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        suffix = file_path.suffix.lower()
+        if suffix not in self.readers:
+            raise ValueError(f"Unsupported file type: {suffix}")
+
+        required = [text_column, id_column, *REVIEW_COLUMNS]
+        frames = self.readers[suffix](file_path, required)
+
+        checkpoint = self._open_checkpoint(
+            file_path,
+            batch_size=batch_size,
+            resume=resume,
+            params={"text_column": text_column, "id_column": id_column},
+        )
+
+        return self._ingest_source(
+            frames,
+            source=source or file_path.name,
+            text_column=text_column,
+            id_column=id_column,
+            batch_size=batch_size,
+            clear_existing=clear_existing,
+            limit=limit,
+            incremental=incremental,
+            prune_missing=prune_missing,
+            on_progress=on_progress,
+            checkpoint=checkpoint,
+        )
+
+    def ingest_csv(self, file_path: Path, **kwargs: Any) -> dict[str, Any]:
+        """Ingest a preprocessed CSV file (see ``ingest_file`` for arguments)."""
+        return self.ingest_file(file_path, **kwargs)
+
+    def _csv_frames(self, file_path: Path, required: list[str]) -> Iterable[pd.DataFrame]:
+        """Read the required CSV columns, whole or in ``read_rows`` chunks."""
+        # Validate required columns from the header only
+        header = pd.read_csv(file_path, nrows=0)
+        self._validate_columns(header.columns, required)
+
+        if self.read_rows:
+            logger.info(f"Streaming CSV: {file_path} ({self.read_rows:,} rows per read)")
+            return pd.read_csv(file_path, usecols=required, chunksize=self.read_rows)
 
         logger.info(f"Loading CSV: {file_path}")
-        df = pd.read_csv(file_path)
-        logger.info(f"Loaded {len(df):,} rows")
-
-        # Validate required columns
-        required = [
-            text_column,
-            id_column,
-            "app_name",
-            "category",
-            "rating",
-            "review_date",
-            "helpful_count",
-        ]
-        missing = [col for col in required if col not in df.columns]
+        return [pd.read_csv(file_path, usecols=required)]
+
+    def _parquet_frames(self, file_path: Path, required: list[str]) -> Iterator[pd.DataFrame]:
+        """Lazily read the required Parquet columns, row group by row group."""
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        self._validate_columns(parquet_file.schema_arrow.names, required)
+        logger.info(
+            f"Streaming Parquet: {file_path} "
+            f"({parquet_file.metadata.num_rows:,} rows, {parquet_file.num_row_groups} row groups)"
+        )
+
+        def frames() -> Iterator[pd.DataFrame]:
+            for batch in parquet_file.iter_batches(
+                batch_size=self.read_rows or 65_536,
+                columns=required,
+            ):
+                yield batch.to_pandas()
+
+        return frames()
+
+    def _arrow_frames(self, file_path: Path, required: list[str]) -> Iterator[pd.DataFrame]:
+        """Lazily read the required columns of a memory-mapped Arrow IPC file."""
+        source = pa.memory_map(str(file_path), "r")
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            source.seek(0)
+            reader = pa.ipc.open_stream(source)  # IPC stream format
+            batches = iter(reader)
+
+        self._validate_columns(reader.schema.names, required)
+        logger.info(f"Streaming Arrow IPC: {file_path}")
+
+        def frames() -> Iterator[pd.DataFrame]:
+            try:
+                for batch in batches:
+                    yield batch.select(required).to_pandas()
+            finally:
+                source.close()
+
+        return frames()
+
+    def ingest_csv_stream(
+        self,
+        stream: BinaryIO,
+        source: str,
+        text_column: str = "enriched_text",
+        id_column: str = "review_id",
+        batch_size: int = 500,
+        clear_existing: bool = False,
+        limit: int | None = None,
+        incremental: bool = False,
+        on_progress: Callable[[int, int], None] | None = None,
+        prune_missing: bool = False,
+    ) -> dict[str, Any]:
+        """Ingest CSV records from a binary stream as they arrive.
+
+        Records are parsed ``batch_size`` rows at a time, so indexing starts
+        with the first batch and nothing is spilled to disk. Streams cannot
+        be checkpointed (there is no file to fingerprint up front).
+
+        Args:
+            stream: Readable binary stream of CSV data (e.g. a request body).
+            source: Label reported as the ingested file and stored on every chunk.
+            text_column: column name for the documents.
+            id_column: column name for the ids.
+            batch_size: Amount to process per batch.
+            clear_existing: Whether to clear any existing collection.
+            limit: Maximum number of rows to ingest.
+            incremental: Upsert only new/changed chunks and delete orphaned ones.
+            on_progress: Optional callback(rows, chunks) after each batch; raising aborts.
+            prune_missing: Also delete chunks of this source whose rows are no
+                longer in the stream (incremental, no limit).
+        Returns:
+            Dict with ingestion stats.
+        """
+        buffered = io.BufferedReader(stream) if isinstance(stream, io.RawIOBase) else stream
+
+        # Validate required columns from the header line
+        header_line = buffered.readline().decode("utf-8-sig")
+        columns = next(csv.reader([header_line]), [])
+        required = [text_column, id_column, *REVIEW_COLUMNS]
+        self._validate_columns(columns, required)
+
+        logger.info(f"Streaming CSV upload: {source} ({batch_size:,} rows per read)")
+        frames = pd.read_csv(
+            buffered,
+            header=None,
+            names=columns,
+            usecols=required,
+            chunksize=batch_size,
+        )
+
+        return self._ingest_source(
+            frames,
+            source=source,
+            text_column=text_column,
+            id_column=id_column,
+            batch_size=batch_size,
+            clear_existing=clear_existing,
+            limit=limit,
+            incremental=incremental,
+            prune_missing=prune_missing,
+            on_progress=on_progress,
+        )
+
+    @staticmethod
+    def _validate_columns(columns: Iterable[str], required: list[str]) -> None:
+        """Raise ValueError if any required column is missing."""
+        available = set(columns)
+        missing = [col for col in required if col not in available]
         if missing:
             raise ValueError(f"Missing columns: {missing}")
 
-        # Drop rows with missing text
-        df = df.dropna(subset=[text_column])
-        logger.info(f"After dropna: {len(df):,} rows")
-
-        # Apply limit if specified
-        if limit is not None:
-            df = df.head(limit)
-            logger.info(f"Limited to: {len(df):,} rows")
+    def _ingest_source(
+        self,
+        frames: Iterable[pd.DataFrame],
+        source: str,
+        text_column: str,
+        id_column: str,
+        batch_size: int,
+        clear_existing: bool,
+        limit: int | None,
+        incremental: bool,
+        on_progress: Callable[[int, int], None] | None,
+        checkpoint: IngestCheckpoint | None = None,
+        prune_missing: bool = False,
+    ) -> dict[str, Any]:
+        """Clear (if asked), ingest frames and build the result dict."""
+        if prune_missing and (not incremental or limit is not None):
+            raise ValueError("prune_missing requires incremental ingestion without a limit.")
 
         # whether we want to clear the existing collection or not
         if clear_existing:
-            self.vector_store.clear()
-
-        documents = []
-        ids = []
-        metadatas = []
-
-        for _, row in df.iterrows():
-            # Extract review text after header
-            enriched_review = row[text_column]
-            review = enriched_review.split("USER REVIEW: ")[-1]
-
-            review_id = int(row[id_column])
-            doc_id = f"com.{row['app_name']}_{review_id}"
-
-            metadata = {
-                "review_id": review_id,
-                "app_name": row["app_name"],
-                "category": row["category"],
-                "rating": int(row["rating"]),
-                "date": str(row["review_date"]),
-                "helpful_count": int(row["helpful_count"]),
-            }
-
-            documents.append(review)
-            metadatas.append(metadata)
-            ids.append(doc_id)
+            if checkpoint is not None and checkpoint.committed:
+                logger.warning("Resuming a checkpointed ingest, ignoring clear_existing")
+            else:
+                self.vector_store.clear()
+
+        # Writes keep loaded indexes (facets, lexical) in sync; the session replaces the
+        # collection's write token once for the run and persists the indexes at the end
+        self.vector_store.load_indexes()
+        with self.vector_store.write_session():
+            result = self._ingest_frames(
+                frames,
+                source=source,
+                text_column=text_column,
+                id_column=id_column,
+                batch_size=batch_size,
+                limit=limit,
+                incremental=incremental,
+                prune_missing=prune_missing,
+                on_progress=on_progress,
+                checkpoint=checkpoint,
+            )
+        if checkpoint is not None:
+            checkpoint.complete()
 
-        # Ingest with chunking
-        chunks_added = self.batch_ingest_texts(
-            raw_texts=documents,
-            metadatas=metadatas,
-            ids=ids,
-            batch_size=batch_size,
+        logger.info(
+            f"Ingestion complete: {result['chunks_added']} chunks from {result['rows_loaded']} rows"
         )
 
-        logger.info(f"Ingestion complete: {chunks_added} chunks from {len(df)} rows")
-
         return {
-            "file": str(file_path),
-            "rows_loaded": len(df),
-            "chunks_added": chunks_added,
+            "file": source,
+            **result,
             "collection_count": self.vector_store.count(),
         }
 
+    def _open_checkpoint(
+        self,
+        file_path: Path,
+        batch_size: int,
+        resume: bool,
+        params: dict[str, Any],
+    ) -> IngestCheckpoint | None:
+        """Open the checkpoint manifest for a file (None if checkpoints are off)."""
+        if self.checkpoints is None:
+            if resume:
+                raise ValueError("Resume requires ingestion checkpoints to be enabled.")
+            return None
+        return self.checkpoints.open(
+            file_path,
+            batch_size=batch_size,
+            resume=resume,
+            params={
+                **params,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+                "read_rows": self.read_rows,  # Batches never span a read
+            },
+        )
+
+    def _ingest_frames(
+        self,
+        frames: Iterable[pd.DataFrame],
+        source: str,
+        text_column: str,
+        id_column: str,
+        batch_size: int,
+        limit: int | None,
+        incremental: bool = False,
+        prune_missing: bool = False,
+        on_progress: Callable[[int, int], None] | None = None,
+        checkpoint: IngestCheckpoint | None = None,
+    ) -> dict[str, Any]:
+        """Ingest an iterable of DataFrame chunks.
+
+        Args:
+            frames: DataFrames holding the required columns.
+            source: Label stored on every chunk as ``source``.
+            text_column: column name for the documents.
+            id_column: column name for the ids.
+            batch_size: Amount to process per batch.
+            limit: Maximum number of rows to ingest.
+            incremental: Upsert only new/changed chunks and delete orphaned ones.
+            prune_missing: Delete chunks of the source not produced by this run.
+            on_progress: Optional callback(rows, chunks) after each batch.
+            checkpoint: Optional checkpoint; committed batches are skipped and
+                newly written ones recorded.
+        Returns:
+            Dict with rows_loaded and chunks_added (plus stage stats when pipelined).
+        """
+        skip = set(checkpoint.committed) if checkpoint is not None else set()
+        offset_batches = self._iter_record_batches(
+            frames, source, text_column, id_column, batch_size, limit, skip=skip
+        )
+
+        # Pruning needs every id of the source, so not when resuming past batches
+        if prune_missing and skip:
+            logger.warning(f"Resuming {source}: skipped batches are unknown, not pruning")
+        seen_ids: set[str] | None = set() if prune_missing and not skip else None
+
+        # Row offset of each batch, in the order the pipeline numbers them
+        offsets: list[int] = []
+
+        def batches() -> Iterator[tuple[list[str], list[dict[str, Any]], list[str]]]:
+            for offset, batch in offset_batches:
+                offsets.append(offset)
+                yield batch
+
+        on_commit = (lambda seq: checkpoint.commit(offsets[seq])) if checkpoint is not None else None
+
+        if self.pipeline is not None:
+            if incremental:
+                totals: Counter = Counter()
+                lock = threading.Lock()
+                result = self.pipeline.run(
+                    batches(),
+                    chunk=lambda documents, metadatas, ids: self._changed_chunks(
+                        *self._chunk_texts(documents, metadatas, ids),
+                        totals=totals,
+                        lock=lock,
+                        seen_ids=seen_ids,
+                    ),
+                    embed=self.vector_store.embed,
+                    write=lambda documents, metadatas, ids, embeddings: self.vector_store.upsert_documents(
+                        documents=documents,
+                        metadatas=metadatas,
+                        ids=ids,
+                        embeddings=embeddings,
+                    ),
+                    on_progress=on_progress,
+                    on_commit=on_commit,
+                )
+                result["chunks_updated"] = totals["chunks_updated"]
+                result["chunks_unchanged"] = totals["chunks_unchanged"]
+                result["chunks_deleted"] = totals["chunks_deleted"]
+            else:
+                result = self.pipeline.run(
+                    batches(),
+                    chunk=self._chunk_texts,
+                    embed=self.vector_store.embed,
+                    write=lambda documents, metadatas, ids, embeddings: self.vector_store.add_documents(
+                        documents=documents,
+                        metadatas=metadatas,
+                        ids=ids,
+                        embeddings=embeddings,
+                    ),
+                    on_progress=on_progress,
+                    on_commit=on_commit,
+                )
+        else:
+            result = Counter()
+            for offset, (documents, metadatas, ids) in offset_batches:
+                if incremental:
+                    result.update(
+                        self.upsert_texts(
+                            raw_texts=documents,
+                            metadatas=metadatas,
+                            ids=ids,
+                            batch_size=batch_size,
+                            seen_ids=seen_ids,
+                        )
+                    )
+                else:
+                    result["chunks_added"] += self.batch_ingest_texts(
+                        raw_texts=documents,
+                        metadatas=metadatas,
+                        ids=ids,
+                        batch_size=batch_size,
+                    )
+                if checkpoint is not None:
+                    checkpoint.commit(offset)
+                result["rows_loaded"] += len(documents)
+                logger.info(f"Ingested {result['rows_loaded']:,} rows ({result['chunks_added']:,} chunks)")
+                if on_progress is not None:
+                    on_progress(result["rows_loaded"], result["chunks_added"])
+            result = {"rows_loaded": 0, "chunks_added": 0, **result}
+
+        if seen_ids is not None:
+            result["chunks_deleted"] = result.get("chunks_deleted", 0) + self._prune_missing(seen_ids, source)
+        if skip:
+            result["batches_skipped"] = len(skip)
+
+        return result
+
+    def _iter_record_batches(
+        self,
+        frames: Iterable[pd.DataFrame],
+        source: str,
+        text_column: str,
+        id_column: str,
+        batch_size: int,
+        limit: int | None,
+        skip: set[int] | None = None,
+    ) -> Iterator[tuple[int, tuple[list[str], list[dict[str, Any]], list[str]]]]:
+        """Yield (row offset, (documents, metadatas, ids)) batches of at most batch_size rows.
+
+        Args:
+            frames: DataFrames holding the required columns.
+            source: Label stored on every record as ``source``.
+            text_column: column name for the documents.
+            id_column: column name for the ids.
+            batch_size: Rows per yielded batch.
+            limit: Maximum number of rows to yield.
+            skip: Row offsets of batches to skip (already committed).
+        """
+        rows = 0
+        skip = skip or set()
+
+        for df in frames:
+            # Drop rows with missing text
+            df = df.dropna(subset=[text_column])
+
+            # Apply limit if specified
+            if limit is not None:
+                df = df.head(limit - rows)
+
+            pending = [i for i in range(0, len(df), batch_size) if rows + i not in skip]
+            if pending:
+                documents, metadatas, ids = self._prepare_records(df, source, text_column, id_column)
+                for i in pending:
+                    yield rows + i, (
+                        documents[i : i + batch_size],
+                        metadatas[i : i + batch_size],
+                        ids[i : i + batch_size],
+                    )
+            rows += len(df)
+
+            if limit is not None and rows >= limit:
+                break
+
+    @staticmethod
+    def _prepare_records(
+        df: pd.DataFrame,
+        source: str,
+        text_column: str,
+        id_column: str,
+    ) -> tuple[list[str], list[dict[str, Any]], list[str]]:
+        """Build review texts, metadatas and ids with column operations.
+
+        Args:
+            df: DataFrame holding the required columns (no missing text).
+            source: Label stored on every record as ``source``.
+            text_column: column name for the documents.
+            id_column: column name for the ids.
+        Returns:
+            Tuple of (documents, metadatas, ids).
+        """
+        # Extract review text after header
+        reviews = df[text_column].astype(str).str.rsplit("USER REVIEW: ", n=1).str[-1]
+
+        review_ids = df[id_column].astype(int)
+        doc_ids = "com." + df["app_name"].astype(str) + "_" + review_ids.astype(str)
+
+        metadatas = pd.DataFrame(
+            {
+                "review_id": review_ids,
+                "app_name": df["app_name"],
+                "category": df["category"],
+                "rating": df["rating"].astype(int),
+                "date": df["review_date"].astype(str),
+                "helpful_count": df["helpful_count"].astype(int),
+                "source": source,
+            }
+        ).to_dict("records")
+
+        return reviews.tolist(), metadatas, doc_ids.tolist()
+
+    @staticmethod
+    def estimate_rows(file_path: Path) -> int | None:
+        """Estimate data rows in a file, for progress ETAs.
+
+        Parquet row counts come from file metadata. CSVs are estimated by
+        counting newlines (minus the header); quoted multi-line fields make
+        that an overestimate.
+        """
+        if file_path.suffix.lower() == ".parquet":
+            return pq.ParquetFile(file_path).metadata.num_rows
+        if file_path.suffix.lower() != ".csv":
+            return None  # Unknown without reading the file
+
+        lines = 0
+        with open(file_path, "rb") as f:
+            while block := f.read(1 << 20):
+                lines += block.count(b"\n")
+        return max(0, lines - 1)
+
     def get_stats(self) -> dict[str, Any]:
         """Get current ingestion stats.
 
@@ -0,0 +1,194 @@
+"""Background ingestion jobs."""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class JobStatus(str, Enum):
+    """Ingestion job lifecycle state."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's work when cancellation was requested."""
+
+
+class IngestJob:
+    """State and progress of one background ingestion."""
+
+    def __init__(self, description: str, total_rows: int | None = None):
+        """Initialize a queued job.
+
+        Args:
+            description: Human-readable label (e.g. the file name).
+            total_rows: Expected rows, if known, for ETA estimates.
+        """
+        self.id = uuid.uuid4().hex
+        self.description = description
+        self.status = JobStatus.QUEUED
+        self.total_rows = total_rows
+        self.rows_processed = 0
+        self.chunks_processed = 0
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: dict[str, Any] | None = None
+        self.error: str | None = None
+        self.cancel_requested = threading.Event()
+
+    def update_progress(self, rows: int, chunks: int) -> None:
+        """Progress callback for the ingestion service.
+
+        Raises:
+            JobCancelled: If the job was cancelled since the last update.
+        """
+        self.rows_processed = rows
+        self.chunks_processed = chunks
+        if self.cancel_requested.is_set():
+            raise JobCancelled(f"Job {self.id} cancelled")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable snapshot with throughput and ETA."""
+        end = self.finished_at or time.time()
+        elapsed = (end - self.started_at) if self.started_at else 0.0
+        rows_per_second = self.rows_processed / elapsed if elapsed > 0 else 0.0
+
+        eta_seconds = None
+        if (
+            self.status == JobStatus.RUNNING
+            and self.total_rows
+            and rows_per_second > 0
+        ):
+            eta_seconds = round(max(0, self.total_rows - self.rows_processed) / rows_per_second, 1)
+
+        return {
+            "job_id": self.id,
+            "description": self.description,
+            "status": self.status.value,
+            "rows_processed": self.rows_processed,
+            "chunks_processed": self.chunks_processed,
+            "total_rows": self.total_rows,
+            "elapsed_seconds": round(elapsed, 1),
+            "rows_per_second": round(rows_per_second, 1),
+            "chunks_per_second": round(self.chunks_processed / elapsed, 1) if elapsed > 0 else 0.0,
+            "eta_seconds": eta_seconds,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs ingestion jobs on a bounded executor and tracks their state."""
+
+    def __init__(self, max_concurrent: int = 1, history: int = 100):
+        """Initialize the manager.
+
+        Args:
+            max_concurrent: Max jobs running at once (others wait queued).
+            history: Max finished jobs kept for status lookups.
+        """
+        self.history = history
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent,
+            thread_name_prefix="ingest-job",
+        )
+        self._jobs: OrderedDict[str, IngestJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        work: Callable[[IngestJob], dict[str, Any]],
+        description: str,
+        total_rows: int | None = None,
+        cleanup: Callable[[], None] | None = None,
+    ) -> IngestJob:
+        """Queue work and return its job immediately.
+
+        Args:
+            work: Callable receiving the job (for progress) and returning a result dict.
+            description: Human-readable label.
+            total_rows: Expected rows, if known.
+            cleanup: Optional callable run after the job ends, whatever the outcome.
+
+        Returns:
+            The queued job.
+        """
+        job = IngestJob(description=description, total_rows=total_rows)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        self._executor.submit(self._run, job, work, cleanup)
+        logger.info(f"Ingest job {job.id} queued: {description}")
+        return job
+
+    def get(self, job_id: str) -> IngestJob | None:
+        """Return a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[IngestJob]:
+        """Return all tracked jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> IngestJob | None:
+        """Request cancellation of a queued or running job.
+
+        Running jobs stop at the next batch boundary.
+        """
+        job = self.get(job_id)
+        if job is not None and job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+            job.cancel_requested.set()
+            logger.info(f"Ingest job {job_id} cancellation requested")
+        return job
+
+    def _run(
+        self,
+        job: IngestJob,
+        work: Callable[[IngestJob], dict[str, Any]],
+        cleanup: Callable[[], None] | None,
+    ) -> None:
+        """Execute a job, recording its outcome."""
+        try:
+            if job.cancel_requested.is_set():
+                job.status = JobStatus.CANCELLED
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            job.result = work(job)
+            job.status = JobStatus.COMPLETED
+            logger.info(f"Ingest job {job.id} completed")
+        except JobCancelled:
+            job.status = JobStatus.CANCELLED
+            logger.info(f"Ingest job {job.id} cancelled")
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            logger.error(f"Ingest job {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            if cleanup is not None:
+                cleanup()
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs beyond the history limit."""
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status not in (JobStatus.QUEUED, JobStatus.RUNNING)
+        ]
+        for job_id in finished[: max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
@@ -0,0 +1,415 @@
+"""In-process BM25 inverted index for hybrid lexical + vector retrieval."""
+
+import json
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+from chromadb.api.models.Collection import Collection
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Words, numbers and dotted version strings ("2.3.1"), lowercased
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.'’][a-z0-9]+)*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by for from had has have he her his i i'm if in into "
+    "is it it's its me my of on or our she so that the their them they this to was we "
+    "were what when which who will with you your".split()
+)
+
+# Rank constant for reciprocal rank fusion (from the original RRF paper)
+RRF_K = 60
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase index terms, dropping stopwords."""
+    return [
+        t for t in _TOKEN_RE.findall(text.lower())
+        if t not in _STOPWORDS and (len(t) > 1 or t.isdigit())
+    ]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = RRF_K) -> list[tuple[str, float]]:
+    """Fuse ranked id lists by summing 1 / (k + rank).
+
+    Args:
+        rankings: Ranked lists of ids, best first.
+        k: Rank constant damping the weight of top positions.
+
+    Returns:
+        List of (id, fused score), best first.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class _UnsupportedFilter(Exception):
+    """A where-filter uses a field or operator the index cannot evaluate."""
+
+
+class LexicalIndex:
+    """BM25 inverted index over document text, kept in sync with the collection.
+
+    Postings are per-term arrays of (slot, term frequency); deleted documents
+    are tombstoned and squeezed out once they make up a large share of the
+    slots. Metadata fields used in source filters are stored as integer codes
+    so filtered searches never touch Chroma.
+    """
+
+    def __init__(
+        self,
+        filter_fields: Iterable[str],
+        path: Path | None = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        compact_ratio: float = 0.25,
+    ):
+        """Initialize an empty index.
+
+        Args:
+            filter_fields: Metadata fields searchable with where-filters (e.g. app_name).
+            path: Optional .npz file to persist the index to.
+            k1: BM25 term frequency saturation.
+            b: BM25 document length normalization.
+            compact_ratio: Share of deleted slots that triggers compaction.
+        """
+        self.filter_fields = tuple(filter_fields)
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+        self.built = False
+        self.total = 0
+        # Collection write token the index reflects; a persisted index is stale once it changes
+        self.write_token: str | None = None
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        """Reset all index structures (caller holds the lock or owns the index)."""
+        self._ids: list[str | None] = []
+        self._slots: dict[str, int] = {}
+        self._lengths = array("I")
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._codes: dict[str, array] = {f: array("i") for f in self.filter_fields}
+        self._vocab: dict[str, dict[Any, int]] = {f: {} for f in self.filter_fields}
+        self._total_length = 0
+        self._dead = 0
+        self.total = 0
+
+    def build(self, collection: Collection, page_size: int = 5000) -> None:
+        """Rebuild the index by paging through the collection's documents.
+
+        Args:
+            collection: ChromaDB collection to scan.
+            page_size: Documents fetched per request.
+        """
+        with self._lock:
+            self._clear()
+            offset = 0
+            while True:
+                page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+                if not page["ids"]:
+                    break
+                self._add(page["ids"], page["documents"], page["metadatas"])
+                offset += len(page["ids"])
+                if len(page["ids"]) < page_size:
+                    break
+            self.built = True
+        logger.info(f"Lexical index built over {self.total} documents ({len(self._postings)} terms)")
+        self.save()
+
+    def load(self, expected_total: int, write_token: str | None = None) -> bool:
+        """Load a persisted index if it matches the collection's size and last write.
+
+        Args:
+            expected_total: Current collection count.
+            write_token: Current collection write token (see ``VectorStore``).
+
+        Returns:
+            True if the index was loaded, False if missing or stale.
+        """
+        if not self.path or not self.path.exists():
+            return False
+        try:
+            with np.load(self.path) as data:
+                header = json.loads(data["header"].tobytes().decode("utf-8"))
+                if (
+                    header["total"] != expected_total
+                    or header.get("write_token") != write_token
+                    or header["filter_fields"] != list(self.filter_fields)
+                ):
+                    logger.info("Persisted lexical index is stale, rebuilding")
+                    return False
+                offsets = data["offsets"]
+                slots = data["slots"]
+                tfs = data["tfs"]
+                lengths = data["lengths"]
+                codes = {f: data[f"codes_{i}"] for i, f in enumerate(self.filter_fields)}
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not read lexical index {self.path}: {e}")
+            return False
+
+        with self._lock:
+            self._clear()
+            self._ids = header["ids"]
+            self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+            self._lengths = array("I", lengths.astype(np.uint32).tobytes())
+            for i, term in enumerate(header["terms"]):
+                start, end = offsets[i], offsets[i + 1]
+                self._postings[term] = (
+                    array("I", slots[start:end].tobytes()),
+                    array("H", tfs[start:end].tobytes()),
+                )
+            for field in self.filter_fields:
+                self._codes[field] = array("i", codes[field].astype(np.int32).tobytes())
+                self._vocab[field] = {value: code for code, value in enumerate(header["vocab"][field])}
+            self._total_length = int(lengths.sum())
+            self.total = len(self._ids)
+            self.write_token = write_token
+            self.built = True
+        logger.info(f"Lexical index loaded from {self.path}")
+        return True
+
+    def save(self) -> None:
+        """Persist the index to disk (no-op without a path or before build)."""
+        if not self.path or not self.built:
+            return
+        with self._lock:
+            if self._dead:
+                self._compact()
+            terms = list(self._postings)
+            offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+            for i, term in enumerate(terms):
+                offsets[i + 1] = offsets[i] + len(self._postings[term][0])
+            arrays = {
+                "offsets": offsets,
+                "slots": np.concatenate(
+                    [np.asarray(self._postings[t][0], dtype=np.uint32) for t in terms]
+                ) if terms else np.zeros(0, dtype=np.uint32),
+                "tfs": np.concatenate(
+                    [np.asarray(self._postings[t][1], dtype=np.uint16) for t in terms]
+                ) if terms else np.zeros(0, dtype=np.uint16),
+                "lengths": np.asarray(self._lengths, dtype=np.uint32),
+                **{
+                    f"codes_{i}": np.asarray(self._codes[f], dtype=np.int32)
+                    for i, f in enumerate(self.filter_fields)
+                },
+            }
+            header = {
+                "total": self.total,
+                "write_token": self.write_token,
+                "filter_fields": list(self.filter_fields),
+                "ids": self._ids,
+                "terms": terms,
+                "vocab": {f: list(self._vocab[f]) for f in self.filter_fields},
+            }
+        arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                np.savez(f, **arrays)
+            tmp_path.replace(self.path)
+            logger.debug(f"Lexical index saved to {self.path}")
+        except OSError as e:
+            logger.warning(f"Could not persist lexical index {self.path}: {e}")
+
+    def add(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any]] | None = None,
+    ) -> None:
+        """Index new documents (existing ids are replaced)."""
+        with self._lock:
+            self._remove(ids)
+            self._add(ids, documents, metadatas or [{} for _ in ids])
+
+    def update_metadatas(self, ids: list[str], metadatas: list[dict[str, Any]]) -> None:
+        """Re-code the filter fields of indexed documents whose text is unchanged."""
+        with self._lock:
+            for doc_id, meta in zip(ids, metadatas):
+                slot = self._slots.get(doc_id)
+                if slot is None:
+                    continue
+                for field in self.filter_fields:
+                    self._codes[field][slot] = self._code(field, meta)
+
+    def remove(self, ids: list[str]) -> None:
+        """Drop deleted documents from the index."""
+        with self._lock:
+            self._remove(ids)
+
+    def reset(self) -> None:
+        """Empty the index (collection was cleared)."""
+        with self._lock:
+            self._clear()
+            self.built = True
+
+    def search(
+        self,
+        text: str,
+        n_results: int = 20,
+        where: dict[str, Any] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Rank documents by BM25 score for a query.
+
+        Args:
+            text: Query text.
+            n_results: Max results to return.
+            where: Optional metadata filter ($in / $eq / $or / $and over filter fields).
+
+        Returns:
+            List of (id, score), best first. Empty if nothing matches or the
+            filter uses fields the index does not store.
+        """
+        terms = set(tokenize(text))
+        with self._lock:
+            n_slots = len(self._ids)
+            if not terms or not self.total:
+                return []
+            try:
+                mask = self._filter_mask(where, n_slots) if where else None
+            except _UnsupportedFilter as e:
+                logger.debug(f"Lexical search skipped: {e}")
+                return []
+
+            lengths = np.array(self._lengths, dtype=np.float32)
+            avg_length = self._total_length / self.total
+            scores = np.zeros(n_slots, dtype=np.float32)
+            for term in terms:
+                posting = self._postings.get(term)
+                if posting is None:
+                    continue
+                slots = np.array(posting[0], dtype=np.int64)
+                tfs = np.array(posting[1], dtype=np.float32)
+                df = int(np.count_nonzero(lengths[slots]))  # Tombstoned slots keep postings until compaction
+                if not df:
+                    continue
+                idf = math.log(1 + (self.total - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * lengths[slots] / avg_length)
+                scores[slots] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+            ids = self._ids
+
+        scores[lengths == 0] = 0  # Deleted slots
+        if mask is not None:
+            scores[~mask] = 0
+
+        matched = int(np.count_nonzero(scores))
+        k = min(n_results, matched)
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[slot], float(scores[slot])) for slot in top if ids[slot] is not None]
+
+    def _add(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict[str, Any] | None],
+    ) -> None:
+        """Append documents to the index (caller holds the lock)."""
+        for doc_id, text, meta in zip(ids, documents, metadatas):
+            slot = len(self._ids)
+            counts = Counter(tokenize(text or ""))
+            length = sum(counts.values())
+            self._ids.append(doc_id)
+            self._slots[doc_id] = slot
+            self._lengths.append(length)
+            self._total_length += length
+            for term, tf in counts.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = (array("I"), array("H"))
+                posting[0].append(slot)
+                posting[1].append(min(tf, 65535))
+            for field in self.filter_fields:
+                self._codes[field].append(self._code(field, meta))
+            self.total += 1
+
+    def _code(self, field: str, meta: dict[str, Any] | None) -> int:
+        """Integer code of a document's filter field value, -1 if missing (caller holds the lock)."""
+        value = (meta or {}).get(field)
+        if value is None:
+            return -1
+        return self._vocab[field].setdefault(value, len(self._vocab[field]))
+
+    def _remove(self, ids: list[str]) -> None:
+        """Tombstone documents, compacting when too many slots are dead (caller holds the lock)."""
+        for doc_id in ids:
+            slot = self._slots.pop(doc_id, None)
+            if slot is None:
+                continue
+            self._ids[slot] = None
+            self._total_length -= self._lengths[slot]
+            self._lengths[slot] = 0
+            for field in self.filter_fields:
+                self._codes[field][slot] = -1
+            self._dead += 1
+            self.total -= 1
+
+        if self._dead > 1000 and self._dead > self.compact_ratio * len(self._ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Renumber live slots and drop postings of deleted documents (caller holds the lock)."""
+        alive = np.array([doc_id is not None for doc_id in self._ids], dtype=bool)
+        remap = np.full(len(self._ids), -1, dtype=np.int64)
+        remap[alive] = np.arange(int(alive.sum()))
+
+        postings = {}
+        for term, (slots, tfs) in self._postings.items():
+            new_slots = remap[np.array(slots, dtype=np.int64)]
+            keep = new_slots >= 0
+            if keep.any():
+                postings[term] = (
+                    array("I", new_slots[keep].astype(np.uint32).tobytes()),
+                    array("H", np.array(tfs, dtype=np.uint16)[keep].tobytes()),
+                )
+        self._postings = postings
+
+        self._ids = [doc_id for doc_id in self._ids if doc_id is not None]
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+        self._lengths = array("I", np.array(self._lengths, dtype=np.uint32)[alive].tobytes())
+        for field in self.filter_fields:
+            self._codes[field] = array("i", np.array(self._codes[field], dtype=np.int32)[alive].tobytes())
+        logger.debug(f"Lexical index compacted: {self._dead} deleted slots dropped")
+        self._dead = 0
+
+    def _filter_mask(self, where: dict[str, Any], n_slots: int) -> np.ndarray:
+        """Evaluate a Chroma where-filter against stored field codes (caller holds the lock)."""
+        if "$or" in where or "$and" in where:
+            op = "$or" if "$or" in where else "$and"
+            masks = [self._filter_mask(clause, n_slots) for clause in where[op]]
+            combine = np.logical_or if op == "$or" else np.logical_and
+            return combine.reduce(masks) if masks else np.ones(n_slots, dtype=bool)
+
+        mask = np.ones(n_slots, dtype=bool)
+        for field, condition in where.items():
+            if field not in self._codes:
+                raise _UnsupportedFilter(f"field not indexed: {field}")
+            if isinstance(condition, dict):
+                if set(condition) - {"$in", "$eq"}:
+                    raise _UnsupportedFilter(f"operator not supported: {condition}")
+                values = condition.get("$in", [])
+                if "$eq" in condition:
+                    values = [condition["$eq"]]
+            else:
+                values = [condition]
+            vocab = self._vocab[field]
+            wanted = [vocab[v] for v in values if v in vocab]
+            mask &= np.isin(np.array(self._codes[field], dtype=np.int32), wanted)
+        return mask
@@ -1,19 +1,152 @@
 """LLM client service using LangChain."""
 
-from typing import Any
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, ContextManager, Iterator
+import asyncio
 import re
+import threading
+import time
+
+import numpy as np
 
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from pydantic import ConfigDict
 
 from src.config.logging import get_logger
-from src.config.settings import LLMProvider
+from src.config.settings import LLMProvider, LLMTier
+from src.services.llm_cache import LLMResponseCache
+from src.services.llm_limiter import ConcurrencyLimiter, SingleFlight
+from src.services.llm_resilience import ResiliencePolicy
 
 logger = get_logger(__name__)
 
 
+def content_text(content: Any) -> str:
+    """Extract text from message content (a string or a list of content blocks)."""
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            parts.append(block.get("text", ""))
+    return "".join(parts)
+
+
+class _TierModel:
+    """The LangChain model serving one tier, its settings and call latencies."""
+
+    def __init__(self, llm: BaseChatModel, model: str, temperature: float, max_tokens: int):
+        self.llm = llm
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.calls = 0
+        self._latencies_ms: deque[float] = deque(maxlen=500)
+        self._lock = threading.Lock()
+
+    def record(self, started: float) -> None:
+        """Record one upstream call started at a perf_counter time."""
+        with self._lock:
+            self.calls += 1
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    def stats(self) -> dict[str, Any]:
+        """Return model, call count and recent latency percentiles (ms)."""
+        with self._lock:
+            latencies = np.asarray(self._latencies_ms) if self._latencies_ms else np.zeros(1)
+            return {
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "calls": self.calls,
+                "latency_ms_avg": round(float(latencies.mean()), 1),
+                "latency_ms_p50": round(float(np.percentile(latencies, 50)), 1),
+                "latency_ms_p95": round(float(np.percentile(latencies, 95)), 1),
+            }
+
+
+class LimitedChatModel(BaseChatModel):
+    """LangChain model whose upstream calls each hold a concurrency limiter slot.
+
+    For callers that need a model rather than ``LLMClient`` (the agent).
+    Generation and streaming are delegated to ``inner``; a stream holds its
+    slot until it ends.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    limiter: ConcurrencyLimiter
+
+    @property
+    def _llm_type(self) -> str:
+        return self.inner._llm_type
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return self.inner._identifying_params
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Runnable:
+        """Bind tools the way ``inner`` does (it formats them for its provider)."""
+        return self.bind(**self.inner.bind_tools(tools, **kwargs).kwargs)
+
+    def _should_stream(self, **kwargs: Any) -> bool:
+        return self.inner._should_stream(**kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        with self.limiter.slot():
+            return self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        async with self.limiter.aslot():
+            return await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        with self.limiter.slot():
+            yield from self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async with self.limiter.aslot():
+            async for chunk in self.inner._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+
+
 class LLMClient:
-    """Unified LLM client wrapping LangChain models."""
+    """Unified LLM client wrapping LangChain models.
+
+    Calls are routed to model tiers: routing / classification
+    (``invoke_structured``) goes to the fast tier, answer synthesis to the
+    strong tier. Without a fast model both tiers use the main model.
+    """
 
     def __init__(
         self,
@@ -26,17 +159,37 @@ class LLMClient:
         aws_region: str | None = None,
         aws_access_key_id: str | None = None,
         aws_secret_access_key: str | None = None,
+        fake_latency_seconds: float = 0.5,
+        fake_tokens_per_second: float = 50.0,
+        fake_answer_tokens: int = 120,
+        response_cache: LLMResponseCache | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+        coalesce: bool = True,
+        resilience: ResiliencePolicy | None = None,
+        fast_model: str | None = None,
+        fast_temperature: float = 0.0,
+        fast_max_tokens: int = 64,
     ):
         """Initialize LLM client.
 
         Args:
-            provider: LLM provider (openai or bedrock).
+            provider: LLM provider (openai, bedrock or fake).
             model: Model name/ID.
             base_url: API base URL (for OpenAI-compatible).
             api_key: API key.
             temperature: Sampling temperature.
             max_tokens: Max tokens in response.
             aws_region: AWS region (for Bedrock).
+            fake_latency_seconds: Simulated delay before the first token (for fake).
+            fake_tokens_per_second: Simulated streaming speed (for fake).
+            fake_answer_tokens: Length of fake answers in tokens (for fake).
+            response_cache: Optional disk cache of non-streamed responses.
+            limiter: Optional concurrency limit on upstream calls (shared per provider).
+            coalesce: Share one upstream call between concurrent identical prompts.
+            resilience: Optional deadline / retry / hedging policy for upstream calls.
+            fast_model: Small model for the fast tier (None = use the main model).
+            fast_temperature: Sampling temperature of the fast model.
+            fast_max_tokens: Max tokens in fast model responses.
         """
         self.provider = provider
         self.model = model
@@ -45,15 +198,41 @@ class LLMClient:
         self.aws_region = aws_region
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
+        self.fake_latency_seconds = fake_latency_seconds
+        self.fake_tokens_per_second = fake_tokens_per_second
+        self.fake_answer_tokens = fake_answer_tokens
+        self.response_cache = response_cache
+        self.limiter = limiter
+        self.single_flight = SingleFlight() if coalesce else None
+        self.resilience = resilience
 
         self.llm = self._create_llm(
             provider=provider,
             model=model,
             base_url=base_url,
             api_key=api_key,
+            temperature=temperature,
+            max_tokens=max_tokens,
         )
+        self.tiers = {
+            LLMTier.STRONG: _TierModel(self.llm, model, temperature, max_tokens),
+            LLMTier.FAST: _TierModel(self.llm, model, temperature, max_tokens),
+        }
+        if fast_model:
+            fast_llm = self._create_llm(
+                provider=provider,
+                model=fast_model,
+                base_url=base_url,
+                api_key=api_key,
+                temperature=fast_temperature,
+                max_tokens=fast_max_tokens,
+            )
+            self.tiers[LLMTier.FAST] = _TierModel(fast_llm, fast_model, fast_temperature, fast_max_tokens)
 
-        logger.info(f"LLM client initialized: {provider.value} / {model}")
+        logger.info(
+            f"LLM client initialized: {provider.value} / {model}"
+            f" (fast tier: {self.tiers[LLMTier.FAST].model})"
+        )
 
     def _create_llm(
         self,
@@ -61,9 +240,21 @@ class LLMClient:
         model: str,
         base_url: str | None,
         api_key: str,
+        temperature: float,
+        max_tokens: int,
     ) -> BaseChatModel:
         """Create the underlying LangChain model."""
-        if provider == LLMProvider.BEDROCK:
+        if provider == LLMProvider.FAKE:
+            from src.services.fake_llm import FakeChatModel
+
+            return FakeChatModel(
+                model=model,
+                max_tokens=max_tokens,
+                answer_tokens=self.fake_answer_tokens,
+                latency_seconds=self.fake_latency_seconds,
+                tokens_per_second=self.fake_tokens_per_second,
+            )
+        elif provider == LLMProvider.BEDROCK:
             import boto3
             from langchain_aws import ChatBedrock
 
@@ -80,8 +271,8 @@ class LLMClient:
                 model_id=model,
                 client=client,
                 model_kwargs={
-                    "temperature": self.temperature,
-                    "max_tokens": self.max_tokens,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
                 },
             )
         else:
@@ -94,53 +285,283 @@ class LLMClient:
                 base_url=base_url,
                 model=model,
                 api_key=api_key,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
+                temperature=temperature,
+                max_tokens=max_tokens,
             )
 
-    def invoke(self, prompt: str) -> str:
+    def invoke(
+        self,
+        prompt: str,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.STRONG,
+    ) -> str:
         """Invoke LLM with a simple prompt.
 
         Args:
             prompt: The prompt string.
+            deadline: Seconds allowed, retries included (defaults to the policy deadline).
+            tier: Model tier to use.
+
+        Returns:
+            Response content.
+        """
+        return self._invoke(prompt, deadline, tier)
+
+    async def ainvoke(
+        self,
+        prompt: str,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.STRONG,
+    ) -> str:
+        """Invoke LLM with a simple prompt without blocking the event loop.
+
+        Args:
+            prompt: The prompt string.
+            deadline: Seconds allowed, retries included (defaults to the policy deadline).
+            tier: Model tier to use.
 
         Returns:
             Response content.
         """
-        response = self.llm.invoke(prompt)
-        return response.content
+        return await self._ainvoke(prompt, deadline, tier)
+
+    def stream(self, prompt: str, tier: LLMTier = LLMTier.STRONG) -> Iterator[str]:
+        """Stream the response to a simple prompt as it is generated.
+
+        Args:
+            prompt: The prompt string.
+            tier: Model tier to use.
+
+        Yields:
+            Response text fragments.
+        """
+        model = self.tiers[tier]
+        with self._slot():
+            started = time.perf_counter()
+            for chunk in model.llm.stream(prompt):
+                text = content_text(chunk.content)
+                if text:
+                    yield text
+            model.record(started)
 
-    def invoke_structured(self, prompt: str) -> Any:
+    async def astream(self, prompt: str, tier: LLMTier = LLMTier.STRONG) -> AsyncIterator[str]:
+        """Async version of ``stream``.
+
+        Args:
+            prompt: The prompt string.
+            tier: Model tier to use.
+
+        Yields:
+            Response text fragments.
+        """
+        model = self.tiers[tier]
+        async with self._aslot():
+            started = time.perf_counter()
+            async for chunk in model.llm.astream(prompt):
+                text = content_text(chunk.content)
+                if text:
+                    yield text
+            model.record(started)
+
+    def invoke_structured(
+        self,
+        prompt: str,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.FAST,
+    ) -> Any:
         '''Invoke LLM for cllassificaiton / routiung (no reasoning!!!)'''
-        response = self.llm.invoke(prompt)
-        content = response.content
-        content = re.sub(r"<think>.*?</think>", "", content, flags=re.DOTALL)#</think>
-        
-        return [s.strip() for s in content.split(",")]
+        return self._parse_structured(self._invoke(prompt, deadline, tier))
+
+    async def ainvoke_structured(
+        self,
+        prompt: str,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.FAST,
+    ) -> Any:
+        """Async version of ``invoke_structured``."""
+        return self._parse_structured(await self._ainvoke(prompt, deadline, tier))
+
+    @staticmethod
+    def _parse_structured(content: str) -> list[str]:
+        """Split a comma-separated answer, dropping any <think> block.
+
+        A block cut off by the token limit is dropped to the end, leaving an
+        empty list rather than a fragment of reasoning.
+        """
+        if re.search(r"<think>(?!.*?</think>)", content, flags=re.DOTALL):
+            logger.warning("Structured response ended inside <think>; raise LLM_FAST_MAX_TOKENS for reasoning models")
+        content = re.sub(r"<think>.*?(?:</think>|$)", "", content, flags=re.DOTALL)
+
+        return [s.strip() for s in content.split(",") if s.strip()]
 
     def generate(
         self,
         prompt: str,
         system_prompt: str | None = None,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.STRONG,
     ) -> str:
         """Generate response with optional system prompt.
 
         Args:
             prompt: User prompt.
             system_prompt: Optional system instructions.
+            deadline: Seconds allowed, retries included (defaults to the policy deadline).
+            tier: Model tier to use.
 
         Returns:
             Generated text.
         """
+        return self._invoke(self._messages(prompt, system_prompt), deadline, tier)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: str | None = None,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.STRONG,
+    ) -> str:
+        """Async version of ``generate``.
+
+        Args:
+            prompt: User prompt.
+            system_prompt: Optional system instructions.
+            deadline: Seconds allowed, retries included (defaults to the policy deadline).
+            tier: Model tier to use.
+
+        Returns:
+            Generated text.
+        """
+        return await self._ainvoke(self._messages(prompt, system_prompt), deadline, tier)
+
+    def _invoke(
+        self,
+        model_input: str | list,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.STRONG,
+    ) -> Any:
+        """Invoke the model, answering repeat prompts from the response cache.
+
+        Concurrent identical prompts share one upstream call, and upstream
+        calls wait for a slot of the provider's concurrency limit.
+        """
+        key = self._request_key(model_input, tier)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                logger.debug("LLM response cache hit")
+                return cached
+
+        if self.single_flight is not None:
+            content = self.single_flight.do(key, lambda: self._call(model_input, deadline, tier))
+        else:
+            content = self._call(model_input, deadline, tier)
+
+        if self.response_cache is not None:
+            self.response_cache.put(key, content)
+        return content
+
+    async def _ainvoke(
+        self,
+        model_input: str | list,
+        deadline: float | None = None,
+        tier: LLMTier = LLMTier.STRONG,
+    ) -> Any:
+        """Async version of ``_invoke`` (cache I/O runs in a worker thread)."""
+        key = self._request_key(model_input, tier)
+        if self.response_cache is not None:
+            cached = await asyncio.to_thread(self.response_cache.get, key)
+            if cached is not None:
+                logger.debug("LLM response cache hit")
+                return cached
+
+        if self.single_flight is not None:
+            content = await self.single_flight.ado(key, lambda: self._acall(model_input, deadline, tier))
+        else:
+            content = await self._acall(model_input, deadline, tier)
+
+        if self.response_cache is not None:
+            await asyncio.to_thread(self.response_cache.put, key, content)
+        return content
+
+    def _call(self, model_input: str | list, deadline: float | None, tier: LLMTier) -> Any:
+        """Call upstream under the resilience policy (deadline, retries, hedging)."""
+        model = self.tiers[tier]
+        started = time.perf_counter()
+        if self.resilience is None:
+            with self._slot():
+                content = self._attempt(model_input, model)
+        else:
+            # The policy takes the limiter's slots itself, per attempt
+            content = self.resilience.call(lambda: self._attempt(model_input, model), deadline, self.limiter)
+        model.record(started)
+        return content
+
+    async def _acall(self, model_input: str | list, deadline: float | None, tier: LLMTier) -> Any:
+        """Async version of ``_call``."""
+        model = self.tiers[tier]
+        started = time.perf_counter()
+        if self.resilience is None:
+            async with self._aslot():
+                content = await self._aattempt(model_input, model)
+        else:
+            content = await self.resilience.acall(lambda: self._aattempt(model_input, model), deadline, self.limiter)
+        model.record(started)
+        return content
+
+    def _attempt(self, model_input: str | list, model: _TierModel) -> Any:
+        """Make one upstream request (the caller holds a concurrency slot)."""
+        return model.llm.invoke(model_input).content
+
+    async def _aattempt(self, model_input: str | list, model: _TierModel) -> Any:
+        """Async version of ``_attempt``."""
+        return (await model.llm.ainvoke(model_input)).content
+
+    def _slot(self) -> ContextManager:
+        """Concurrency slot for one upstream call (no-op without a limiter)."""
+        return self.limiter.slot() if self.limiter is not None else nullcontext()
+
+    def _aslot(self) -> AsyncContextManager:
+        """Async version of ``_slot``."""
+        return self.limiter.aslot() if self.limiter is not None else nullcontext()
+
+    def _request_key(self, model_input: str | list, tier: LLMTier) -> str:
+        """Request key: provider, tier model, sampling settings and prompt/messages."""
+        if isinstance(model_input, str):
+            payload: Any = model_input
+        else:
+            payload = [[message.type, message.content] for message in model_input]
+        model = self.tiers[tier]
+        return LLMResponseCache.key(
+            self.provider.value,
+            model.model,
+            model.temperature,
+            model.max_tokens,
+            payload,
+        )
+
+    @staticmethod
+    def _messages(prompt: str, system_prompt: str | None) -> list:
+        """Build the chat messages for a prompt with optional system instructions."""
         messages = []
 
         if system_prompt:
             messages.append(SystemMessage(content=system_prompt))
 
         messages.append(HumanMessage(content=prompt))
+        return messages
 
-        response = self.llm.invoke(messages)
-        return response.content
+    def chat_model(self, tier: LLMTier = LLMTier.STRONG) -> BaseChatModel:
+        """LangChain model of a tier for callers that drive it directly (the agent).
+
+        Its calls take the provider's concurrency slots like the client's
+        own; coalescing, the response cache and the resilience policy do not
+        apply to them.
+        """
+        model = self.tiers[tier].llm
+        if self.limiter is None:
+            return model
+        return LimitedChatModel(inner=model, limiter=self.limiter)
 
     def get_model_info(self) -> dict[str, Any]:
         """Get model info."""
@@ -150,3 +571,13 @@ class LLMClient:
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
         }
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get per-tier latency, concurrency, coalescing, response cache and retry/hedge statistics."""
+        return {
+            "tiers": {tier.value: model.stats() for tier, model in self.tiers.items()},
+            "limiter": self.limiter.stats() if self.limiter is not None else None,
+            "single_flight": self.single_flight.stats() if self.single_flight is not None else None,
+            "response_cache": self.response_cache.stats() if self.response_cache is not None else None,
+            "resilience": self.resilience.stats() if self.resilience is not None else None,
+        }
@@ -0,0 +1,158 @@
+"""Disk-backed LLM response cache shared across worker processes."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMResponseCache:
+    """SQLite store of LLM responses keyed by hash(model settings + prompt).
+
+    The database runs in WAL mode with a busy timeout, so several worker
+    processes can share one file. Entries expire after ``ttl_seconds`` and
+    are evicted least-recently-used once ``max_entries`` is exceeded, down
+    to ``evict_to`` of the limit.
+
+    Hits only write when an entry's last use is older than
+    ``touch_interval``, and the row count is tracked in memory (recounted
+    once it passes the limit), so a hit or put is not a full-table write or
+    scan.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 86_400,
+        touch_interval: float = 60.0,
+        evict_to: float = 0.95,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path.
+            max_entries: Max cached responses before LRU eviction.
+            ttl_seconds: Max age of a cached response.
+            touch_interval: Min seconds between LRU timestamp updates of an entry.
+            evict_to: Share of max_entries kept after an eviction.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_interval = touch_interval
+        self.evict_to = evict_to
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)"
+        )
+        self._conn.commit()
+        # Approximate: other processes' writes are only seen on recount
+        self._entries = self.size()
+        logger.info(f"LLM response cache opened: {path} ({self._entries} entries)")
+
+    @staticmethod
+    def key(
+        provider: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        payload: Any,
+    ) -> str:
+        """Cache key for a prompt (or message list) under the given model settings."""
+        material = json.dumps(
+            [provider, model, temperature, max_tokens, payload],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached response for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at, last_used FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._entries -= 1
+                self.misses += 1
+                return None
+            if now - row[2] > self.touch_interval:
+                self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Any) -> None:
+        """Store a response, dropping expired and least-recently-used entries over the limit."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, ensure_ascii=False), now, now),
+            )
+            self._entries += 1  # Overcounts replacements until the next recount
+            if self._entries > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least-recently-used ones down to evict_to (caller holds the lock)."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (now - self.ttl_seconds,),
+        )
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if self._entries <= self.max_entries:
+            return
+        overflow = self._entries - int(self.max_entries * self.evict_to)
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        )
+        self._entries -= overflow
+        logger.debug(f"Evicted {overflow} cached LLM responses")
+
+    def size(self) -> int:
+        """Return number of cached responses."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters (for this process)."""
+        total = self.hits + self.misses
+        return {
+            "entries": self.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
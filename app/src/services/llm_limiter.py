@@ -0,0 +1,274 @@
+"""Request coalescing and concurrency limiting for upstream LLM calls."""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterator
+
+import numpy as np
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMQueueTimeout(Exception):
+    """Raised when a call waits longer than the queue timeout for a concurrency slot."""
+
+
+class _Waiter:
+    """A queued thread (event) or task (loop + future) waiting for a slot."""
+
+    __slots__ = ("event", "loop", "future", "granted")
+
+    def __init__(
+        self,
+        event: threading.Event | None = None,
+        loop: asyncio.AbstractEventLoop | None = None,
+        future: asyncio.Future | None = None,
+    ):
+        self.event = event
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+    def wake(self) -> None:
+        """Hand the slot to this waiter (caller holds the limiter lock)."""
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    """Complete a waiter future unless it already timed out or was cancelled."""
+    if not future.done():
+        future.set_result(None)
+
+
+class ConcurrencyLimiter:
+    """FIFO concurrency limit shared by worker threads and asyncio tasks.
+
+    At most ``max_concurrent`` calls run at once; the rest queue in arrival
+    order and fail with ``LLMQueueTimeout`` after ``queue_timeout`` seconds.
+    A released slot is handed straight to the oldest waiter, so a burst
+    cannot starve queued calls. Queue depth and wait times are recorded
+    for sizing.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        queue_timeout: float | None = 30.0,
+        name: str = "llm",
+    ):
+        """Initialize the limiter.
+
+        Args:
+            max_concurrent: Max calls in flight.
+            queue_timeout: Max seconds to wait for a slot (None waits forever).
+            name: Label used in logs and errors (e.g. the provider).
+        """
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.name = name
+        self.acquired = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+        self._active = 0
+        self._waiters: deque[_Waiter] = deque()
+        self._wait_ms: deque[float] = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of a (blocking) call."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of an async call."""
+        await self.aacquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, timeout: float | None = None) -> None:
+        """Wait for a slot, blocking the calling thread.
+
+        Args:
+            timeout: Shorter wait than the queue timeout for this call (e.g.
+                what is left of a deadline).
+        """
+        started = time.perf_counter()
+        timeout = self._timeout(timeout)
+        waiter = _Waiter(event=threading.Event())
+        if not self._enter(waiter) and not waiter.event.wait(timeout):
+            self._abandon(waiter, timeout)
+        self._record(started)
+
+    async def aacquire(self, timeout: float | None = None) -> None:
+        """Wait for a slot without blocking the event loop (see ``acquire``)."""
+        started = time.perf_counter()
+        timeout = self._timeout(timeout)
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(loop=loop, future=loop.create_future())
+        if not self._enter(waiter):
+            try:
+                await asyncio.wait_for(waiter.future, timeout)
+            except asyncio.TimeoutError:
+                self._abandon(waiter, timeout)
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted:
+                    self.release()
+                raise
+        self._record(started)
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free and nobody is queued. Returns whether it was taken."""
+        with self._lock:
+            if self._active >= self.max_concurrent or self._waiters:
+                return False
+            self._active += 1
+            self.acquired += 1
+            self._wait_ms.append(0.0)
+            return True
+
+    def release(self) -> None:
+        """Free a slot, handing it to the oldest waiter if any."""
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().wake()
+            else:
+                self._active -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return slots in use, queue depth, timeouts and wait times (recent calls)."""
+        with self._lock:
+            waits = np.asarray(self._wait_ms) if self._wait_ms else np.zeros(1)
+            return {
+                "max_concurrent": self.max_concurrent,
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_queue_depth": self.max_queue_depth,
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(float(waits.mean()), 1),
+                "wait_ms_p95": round(float(np.percentile(waits, 95)), 1),
+                "wait_ms_max": round(float(waits.max()), 1),
+            }
+
+    def _enter(self, waiter: _Waiter) -> bool:
+        """Take a free slot, or queue the waiter. Returns whether a slot was taken."""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                return True
+            self._waiters.append(waiter)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+            return False
+
+    def _timeout(self, timeout: float | None) -> float | None:
+        """Seconds to wait for a slot: the queue timeout, or a shorter per-call timeout."""
+        if timeout is None:
+            return self.queue_timeout
+        return timeout if self.queue_timeout is None else min(timeout, self.queue_timeout)
+
+    def _abandon(self, waiter: _Waiter, timeout: float | None) -> None:
+        """Leave the queue after a timeout (unless the slot arrived meanwhile)."""
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+            self.timeouts += 1
+        logger.warning(f"{self.name} queue timeout after {timeout}s")
+        raise LLMQueueTimeout(
+            f"{self.name}: no LLM slot free within {timeout}s "
+            f"({self.max_concurrent} calls in flight)"
+        )
+
+    def _record(self, started: float) -> None:
+        """Record a successful acquire and its wait time."""
+        with self._lock:
+            self.acquired += 1
+            self._wait_ms.append((time.perf_counter() - started) * 1000)
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one upstream call.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait for and share its result (or exception).
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._inflight: dict[Hashable, tuple[threading.Event, list]] = {}
+        self._tasks: dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers with the same key (threads)."""
+        with self._lock:
+            entry = self._inflight.get(key)
+            leader = entry is None
+            if leader:
+                entry = (threading.Event(), [None, None])  # done, [result, error]
+                self._inflight[key] = entry
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        done, outcome = entry
+        if not leader:
+            done.wait()
+            if outcome[1] is not None:
+                raise outcome[1]
+            return outcome[0]
+
+        try:
+            outcome[0] = fn()
+            return outcome[0]
+        except BaseException as e:
+            outcome[1] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of ``do``; a cancelled caller does not cancel the shared call."""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self.calls += 1
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future) -> None:
+        """Forget a finished shared call (and mark its exception as retrieved)."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Return upstream calls made and calls served by sharing another's result."""
+        return {"calls": self.calls, "shared": self.shared}
@@ -0,0 +1,491 @@
+"""Deadlines, retries with backoff and hedged requests for upstream LLM calls."""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator
+
+import numpy as np
+
+from src.config.logging import get_logger
+from src.services.llm_limiter import ConcurrencyLimiter, LLMQueueTimeout
+
+logger = get_logger(__name__)
+
+# Error codes / class names of throttling and transient provider errors
+_RETRYABLE_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "InternalServerException",
+}
+_RETRYABLE_TYPES = {
+    "RateLimitError",
+    "APITimeoutError",
+    "APIConnectionError",
+    "InternalServerError",
+    "ReadTimeoutError",
+    "ConnectTimeoutError",
+}
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_RETRYABLE_MESSAGES = ("throttl", "too many requests", "rate limit", "service unavailable")
+
+
+class LLMDeadlineExceeded(Exception):
+    """Raised when an LLM call (including retries) runs past its deadline."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is throttling or a transient provider failure.
+
+    Checks the error and its causes by class name, HTTP status and botocore
+    error code, then by message, since langchain-aws re-raises Bedrock
+    errors as ValueError with the original message.
+    """
+    while error is not None:
+        if type(error).__name__ in _RETRYABLE_TYPES:
+            return True
+        if getattr(error, "status_code", None) in _RETRYABLE_STATUS:
+            return True
+        response = getattr(error, "response", None)
+        if isinstance(response, dict) and response.get("Error", {}).get("Code") in _RETRYABLE_CODES:
+            return True
+        message = str(error)
+        if any(code in message for code in _RETRYABLE_CODES):
+            return True
+        if any(text in message.lower() for text in _RETRYABLE_MESSAGES):
+            return True
+        error = error.__cause__
+    return False
+
+
+class _Slot:
+    """A concurrency slot held by one attempt until the attempt ends."""
+
+    def __init__(self, limiter: ConcurrencyLimiter | None, policy: "ResiliencePolicy"):
+        self.limiter = limiter
+        self._policy = policy
+        self._released = False
+        self._abandoned = False
+        self._lock = threading.Lock()
+
+    def abandon(self) -> None:
+        """Mark the attempt as still running after its call returned (it keeps the slot)."""
+        with self._lock:
+            if self._released or self._abandoned:
+                return
+            self._abandoned = True
+            self._policy._count_abandoned(1)
+
+    def release(self) -> None:
+        """Give the slot back (once, when the attempt ends or never started)."""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+            if self._abandoned:
+                self._policy._count_abandoned(-1)
+        if self.limiter is not None:
+            self.limiter.release()
+
+
+class LLMUsage:
+    """Upstream call counters for one request (see ``track_llm_calls``)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def add(self, attempts: int, retries: int, hedges: int) -> None:
+        """Count one LLM call and the attempts it took."""
+        with self._lock:
+            self.calls += 1
+            self.attempts += attempts
+            self.retries += retries
+            self.hedges += hedges
+
+    def to_dict(self) -> dict[str, int]:
+        """Return counters as a dict."""
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+        }
+
+
+_usage: ContextVar[LLMUsage | None] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_llm_calls() -> Iterator[LLMUsage]:
+    """Count LLM calls, retries and hedges made in this context (and tasks it starts)."""
+    usage = LLMUsage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+class ResiliencePolicy:
+    """Per-call deadline, jittered exponential retries and optional hedging.
+
+    Retryable errors (throttling, 5xx, timeouts) are retried after a
+    full-jitter exponential backoff while the deadline allows. With hedging
+    on, an attempt still running after the observed p95 latency gets one
+    duplicate request; whichever answers first wins.
+
+    Given a concurrency limiter, each attempt holds a slot until it ends:
+    the hedge clock and recorded latencies start once the slot is taken,
+    and a hedge is only sent if a slot is free right away (never while calls
+    are queued). A blocking attempt still running when its call returns (a
+    losing hedge, or any attempt at the deadline) keeps its slot until the
+    provider answers, and no hedges are sent while such attempts run. Async
+    attempts are cancelled instead and give their slot back.
+    """
+
+    def __init__(
+        self,
+        deadline: float | None = 60.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_samples: int = 20,
+        latency_window: int = 500,
+        max_workers: int = 32,
+    ):
+        """Initialize the policy.
+
+        Args:
+            deadline: Default seconds allowed per call, retries included (None = no limit).
+            max_retries: Max retries after the first attempt.
+            backoff_base: Backoff ceiling for the first retry, doubled per retry.
+            backoff_max: Max backoff ceiling.
+            hedge: Send a duplicate request when an attempt is slower than usual.
+            hedge_percentile: Latency percentile after which to hedge.
+            hedge_min_samples: Successful calls observed before hedging starts.
+            latency_window: Recent latencies kept for the percentile.
+            max_workers: Threads running blocking attempts; at least the
+                limiter's ``max_concurrent``, since every attempt holds a slot.
+        """
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.totals = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._abandoned = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        deadline: float | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+    ) -> Any:
+        """Run a blocking call under the policy.
+
+        Attempts run in worker threads so the deadline holds even if the
+        provider hangs (an abandoned attempt finishes in the background,
+        holding its slot until then).
+
+        Args:
+            fn: One upstream attempt.
+            deadline: Seconds allowed for this call (defaults to the policy deadline).
+            limiter: Optional concurrency limit each attempt takes a slot of.
+
+        Returns:
+            Result of the first successful attempt.
+        """
+        deadline_at = self._deadline_at(deadline)
+        counts = {"attempts": 0, "retries": 0, "hedges": 0}
+        try:
+            for retry in range(self.max_retries + 1):
+                try:
+                    return self._hedged(fn, deadline_at, counts, limiter)
+                except LLMDeadlineExceeded:
+                    raise
+                except Exception as e:
+                    self._before_retry(e, retry, deadline_at, counts)
+                    time.sleep(self._backoff(retry))
+        finally:
+            self._finish(counts)
+
+    async def acall(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        deadline: float | None = None,
+        limiter: ConcurrencyLimiter | None = None,
+    ) -> Any:
+        """Async version of ``call`` (losing and timed-out attempts are cancelled)."""
+        deadline_at = self._deadline_at(deadline)
+        counts = {"attempts": 0, "retries": 0, "hedges": 0}
+        try:
+            for retry in range(self.max_retries + 1):
+                try:
+                    return await self._ahedged(fn, deadline_at, counts, limiter)
+                except LLMDeadlineExceeded:
+                    raise
+                except Exception as e:
+                    self._before_retry(e, retry, deadline_at, counts)
+                    await asyncio.sleep(self._backoff(retry))
+        finally:
+            self._finish(counts)
+
+    def _hedged(
+        self,
+        fn: Callable[[], Any],
+        deadline_at: float | None,
+        counts: dict[str, int],
+        limiter: ConcurrencyLimiter | None,
+    ) -> Any:
+        """One attempt in a worker thread, plus a hedge if it runs past the hedge delay."""
+        slots: dict[Future, _Slot] = {}
+        started: dict[Future, float] = {}
+
+        def submit(slot: _Slot) -> Future:
+            future = self._executor.submit(self._run_attempt, fn, slot)
+            slots[future] = slot
+            started[future] = time.perf_counter()
+            return future
+
+        first = submit(self._acquire(limiter, deadline_at))
+        counts["attempts"] += 1
+        hedge_delay = self._hedge_delay()
+        error: BaseException | None = None
+
+        try:
+            while started:
+                timeout = self._wait_timeout(deadline_at, hedge_delay, first, started)
+                done, _ = wait(list(started), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start = started.pop(future)
+                    if future.exception() is None:
+                        self._record_latency(start, won_hedge=future is not first)
+                        return future.result()
+                    error = future.exception()
+                if not done:
+                    if self._expired(deadline_at):
+                        self._deadline_exceeded()
+                    if hedge_delay is not None and counts["hedges"] < counts["attempts"]:
+                        slot = self._try_slot(limiter)
+                        if slot is not None:
+                            submit(slot)
+                            counts["hedges"] += 1
+                        hedge_delay = None
+            raise error
+        finally:
+            for future in started:
+                slots[future].abandon()  # Released by _run_attempt once the provider answers
+
+    async def _ahedged(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        deadline_at: float | None,
+        counts: dict[str, int],
+        limiter: ConcurrencyLimiter | None,
+    ) -> Any:
+        """Async version of ``_hedged``."""
+        slots: dict[asyncio.Future, _Slot] = {}
+        started: dict[asyncio.Future, float] = {}
+
+        def submit(slot: _Slot) -> asyncio.Future:
+            task = asyncio.ensure_future(self._arun_attempt(fn, slot))
+            slots[task] = slot
+            started[task] = time.perf_counter()
+            return task
+
+        first = submit(await self._aacquire(limiter, deadline_at))
+        counts["attempts"] += 1
+        hedge_delay = self._hedge_delay()
+        error: BaseException | None = None
+
+        try:
+            while started:
+                timeout = self._wait_timeout(deadline_at, hedge_delay, first, started)
+                done, _ = await asyncio.wait(list(started), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    start = started.pop(task)
+                    if task.exception() is None:
+                        self._record_latency(start, won_hedge=task is not first)
+                        return task.result()
+                    error = task.exception()
+                if not done:
+                    if self._expired(deadline_at):
+                        self._deadline_exceeded()
+                    if hedge_delay is not None and counts["hedges"] < counts["attempts"]:
+                        slot = self._try_slot(limiter)
+                        if slot is not None:
+                            submit(slot)
+                            counts["hedges"] += 1
+                        hedge_delay = None
+            raise error
+        finally:
+            for task in started:
+                task.cancel()
+            for slot in slots.values():
+                slot.release()
+
+    @staticmethod
+    def _run_attempt(fn: Callable[[], Any], slot: _Slot) -> Any:
+        """Run one attempt, releasing its slot when it ends (worker thread)."""
+        try:
+            return fn()
+        finally:
+            slot.release()
+
+    @staticmethod
+    async def _arun_attempt(fn: Callable[[], Awaitable[Any]], slot: _Slot) -> Any:
+        """Async version of ``_run_attempt``."""
+        try:
+            return await fn()
+        finally:
+            slot.release()
+
+    def _acquire(self, limiter: ConcurrencyLimiter | None, deadline_at: float | None) -> _Slot:
+        """Wait for a slot for the next attempt, at most until the deadline."""
+        if limiter is not None:
+            try:
+                limiter.acquire(self._remaining(deadline_at))
+            except LLMQueueTimeout:
+                if self._expired(deadline_at):
+                    self._deadline_exceeded()
+                raise
+        return _Slot(limiter, self)
+
+    async def _aacquire(self, limiter: ConcurrencyLimiter | None, deadline_at: float | None) -> _Slot:
+        """Async version of ``_acquire``."""
+        if limiter is not None:
+            try:
+                await limiter.aacquire(self._remaining(deadline_at))
+            except LLMQueueTimeout:
+                if self._expired(deadline_at):
+                    self._deadline_exceeded()
+                raise
+        return _Slot(limiter, self)
+
+    def _try_slot(self, limiter: ConcurrencyLimiter | None) -> _Slot | None:
+        """A slot for a hedge if one is free right away and no abandoned attempt still runs."""
+        with self._lock:
+            if self._abandoned:
+                return None
+        if limiter is None or limiter.try_acquire():
+            return _Slot(limiter, self)
+        return None
+
+    def _count_abandoned(self, delta: int) -> None:
+        """Track blocking attempts still running after their call returned."""
+        with self._lock:
+            self._abandoned += delta
+
+    def _wait_timeout(
+        self,
+        deadline_at: float | None,
+        hedge_delay: float | None,
+        first: Any,
+        started: dict[Any, float],
+    ) -> float | None:
+        """Seconds to wait for an attempt: until the hedge point or the deadline."""
+        timeouts = []
+        if deadline_at is not None:
+            timeouts.append(self._remaining(deadline_at))
+        if hedge_delay is not None and first in started:
+            timeouts.append(max(started[first] + hedge_delay - time.perf_counter(), 0))
+        return min(timeouts) if timeouts else None
+
+    def _before_retry(
+        self,
+        error: Exception,
+        retry: int,
+        deadline_at: float | None,
+        counts: dict[str, int],
+    ) -> None:
+        """Re-raise unless the error is retryable and a backoff still fits the deadline."""
+        if not is_retryable(error) or retry >= self.max_retries:
+            raise error
+        if deadline_at is not None and time.monotonic() + self.backoff_base >= deadline_at:
+            raise error
+        counts["retries"] += 1
+        logger.warning(f"LLM call failed ({type(error).__name__}), retry {retry + 1}/{self.max_retries}: {error}")
+
+    def _backoff(self, retry: int) -> float:
+        """Full-jitter exponential backoff before the given retry."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**retry))
+
+    def _hedge_delay(self) -> float | None:
+        """Observed latency percentile to hedge after, or None if not hedging yet."""
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.hedge_percentile))
+
+    def _deadline_at(self, deadline: float | None) -> float | None:
+        """Monotonic time a call must finish by."""
+        deadline = deadline if deadline is not None else self.deadline
+        return time.monotonic() + deadline if deadline is not None else None
+
+    @staticmethod
+    def _remaining(deadline_at: float | None) -> float | None:
+        """Seconds left until the deadline (None without one)."""
+        return max(deadline_at - time.monotonic(), 0) if deadline_at is not None else None
+
+    @staticmethod
+    def _expired(deadline_at: float | None) -> bool:
+        """Whether the deadline has passed."""
+        return deadline_at is not None and time.monotonic() >= deadline_at
+
+    def _deadline_exceeded(self) -> None:
+        """Count and raise a deadline overrun."""
+        with self._lock:
+            self.totals["deadline_exceeded"] += 1
+        raise LLMDeadlineExceeded("LLM call exceeded its deadline")
+
+    def _record_latency(self, started: float, won_hedge: bool) -> None:
+        """Record a successful attempt's latency (and whether a hedge won)."""
+        with self._lock:
+            self._latencies.append(time.perf_counter() - started)
+            if won_hedge:
+                self.totals["hedge_wins"] += 1
+
+    def _finish(self, counts: dict[str, int]) -> None:
+        """Add a finished call to the totals and the current request's usage."""
+        with self._lock:
+            self.totals["calls"] += 1
+            self.totals["retries"] += counts["retries"]
+            self.totals["hedges"] += counts["hedges"]
+        usage = _usage.get()
+        if usage is not None:
+            usage.add(counts["attempts"], counts["retries"], counts["hedges"])
+        if counts["retries"] or counts["hedges"]:
+            logger.debug(f"LLM call: {counts}")
+
+    def stats(self) -> dict[str, Any]:
+        """Return call, retry and hedge totals and recent latency percentiles (ms)."""
+        hedge_delay = self._hedge_delay()
+        with self._lock:
+            latencies = np.asarray(self._latencies) * 1000 if self._latencies else np.zeros(1)
+            return {
+                **self.totals,
+                "latency_ms_p50": round(float(np.percentile(latencies, 50)), 1),
+                "latency_ms_p95": round(float(np.percentile(latencies, 95)), 1),
+                "hedge_after_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+                "abandoned_attempts": self._abandoned,
+            }
@@ -0,0 +1,57 @@
+"""Maximal marginal relevance (MMR) selection for diverse retrieval results."""
+
+from typing import Any
+
+import numpy as np
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1)
+
+
+def mmr_select(
+    query_embedding: Any,
+    embeddings: list[Any],
+    k: int,
+    lambda_mult: float = 0.5,
+) -> list[int]:
+    """Pick k candidates balancing relevance to the query and novelty.
+
+    Each step takes the candidate maximizing
+    ``lambda * sim(query, doc) - (1 - lambda) * max sim(doc, selected)``,
+    using one precomputed cosine similarity matrix.
+
+    Args:
+        query_embedding: Query vector.
+        embeddings: Candidate vectors, in retrieval order.
+        k: Number of candidates to select.
+        lambda_mult: 1.0 = pure relevance, 0.0 = pure diversity.
+
+    Returns:
+        Indexes of the selected candidates, in selection order.
+    """
+    n = len(embeddings)
+    if n == 0 or k <= 0:
+        return []
+
+    docs = _unit_rows(np.asarray(embeddings, dtype=np.float32).reshape(n, -1))
+    query = _unit_rows(np.asarray(query_embedding, dtype=np.float32).reshape(1, -1))[0]
+    relevance = docs @ query
+    similarity = docs @ docs.T
+
+    selected = [int(np.argmax(relevance))]
+    max_similarity = similarity[selected[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, n):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_similarity, similarity[best], out=max_similarity)
+
+    return selected
@@ -0,0 +1,237 @@
+"""Pipelined multi-stage ingestion."""
+
+import threading
+import time
+from queue import Queue
+from typing import Any, Callable, Iterable
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Sentinel telling a stage worker that its input is exhausted
+_DONE = object()
+
+RecordBatch = tuple[list[str], list[dict[str, Any]], list[str] | None]
+
+
+class StageStats:
+    """Thread-safe throughput counters for one pipeline stage."""
+
+    def __init__(self, name: str, workers: int):
+        """Initialize counters for a stage."""
+        self.name = name
+        self.workers = workers
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._started: float | None = None
+        self._finished: float | None = None
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float) -> None:
+        """Record one processed batch."""
+        now = time.perf_counter()
+        with self._lock:
+            if self._started is None:
+                self._started = now - seconds
+            self._finished = now
+            self.batches += 1
+            self.items += items
+            self.busy_seconds += seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return stats as a JSON-serializable dict."""
+        wall = (self._finished - self._started) if self._started is not None else 0.0
+        return {
+            "workers": self.workers,
+            "batches": self.batches,
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / wall, 1) if wall > 0 else 0.0,
+        }
+
+
+class IngestionPipeline:
+    """Runs parse -> chunk -> embed -> write as overlapping threaded stages.
+
+    Stages are connected by bounded queues so a slow stage applies
+    backpressure instead of buffering the whole file in memory.
+    """
+
+    def __init__(
+        self,
+        chunk_workers: int = 2,
+        embed_workers: int = 2,
+        write_workers: int = 1,
+        queue_size: int = 4,
+    ):
+        """Initialize pipeline worker config.
+
+        Args:
+            chunk_workers: Threads splitting texts into chunks.
+            embed_workers: Threads computing embeddings.
+            write_workers: Threads writing to the vector store.
+            queue_size: Max batches buffered between two stages.
+        """
+        if min(chunk_workers, embed_workers, write_workers, queue_size) < 1:
+            raise ValueError("Pipeline worker counts and queue size must be >= 1")
+        self.chunk_workers = chunk_workers
+        self.embed_workers = embed_workers
+        self.write_workers = write_workers
+        self.queue_size = queue_size
+
+    def run(
+        self,
+        batches: Iterable[RecordBatch],
+        chunk: Callable[[list[str], list[dict[str, Any]], list[str] | None], RecordBatch],
+        embed: Callable[[list[str]], list[Any]],
+        write: Callable[[list[str], list[dict[str, Any]], list[str] | None, list[Any]], int],
+        on_progress: Callable[[int, int], None] | None = None,
+        on_commit: Callable[[int], None] | None = None,
+    ) -> dict[str, Any]:
+        """Push record batches through the pipeline.
+
+        Args:
+            batches: Iterable of (texts, metadatas, ids) row batches (parse stage).
+            chunk: Splits a row batch into a chunk batch.
+            embed: Embeds a list of chunk texts.
+            write: Writes chunks with embeddings, returns number added.
+            on_progress: Optional callback(rows, chunks) after each write; raising aborts the run.
+            on_commit: Optional callback(batch index) once a row batch is fully written.
+
+        Returns:
+            Dict with rows_loaded, chunks_added and per-stage stats.
+        """
+        stop = threading.Event()
+        errors: list[Exception] = []
+        errors_lock = threading.Lock()
+
+        stats = {
+            "parse": StageStats("parse", 1),
+            "chunk": StageStats("chunk", self.chunk_workers),
+            "embed": StageStats("embed", self.embed_workers),
+            "write": StageStats("write", self.write_workers),
+        }
+        to_chunk: Queue = Queue(self.queue_size)
+        to_embed: Queue = Queue(self.queue_size)
+        to_write: Queue = Queue(self.queue_size)
+
+        def fail(stage: str, e: Exception) -> None:
+            logger.error(f"❌ Pipeline stage '{stage}' failed: {e}")
+            with errors_lock:
+                errors.append(e)
+            stop.set()
+
+        def parse() -> None:
+            iterator = iter(batches)
+            seq = 0
+            try:
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    try:
+                        batch = next(iterator)
+                    except StopIteration:
+                        break
+                    stats["parse"].record(len(batch[0]), time.perf_counter() - start)
+                    to_chunk.put((seq, batch))
+                    seq += 1
+            except Exception as e:
+                fail("parse", e)
+            finally:
+                for _ in range(self.chunk_workers):
+                    to_chunk.put(_DONE)
+
+        def do_chunk(batch: RecordBatch) -> tuple[Any, int]:
+            return chunk(*batch), len(batch[0])
+
+        # Batches can be empty (e.g. incremental runs with nothing changed);
+        # they still pass through so their commit is recorded in order
+        def do_embed(batch: RecordBatch) -> tuple[Any, int]:
+            return (*batch, embed(batch[0]) if batch[0] else []), len(batch[0])
+
+        def do_write(batch: tuple) -> tuple[Any, int]:
+            return None, write(*batch) if batch[0] else 0
+
+        def stage(
+            name: str,
+            fn: Callable[[Any], tuple[Any, int]],
+            in_q: Queue,
+            out_q: Queue | None,
+            downstream_workers: int,
+            remaining: list[int],
+            remaining_lock: threading.Lock,
+        ) -> None:
+            while True:
+                item = in_q.get()
+                if item is _DONE:
+                    break
+                if stop.is_set():
+                    continue  # Drain so upstream never blocks
+                seq, payload = item
+                start = time.perf_counter()
+                try:
+                    result, n = fn(payload)
+                except Exception as e:
+                    fail(name, e)
+                    continue
+                stats[name].record(n, time.perf_counter() - start)
+                if out_q is not None:
+                    out_q.put((seq, result))
+                    continue
+                try:
+                    if on_commit is not None:
+                        on_commit(seq)
+                    if on_progress is not None:
+                        on_progress(stats["chunk"].items, stats["write"].items)
+                except Exception as e:
+                    fail(name, e)
+
+            # Last worker out signals the next stage
+            with remaining_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last and out_q is not None:
+                for _ in range(downstream_workers):
+                    out_q.put(_DONE)
+
+        threads = [threading.Thread(target=parse, name="ingest-parse", daemon=True)]
+        for name, fn, in_q, out_q, workers, downstream in (
+            ("chunk", do_chunk, to_chunk, to_embed, self.chunk_workers, self.embed_workers),
+            ("embed", do_embed, to_embed, to_write, self.embed_workers, self.write_workers),
+            ("write", do_write, to_write, None, self.write_workers, 0),
+        ):
+            remaining = [workers]
+            remaining_lock = threading.Lock()
+            for i in range(workers):
+                threads.append(
+                    threading.Thread(
+                        target=stage,
+                        args=(name, fn, in_q, out_q, downstream, remaining, remaining_lock),
+                        name=f"ingest-{name}-{i}",
+                        daemon=True,
+                    )
+                )
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise errors[0]
+
+        stage_stats = {name: s.as_dict() for name, s in stats.items()}
+        logger.info(
+            f"Pipeline finished in {elapsed:.1f}s: "
+            + ", ".join(f"{n}={s['items_per_second']}/s" for n, s in stage_stats.items())
+        )
+
+        return {
+            "rows_loaded": stats["chunk"].items,
+            "chunks_added": stats["write"].items,
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": stage_stats,
+        }
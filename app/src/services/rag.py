@@ -1,18 +1,73 @@
 """RAG orchestration service."""
 
-from typing import TYPE_CHECKING, Any
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Iterator
 
 from langchain_core.prompts import PromptTemplate
 
 from src.config.logging import get_logger
 from src.prompts.templates import RAG_PROMPT, SOURCE_SELECTION_PROMPT
+from src.services.answer_cache import AnswerCache
+from src.services.context_packer import ContextPacker
 from src.services.llm import LLMClient
+from src.services.llm_resilience import track_llm_calls
+from src.services.mmr import mmr_select
+from src.services.reranker import Reranker
+from src.services.source_matcher import SourceMatcher
 
 if TYPE_CHECKING:
     from src.services.vector_store import VectorStore
 
 logger = get_logger(__name__)
 
+NO_RESULTS_ANSWER = "I couldn't find any relevant reviews to answer your question."
+
+
+def _elapsed_ms(start: float) -> float:
+    """Milliseconds since a perf_counter start."""
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _timed(fn: Callable[..., Any], **kwargs: Any) -> tuple[Any, float]:
+    """Call fn and return (result, elapsed ms)."""
+    start = time.perf_counter()
+    return fn(**kwargs), _elapsed_ms(start)
+
+
+async def _atimed(fn: Callable[..., Awaitable[Any]], **kwargs: Any) -> tuple[Any, float]:
+    """Await fn and return (result, elapsed ms)."""
+    start = time.perf_counter()
+    return await fn(**kwargs), _elapsed_ms(start)
+
+
+def _tracked(fn: Callable[..., dict[str, Any]], *args: Any) -> dict[str, Any]:
+    """Call fn and add the LLM calls, retries and hedges it made as "llm"."""
+    with track_llm_calls() as usage:
+        result = fn(*args)
+    return {**result, "llm": usage.to_dict()}
+
+
+async def _atracked(fn: Callable[..., Awaitable[dict[str, Any]]], *args: Any) -> dict[str, Any]:
+    """Async version of ``_tracked``."""
+    with track_llm_calls() as usage:
+        result = await fn(*args)
+    return {**result, "llm": usage.to_dict()}
+
+
+def _without_embedding(doc: dict[str, Any]) -> dict[str, Any]:
+    """Copy of a retrieved doc without its (large) embedding."""
+    return {k: v for k, v in doc.items() if k != "embedding"}
+
+
+def _matches_filter(metadata: dict[str, Any], where: dict[str, Any]) -> bool:
+    """Evaluate the subset of Chroma where-filters built by RAGService ($in, $or)."""
+    if "$or" in where:
+        return any(_matches_filter(metadata, clause) for clause in where["$or"])
+    return all(metadata.get(field) in condition["$in"] for field, condition in where.items())
+
 
 class RAGService:
     """Orchestrates retrieval and generation."""
@@ -23,6 +78,16 @@ class RAGService:
         vector_store: "VectorStore",
         top_k: int = 5,
         threshold: float = 1.2,
+        source_matcher: SourceMatcher | None = None,
+        speculative: bool = False,
+        speculative_factor: int = 4,
+        answer_cache: AnswerCache | None = None,
+        batch_concurrency: int = 8,
+        context_packer: ContextPacker | None = None,
+        hybrid: bool = False,
+        mmr_lambda: float | None = None,
+        fetch_k: int | None = None,
+        reranker: Reranker | None = None,
     ):
         """Initialize RAG service.
 
@@ -31,11 +96,37 @@ class RAGService:
             vector_store: ChromaDB vector store.
             top_k: Number of documents to retrieve.
             threshold: Distance threshold for filtering.
+            source_matcher: Optional local matcher tried before the LLM source selection.
+            speculative: Overlap a wide retrieval with LLM source selection.
+            speculative_factor: Wide retrieval size as a multiple of top_k.
+            answer_cache: Optional exact/semantic cache of answers.
+            batch_concurrency: Max concurrent LLM calls per ``query_many`` batch.
+            context_packer: Optional token-budgeted packer for the prompt context.
+            hybrid: Fuse BM25 lexical results with vector results (needs a lexical index).
+            mmr_lambda: Re-rank candidates by maximal marginal relevance with this
+                relevance/diversity trade-off (None disables).
+            fetch_k: Candidates retrieved before re-ranking down to top_k (default 4 * top_k).
+            reranker: Optional scorer re-ranking the fetch_k candidates (before MMR).
         """
         self.llm = llm
         self.vector_store = vector_store
         self.top_k = top_k
         self.threshold = threshold
+        self.source_matcher = source_matcher
+        self.speculative = speculative
+        self.speculative_factor = speculative_factor
+        self.answer_cache = answer_cache
+        self.batch_concurrency = batch_concurrency
+        self.context_packer = context_packer
+        self.hybrid = hybrid and vector_store.lexical is not None
+        if self.hybrid and speculative:
+            # Fused rankings change when filtered, so a wide unfiltered result can't be reused
+            logger.info("Speculative retrieval disabled in hybrid mode")
+            self.speculative = False
+        self.mmr_lambda = mmr_lambda
+        self.fetch_k = max(fetch_k or top_k * 4, top_k)
+        self.reranker = reranker
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag")
 
     def query(
         self,
@@ -46,73 +137,1010 @@ class RAGService:
 
         Args:
             question: User question.
-            filter_by_source: Whether to use LLM to pre-filter sources.
+            filter_by_source: Whether to pre-filter sources (local matcher / LLM).
 
         Returns:
-            Dict with answer, sources, number of sources, and metadata.
+            Dict with answer, sources, number of sources, metadata and stage timings (ms).
         """
-        # Step 1: Optionally filter sources using LLM
-        metadata_filter = None
-        selected_sources = []
+        if self.answer_cache is None:
+            return _tracked(self._query, question, filter_by_source)
 
-        if filter_by_source:
-            selected_sources = self._select_sources(question)
-            if selected_sources:
-                metadata_filter = {"app_name": {"$in": selected_sources}}
-                logger.debug(f"Filtering by sources: {selected_sources}")
+        started = time.perf_counter()
+        scope = self._cache_scope(question, filter_by_source)
+        cached, tier, vector = self.answer_cache.lookup(question, scope)
+        if cached is not None:
+            return self._cache_hit(cached, tier, started)
 
-        # Step 2: Retrieve relevant documents
-        docs = self.vector_store.query(
-            query_text=question,
-            n_results=self.top_k,
-            threshold=self.threshold,
-            where=metadata_filter,
+        result = _tracked(self._query, question, filter_by_source)
+        self.answer_cache.store(question, scope, result, vector)
+        return result
+
+    async def aquery(
+        self,
+        question: str,
+        filter_by_source: bool = True,
+    ) -> dict[str, Any]:
+        """Async version of ``query`` for the serving path.
+
+        LLM calls are awaited and retrieval goes through the async vector
+        store, so a waiting request does not hold a worker thread.
+
+        Args:
+            question: User question.
+            filter_by_source: Whether to pre-filter sources (local matcher / LLM).
+
+        Returns:
+            Dict with answer, sources, number of sources, metadata and stage timings (ms).
+        """
+        if self.answer_cache is None:
+            return await _atracked(self._aquery, question, filter_by_source)
+
+        started = time.perf_counter()
+        scope = await asyncio.to_thread(self._cache_scope, question, filter_by_source)
+        cached, tier, vector = await asyncio.to_thread(self.answer_cache.lookup, question, scope)
+        if cached is not None:
+            return self._cache_hit(cached, tier, started)
+
+        result = await _atracked(self._aquery, question, filter_by_source)
+        self.answer_cache.store(question, scope, result, vector)
+        return result
+
+    @staticmethod
+    def _cache_hit(cached: dict[str, Any], tier: str, started: float) -> dict[str, Any]:
+        """Build the response for an answer cache hit."""
+        logger.debug(f"Answer cache hit ({tier})")
+        return {
+            **cached,
+            "timings": {"total_ms": _elapsed_ms(started)},
+            "cache_hit": tier,
+            "llm": {},
+        }
+
+    def query_many(
+        self,
+        questions: list[str],
+        filter_by_source: bool = True,
+        concurrency: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Answer a batch of questions with shared embedding and retrieval.
+
+        All questions are embedded in one call, questions with the same
+        source filter are retrieved in one multi-query Chroma request, and
+        source selection and generation run with bounded concurrency.
+
+        Args:
+            questions: User questions.
+            filter_by_source: Whether to pre-filter sources (local matcher / LLM).
+            concurrency: Max concurrent LLM calls (defaults to batch_concurrency).
+
+        Returns:
+            Result dicts as returned by ``query`` plus "index" and "question",
+            in input order. A question whose source selection or answer
+            failed gets {"index", "question", "error"} instead.
+        """
+        started = time.perf_counter()
+        batch_timings: dict[str, float] = {}
+
+        step = time.perf_counter()
+        vectors = self.vector_store.embed(list(questions))
+        batch_timings["embedding_ms"] = _elapsed_ms(step)
+
+        results, pending, scopes = self._batch_lookup(questions, vectors, filter_by_source, started)
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency or self.batch_concurrency,
+            thread_name_prefix="rag-batch",
+        ) as pool:
+            step = time.perf_counter()
+            selections = [([], None)] * len(pending)
+            if filter_by_source and pending:
+                app_names = self.vector_store.get_all_metadata_values("app_name")
+                categories = None
+                if self.source_matcher is not None:
+                    categories = self.vector_store.get_all_metadata_values("category")
+
+                def select(i: int) -> tuple[list[str], dict[str, Any] | None] | Exception:
+                    try:
+                        return self._select_batch_sources(questions[i], app_names, categories)
+                    except Exception as e:
+                        return e
+
+                selections = list(pool.map(select, pending))
+                failed, pending, selections = self._split_failed(questions, pending, selections)
+                results += failed
+            batch_timings["source_selection_ms"] = _elapsed_ms(step)
+
+            step = time.perf_counter()
+            docs_by_index = {}
+            for where, indexes in self._group_by_filter(pending, selections):
+                docs_lists = self.vector_store.query_many(
+                    [vectors[i] for i in indexes],
+                    n_results=self._candidates,
+                    threshold=self.threshold,
+                    where=where,
+                    include_embeddings=self.mmr_lambda is not None,
+                )
+                docs_by_index.update(self._fuse_batch(questions, indexes, docs_lists, where))
+            batch_timings["retrieval_ms"] = _elapsed_ms(step)
+
+            stage_timings: dict[int, dict[str, float]] = {i: {} for i in pending}
+
+            def answer(i: int, selected_sources: list[str]) -> dict[str, Any]:
+                try:
+                    docs = self._refine(questions[i], docs_by_index[i], stage_timings[i], vectors[i])
+                    context, packing = self._format_context(docs)
+                    step = time.perf_counter()
+                    with track_llm_calls() as usage:
+                        text = self._generate_answer(questions[i], context) if docs else NO_RESULTS_ANSWER
+                    result = self._batch_result(
+                        i, questions[i], selected_sources, docs, text, packing,
+                        {**batch_timings, **stage_timings[i], "generation_ms": _elapsed_ms(step)},
+                        started, scopes.get(i), vectors[i],
+                    )
+                except Exception as e:
+                    return self._batch_error(i, questions[i], e)
+                return {**result, "llm": usage.to_dict()}
+
+            results += pool.map(answer, pending, [sources for sources, _ in selections])
+
+        return sorted(results, key=lambda r: r["index"])
+
+    async def aquery_many(
+        self,
+        questions: list[str],
+        filter_by_source: bool = True,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Async version of ``query_many`` yielding each result as it finishes.
+
+        Args:
+            questions: User questions.
+            filter_by_source: Whether to pre-filter sources (local matcher / LLM).
+            concurrency: Max concurrent LLM calls (defaults to batch_concurrency).
+
+        Yields:
+            Result dicts as returned by ``query`` plus "index" and "question"
+            (or {"index", "question", "error"} for a failed question), in
+            completion order (answer cache hits first).
+        """
+        started = time.perf_counter()
+        batch_timings: dict[str, float] = {}
+        semaphore = asyncio.Semaphore(concurrency or self.batch_concurrency)
+
+        step = time.perf_counter()
+        vectors = await asyncio.to_thread(self.vector_store.embed, list(questions))
+        batch_timings["embedding_ms"] = _elapsed_ms(step)
+
+        hits, pending, scopes = await asyncio.to_thread(
+            self._batch_lookup, questions, vectors, filter_by_source, started
+        )
+        for hit in hits:
+            yield hit
+
+        step = time.perf_counter()
+        selections = [([], None)] * len(pending)
+        if filter_by_source and pending:
+            app_names = await self.vector_store.aget_all_metadata_values("app_name")
+            categories = None
+            if self.source_matcher is not None:
+                categories = await self.vector_store.aget_all_metadata_values("category")
+
+            async def select(i: int) -> tuple[list[str], dict[str, Any] | None]:
+                async with semaphore:
+                    return await self._aselect_batch_sources(questions[i], app_names, categories)
+
+            selections = await asyncio.gather(*(select(i) for i in pending), return_exceptions=True)
+            failed, pending, selections = self._split_failed(questions, pending, selections)
+            for error in failed:
+                yield error
+        batch_timings["source_selection_ms"] = _elapsed_ms(step)
+
+        step = time.perf_counter()
+        groups = self._group_by_filter(pending, selections)
+        docs_lists = await asyncio.gather(
+            *(
+                self.vector_store.aquery_many(
+                    [vectors[i] for i in indexes],
+                    n_results=self._candidates,
+                    threshold=self.threshold,
+                    where=where,
+                    include_embeddings=self.mmr_lambda is not None,
+                )
+                for where, indexes in groups
+            )
         )
+        docs_by_index = {}
+        for (where, indexes), group_docs in zip(groups, docs_lists):
+            docs_by_index.update(
+                await asyncio.to_thread(self._fuse_batch, questions, indexes, group_docs, where)
+            )
+        batch_timings["retrieval_ms"] = _elapsed_ms(step)
+
+        async def answer(i: int, selected_sources: list[str]) -> dict[str, Any]:
+            stage_timings: dict[str, float] = {}
+            try:
+                docs = await asyncio.to_thread(
+                    self._refine, questions[i], docs_by_index[i], stage_timings, vectors[i]
+                )
+                context, packing = self._format_context(docs)
+                async with semaphore:
+                    step = time.perf_counter()
+                    with track_llm_calls() as usage:
+                        if docs:
+                            text = await self.llm.ainvoke(self._format_prompt(questions[i], context))
+                        else:
+                            text = NO_RESULTS_ANSWER
+                    generation_ms = _elapsed_ms(step)
+                result = await asyncio.to_thread(
+                    self._batch_result,
+                    i, questions[i], selected_sources, docs, text, packing,
+                    {**batch_timings, **stage_timings, "generation_ms": generation_ms},
+                    started, scopes.get(i), vectors[i],
+                )
+            except Exception as e:
+                return self._batch_error(i, questions[i], e)
+            return {**result, "llm": usage.to_dict()}
+
+        tasks = [
+            asyncio.create_task(answer(i, sources))
+            for i, (sources, _) in zip(pending, selections)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _batch_lookup(
+        self,
+        questions: list[str],
+        vectors: list[Any],
+        filter_by_source: bool,
+        started: float,
+    ) -> tuple[list[dict[str, Any]], list[int], dict[int, tuple]]:
+        """Serve what the answer cache can for a batch.
+
+        Returns:
+            Tuple of (cache hit results, indexes still to answer, cache scope per index).
+        """
+        hits: list[dict[str, Any]] = []
+        pending: list[int] = []
+        scopes: dict[int, tuple] = {}
+        for i, question in enumerate(questions):
+            if self.answer_cache is not None:
+                scopes[i] = self._cache_scope(question, filter_by_source)
+                cached, tier, _ = self.answer_cache.lookup(question, scopes[i], vectors[i])
+                if cached is not None:
+                    hits.append({"index": i, "question": question, **self._cache_hit(cached, tier, started)})
+                    continue
+            pending.append(i)
+        return hits, pending, scopes
+
+    def _split_failed(
+        self,
+        questions: list[str],
+        indexes: list[int],
+        selections: list[tuple[list[str], dict[str, Any] | None] | BaseException],
+    ) -> tuple[list[dict[str, Any]], list[int], list[tuple[list[str], dict[str, Any] | None]]]:
+        """Separate questions whose source selection failed from the rest of a batch.
+
+        Returns:
+            Tuple of (error results, remaining indexes, their selections).
+        """
+        errors = [
+            self._batch_error(i, questions[i], selection)
+            for i, selection in zip(indexes, selections)
+            if isinstance(selection, BaseException)
+        ]
+        kept = [(i, selection) for i, selection in zip(indexes, selections) if not isinstance(selection, BaseException)]
+        return errors, [i for i, _ in kept], [selection for _, selection in kept]
+
+    @staticmethod
+    def _batch_error(i: int, question: str, error: BaseException) -> dict[str, Any]:
+        """Result for a question of a batch that failed (the others are still answered)."""
+        logger.warning(f"Batch question {i} failed: {type(error).__name__}: {error}")
+        return {"index": i, "question": question, "error": str(error) or type(error).__name__}
+
+    @staticmethod
+    def _group_by_filter(
+        indexes: list[int],
+        selections: list[tuple[list[str], dict[str, Any] | None]],
+    ) -> list[tuple[dict[str, Any] | None, list[int]]]:
+        """Group question indexes by metadata filter (one Chroma query per group)."""
+        groups: dict[str, tuple[dict[str, Any] | None, list[int]]] = {}
+        for i, (_, where) in zip(indexes, selections):
+            key = json.dumps(where, sort_keys=True)
+            groups.setdefault(key, (where, []))[1].append(i)
+        return list(groups.values())
+
+    @property
+    def _retrieve_k(self) -> int:
+        """Docs retrieved per query (over-fetched when they are re-ranked afterwards)."""
+        if self.reranker is not None or self.mmr_lambda is not None:
+            return self.fetch_k
+        return self.top_k
+
+    @property
+    def _candidates(self) -> int:
+        """Vector results fetched per query (more when they are fused with lexical results)."""
+        return self._retrieve_k * 4 if self.hybrid else self._retrieve_k
+
+    def _fuse_batch(
+        self,
+        questions: list[str],
+        indexes: list[int],
+        docs_lists: list[list[dict[str, Any]]],
+        where: dict[str, Any] | None,
+    ) -> dict[int, list[dict[str, Any]]]:
+        """Map question indexes to their docs, fused with lexical results in hybrid mode."""
+        if not self.hybrid:
+            return dict(zip(indexes, docs_lists))
+        return {
+            i: self.vector_store.fuse_lexical(
+                questions[i], docs, self._retrieve_k, where, self._candidates,
+                include_embeddings=self.mmr_lambda is not None,
+            )
+            for i, docs in zip(indexes, docs_lists)
+        }
+
+    def _batch_result(
+        self,
+        i: int,
+        question: str,
+        selected_sources: list[str],
+        docs: list[dict[str, Any]],
+        answer: str,
+        packing: dict[str, int],
+        timings: dict[str, float],
+        started: float,
+        scope: tuple | None,
+        vector: Any,
+    ) -> dict[str, Any]:
+        """Build (and cache) the result for one question of a batch."""
+        timings["total_ms"] = _elapsed_ms(started)
+        result = {
+            "answer": answer,
+            "sources": self._unique_sources(docs),
+            "num_docs": len(docs),
+            "selected_sources": selected_sources,
+            "timings": timings,
+            "context": packing,
+        }
+        if self.answer_cache is not None and scope is not None:
+            self.answer_cache.store(question, scope, result, vector)
+        return {"index": i, "question": question, **result}
+
+    def _cache_scope(self, question: str, filter_by_source: bool) -> tuple:
+        """Answer cache scope: query settings, data version and named sources.
+
+        The data version follows the persisted write token, so answers are
+        dropped after writes by other processes too. Including the locally
+        matched sources keeps the semantic tier from answering "Google Pay"
+        questions with cached "Google Wallet" answers.
+
+        May read collection metadata; call it off the event loop.
+        """
+        named_sources: tuple[str, ...] = ()
+        if self.source_matcher is not None and self.source_matcher.app_names:
+            match = self.source_matcher.match(question)
+            named_sources = tuple(match["apps"] + match["categories"] + match["candidates"])
+        return (filter_by_source, self.top_k, self.vector_store.data_version(), named_sources)
+
+    def _query(
+        self,
+        question: str,
+        filter_by_source: bool = True,
+    ) -> dict[str, Any]:
+        """Answer a question using RAG, without the answer cache."""
+        started = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        # Steps 1-2: Select sources and retrieve relevant documents
+        selected_sources, docs = self._retrieve(question, filter_by_source, timings)
 
         # Step 3: Handle no results
         if not docs:
             logger.info("No relevant documents found")
+            timings["total_ms"] = _elapsed_ms(started)
             return {
-                "answer": "I couldn't find any relevant reviews to answer your question.",
+                "answer": NO_RESULTS_ANSWER,
                 "sources": [],
                 "num_docs": 0,
+                "selected_sources": selected_sources,
+                "timings": timings,
             }
 
-        # Step 4: Format context
-        context = self._format_context(docs)
+        # Step 4: Format (and pack) context
+        context, packing = self._format_context(docs)
 
         # Step 5: Generate answer
+        step = time.perf_counter()
         answer = self._generate_answer(question, context)
+        timings["generation_ms"] = _elapsed_ms(step)
 
         # Step 6: Extract unique sources
-        sources = list({doc["metadata"].get("app_name", "unknown") for doc in docs})
+        timings["total_ms"] = _elapsed_ms(started)
 
         return {
             "answer": answer,
+            "sources": self._unique_sources(docs),
+            "num_docs": len(docs),
+            "selected_sources": selected_sources,
+            "timings": timings,
+            "context": packing,
+        }
+
+    async def _aquery(
+        self,
+        question: str,
+        filter_by_source: bool = True,
+    ) -> dict[str, Any]:
+        """Async version of ``_query``."""
+        started = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        selected_sources, docs = await self._aretrieve(question, filter_by_source, timings)
+
+        if not docs:
+            logger.info("No relevant documents found")
+            timings["total_ms"] = _elapsed_ms(started)
+            return {
+                "answer": NO_RESULTS_ANSWER,
+                "sources": [],
+                "num_docs": 0,
+                "selected_sources": selected_sources,
+                "timings": timings,
+            }
+
+        context, packing = self._format_context(docs)
+        step = time.perf_counter()
+        answer = await self.llm.ainvoke(self._format_prompt(question, context))
+        timings["generation_ms"] = _elapsed_ms(step)
+        timings["total_ms"] = _elapsed_ms(started)
+
+        return {
+            "answer": answer,
+            "sources": self._unique_sources(docs),
+            "num_docs": len(docs),
+            "selected_sources": selected_sources,
+            "timings": timings,
+            "context": packing,
+        }
+
+    def query_stream(
+        self,
+        question: str,
+        filter_by_source: bool = True,
+    ) -> Iterator[tuple[str, Any]]:
+        """Answer a question using RAG, streaming the answer as it is generated.
+
+        Args:
+            question: User question.
+            filter_by_source: Whether to pre-filter sources (local matcher / LLM).
+
+        Yields:
+            ("sources", dict) once retrieval is done, then ("token", str) for
+            each answer fragment, then ("done", dict) with timings.
+        """
+        started = time.perf_counter()
+
+        scope = vector = None
+        if self.answer_cache is not None:
+            scope = self._cache_scope(question, filter_by_source)
+            cached, tier, vector = self.answer_cache.lookup(question, scope)
+            if cached is not None:
+                yield from self._cache_hit_events(cached, tier, started)
+                return
+
+        timings: dict[str, float] = {}
+        selected_sources, docs = self._retrieve(question, filter_by_source, timings)
+        sources = self._unique_sources(docs)
+        timings["time_to_sources_ms"] = _elapsed_ms(started)
+        yield "sources", {
             "sources": sources,
             "num_docs": len(docs),
             "selected_sources": selected_sources,
         }
 
-    def _select_sources(self, question: str) -> list[str]:
-        """Use LLM to select relevant sources."""
+        packing: dict[str, int] = {}
+        if not docs:
+            answer = NO_RESULTS_ANSWER
+            yield "token", answer
+        else:
+            context, packing = self._format_context(docs)
+            step = time.perf_counter()
+            parts = []
+            for token in self.llm.stream(self._format_prompt(question, context)):
+                if not parts:
+                    timings["time_to_first_token_ms"] = _elapsed_ms(started)
+                parts.append(token)
+                yield "token", token
+            answer = "".join(parts)
+            timings["generation_ms"] = _elapsed_ms(step)
+
+        timings["total_ms"] = _elapsed_ms(started)
+        if self.answer_cache is not None:
+            self.answer_cache.store(
+                question,
+                scope,
+                {
+                    "answer": answer,
+                    "sources": sources if docs else [],
+                    "num_docs": len(docs),
+                    "selected_sources": selected_sources,
+                    "timings": timings,
+                    "context": packing,
+                },
+                vector,
+            )
+        yield "done", {"timings": timings, "context": packing}
+
+    async def aquery_stream(
+        self,
+        question: str,
+        filter_by_source: bool = True,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Async version of ``query_stream``.
+
+        Args:
+            question: User question.
+            filter_by_source: Whether to pre-filter sources (local matcher / LLM).
+
+        Yields:
+            ("sources", dict) once retrieval is done, then ("token", str) for
+            each answer fragment, then ("done", dict) with timings.
+        """
+        started = time.perf_counter()
+
+        scope = vector = None
+        if self.answer_cache is not None:
+            scope = await asyncio.to_thread(self._cache_scope, question, filter_by_source)
+            cached, tier, vector = await asyncio.to_thread(self.answer_cache.lookup, question, scope)
+            if cached is not None:
+                for event in self._cache_hit_events(cached, tier, started):
+                    yield event
+                return
+
+        timings: dict[str, float] = {}
+        selected_sources, docs = await self._aretrieve(question, filter_by_source, timings)
+        sources = self._unique_sources(docs)
+        timings["time_to_sources_ms"] = _elapsed_ms(started)
+        yield "sources", {
+            "sources": sources,
+            "num_docs": len(docs),
+            "selected_sources": selected_sources,
+        }
+
+        packing: dict[str, int] = {}
+        if not docs:
+            answer = NO_RESULTS_ANSWER
+            yield "token", answer
+        else:
+            context, packing = self._format_context(docs)
+            step = time.perf_counter()
+            parts = []
+            async for token in self.llm.astream(self._format_prompt(question, context)):
+                if not parts:
+                    timings["time_to_first_token_ms"] = _elapsed_ms(started)
+                parts.append(token)
+                yield "token", token
+            answer = "".join(parts)
+            timings["generation_ms"] = _elapsed_ms(step)
+
+        timings["total_ms"] = _elapsed_ms(started)
+        if self.answer_cache is not None:
+            self.answer_cache.store(
+                question,
+                scope,
+                {
+                    "answer": answer,
+                    "sources": sources if docs else [],
+                    "num_docs": len(docs),
+                    "selected_sources": selected_sources,
+                    "timings": timings,
+                    "context": packing,
+                },
+                vector,
+            )
+        yield "done", {"timings": timings, "context": packing}
+
+    @staticmethod
+    def _cache_hit_events(
+        cached: dict[str, Any],
+        tier: str,
+        started: float,
+    ) -> Iterator[tuple[str, Any]]:
+        """Stream events replaying a cached answer."""
+        yield "sources", {
+            "sources": cached["sources"],
+            "num_docs": cached["num_docs"],
+            "selected_sources": cached.get("selected_sources", []),
+        }
+        yield "token", cached["answer"]
+        yield "done", {"timings": {"total_ms": _elapsed_ms(started)}, "cache_hit": tier}
+
+    def _retrieve(
+        self,
+        question: str,
+        filter_by_source: bool,
+        timings: dict[str, float],
+    ) -> tuple[list[str], list[dict[str, Any]]]:
+        """Select sources and retrieve documents, recording stage timings.
+
+        Returns:
+            Tuple of (selected sources, retrieved docs).
+        """
+        # Step 1: Optionally filter sources (local matcher, then LLM),
+        # overlapping a wide retrieval with the LLM call when speculating
+        metadata_filter = None
+        selected_sources = []
+        docs = None
+
+        if filter_by_source:
+            selected_sources, metadata_filter, docs = self._select_sources_and_retrieve(
+                question, timings
+            )
+            if metadata_filter:
+                logger.debug(f"Filtering by sources: {selected_sources}")
+
+        # Step 2: Retrieve relevant documents (unless speculation already did)
+        if docs is None:
+            step = time.perf_counter()
+            docs = self._search(
+                query_text=question,
+                n_results=self._retrieve_k,
+                threshold=self.threshold,
+                where=metadata_filter,
+            )
+            timings["retrieval_ms"] = _elapsed_ms(step)
+
+        # Step 2b: Optionally re-rank / diversify the over-fetched candidates
+        docs = self._refine(question, docs, timings)
+
+        return selected_sources, docs
+
+    async def _aretrieve(
+        self,
+        question: str,
+        filter_by_source: bool,
+        timings: dict[str, float],
+    ) -> tuple[list[str], list[dict[str, Any]]]:
+        """Async version of ``_retrieve``."""
+        metadata_filter = None
+        selected_sources = []
+        docs = None
+
+        if filter_by_source:
+            selected_sources, metadata_filter, docs = await self._aselect_sources_and_retrieve(
+                question, timings
+            )
+            if metadata_filter:
+                logger.debug(f"Filtering by sources: {selected_sources}")
+
+        if docs is None:
+            step = time.perf_counter()
+            docs = await self._asearch(
+                query_text=question,
+                n_results=self._retrieve_k,
+                threshold=self.threshold,
+                where=metadata_filter,
+            )
+            timings["retrieval_ms"] = _elapsed_ms(step)
+
+        docs = await asyncio.to_thread(self._refine, question, docs, timings)
+
+        return selected_sources, docs
+
+    def _search(self, **kwargs: Any) -> list[dict[str, Any]]:
+        """Retrieve docs with vector (or hybrid lexical + vector) search."""
+        kwargs["include_embeddings"] = self.mmr_lambda is not None
+        if self.hybrid:
+            return self.vector_store.hybrid_query(**kwargs)
+        return self.vector_store.query(**kwargs)
+
+    async def _asearch(self, **kwargs: Any) -> list[dict[str, Any]]:
+        """Async version of ``_search``."""
+        kwargs["include_embeddings"] = self.mmr_lambda is not None
+        if self.hybrid:
+            return await self.vector_store.ahybrid_query(**kwargs)
+        return await self.vector_store.aquery(**kwargs)
+
+    def _refine(
+        self,
+        question: str,
+        docs: list[dict[str, Any]],
+        timings: dict[str, float],
+        vector: Any | None = None,
+    ) -> list[dict[str, Any]]:
+        """Reduce over-fetched candidates to top_k with the re-ranker and/or MMR.
+
+        With both, the re-ranker keeps 2 * top_k candidates for MMR to choose from.
+
+        Args:
+            question: User question.
+            docs: Retrieved candidates, best first.
+            timings: Stage timings to record rerank_ms / mmr_ms in.
+            vector: Precomputed question embedding for MMR.
+
+        Returns:
+            Up to top_k docs.
+        """
+        if self.reranker is not None:
+            keep = self.top_k * 2 if self.mmr_lambda is not None else self.top_k
+            step = time.perf_counter()
+            docs = self.reranker.rerank(question, docs, keep)
+            timings["rerank_ms"] = _elapsed_ms(step)
+
+        if self.mmr_lambda is not None:
+            step = time.perf_counter()
+            docs = self._diversify(question, docs, vector)
+            timings["mmr_ms"] = _elapsed_ms(step)
+
+        return docs[: self.top_k]
+
+    def _diversify(
+        self,
+        question: str,
+        docs: list[dict[str, Any]],
+        vector: Any | None = None,
+    ) -> list[dict[str, Any]]:
+        """Reduce over-fetched candidates to a diverse top-k by maximal marginal relevance.
+
+        Args:
+            question: User question.
+            docs: Candidates retrieved with their embeddings, best first.
+            vector: Precomputed question embedding (computed if missing).
+
+        Returns:
+            Up to top_k docs in MMR selection order, without their embeddings.
+        """
+        if self.mmr_lambda is None or len(docs) <= 1:
+            return [_without_embedding(doc) for doc in docs[: self.top_k]]
+
+        if any(doc.get("embedding") is None for doc in docs):
+            logger.warning("MMR skipped: candidates retrieved without embeddings")
+            return [_without_embedding(doc) for doc in docs[: self.top_k]]
+
+        if vector is None:
+            vector = self.vector_store.embed([question])[0]
+        selected = mmr_select(
+            vector,
+            [doc["embedding"] for doc in docs],
+            self.top_k,
+            self.mmr_lambda,
+        )
+        logger.debug(f"MMR kept candidates {selected} of {len(docs)}")
+        return [_without_embedding(docs[j]) for j in selected]
+
+    @staticmethod
+    def _unique_sources(docs: list[dict[str, Any]]) -> list[str]:
+        """Unique app names of retrieved docs."""
+        return list({doc["metadata"].get("app_name", "unknown") for doc in docs})
+
+    def _select_batch_sources(
+        self,
+        question: str,
+        app_names: set[str],
+        categories: set[str] | None,
+    ) -> tuple[list[str], dict[str, Any] | None]:
+        """Select sources for one question of a batch (app names looked up once per batch)."""
+        if not app_names:
+            return [], None
+
+        resolved, candidates, matched_categories = self._match_sources(question, app_names, categories)
+        if resolved is not None:
+            return resolved
+        apps = self._select_sources_llm(question, candidates)
+        return self._build_source_filter(apps, matched_categories)
+
+    async def _aselect_batch_sources(
+        self,
+        question: str,
+        app_names: set[str],
+        categories: set[str] | None,
+    ) -> tuple[list[str], dict[str, Any] | None]:
+        """Async version of ``_select_batch_sources``."""
+        if not app_names:
+            return [], None
+
+        resolved, candidates, matched_categories = self._match_sources(question, app_names, categories)
+        if resolved is not None:
+            return resolved
+        apps = await self._aselect_sources_llm(question, candidates)
+        return self._build_source_filter(apps, matched_categories)
+
+    def _select_sources_and_retrieve(
+        self,
+        question: str,
+        timings: dict[str, float],
+    ) -> tuple[list[str], dict[str, Any] | None, list[dict[str, Any]] | None]:
+        """Select sources, speculatively retrieving while the LLM decides.
+
+        When the LLM has to be asked, an unfiltered retrieval of
+        ``top_k * speculative_factor`` candidates runs concurrently. If the
+        candidates that pass the selected filter provably are the filtered
+        top-k, they are used directly; otherwise the caller re-queries.
+
+        Returns:
+            Tuple of (selected sources, metadata filter, docs or None to re-query).
+        """
+        step = time.perf_counter()
         app_names = self.vector_store.get_all_metadata_values("app_name")
 
         if not app_names:
-            return []
+            timings["source_selection_ms"] = _elapsed_ms(step)
+            return [], None, None
+
+        resolved, candidates, matched_categories = self._match_sources(question, app_names)
+        if resolved is not None or not self.speculative:
+            if resolved is None:
+                apps = self._select_sources_llm(question, candidates)
+                resolved = self._build_source_filter(apps, matched_categories)
+            timings["source_selection_ms"] = _elapsed_ms(step)
+            return *resolved, None
+
+        n_wide = self._retrieve_k * self.speculative_factor
+        wide_future = self._executor.submit(
+            _timed,
+            self.vector_store.query,
+            query_text=question,
+            n_results=n_wide,
+            threshold=self.threshold,
+            include_embeddings=self.mmr_lambda is not None,
+        )
+
+        try:
+            apps = self._select_sources_llm(question, candidates)
+        except BaseException:
+            wide_future.cancel()
+            raise
+        selected_sources, metadata_filter = self._build_source_filter(apps, matched_categories)
+        timings["source_selection_ms"] = _elapsed_ms(step)
+
+        wide_docs, timings["speculative_retrieval_ms"] = wide_future.result()
+        return selected_sources, metadata_filter, self._speculative_docs(wide_docs, n_wide, metadata_filter)
+
+    async def _aselect_sources_and_retrieve(
+        self,
+        question: str,
+        timings: dict[str, float],
+    ) -> tuple[list[str], dict[str, Any] | None, list[dict[str, Any]] | None]:
+        """Async version of ``_select_sources_and_retrieve``."""
+        step = time.perf_counter()
+        app_names = await self.vector_store.aget_all_metadata_values("app_name")
+
+        if not app_names:
+            timings["source_selection_ms"] = _elapsed_ms(step)
+            return [], None, None
+
+        categories = None
+        if self.source_matcher is not None:
+            categories = await self.vector_store.aget_all_metadata_values("category")
+        resolved, candidates, matched_categories = self._match_sources(question, app_names, categories)
+        if resolved is not None or not self.speculative:
+            if resolved is None:
+                apps = await self._aselect_sources_llm(question, candidates)
+                resolved = self._build_source_filter(apps, matched_categories)
+            timings["source_selection_ms"] = _elapsed_ms(step)
+            return *resolved, None
+
+        n_wide = self._retrieve_k * self.speculative_factor
+        wide_task = asyncio.create_task(
+            _atimed(
+                self.vector_store.aquery,
+                query_text=question,
+                n_results=n_wide,
+                threshold=self.threshold,
+                include_embeddings=self.mmr_lambda is not None,
+            )
+        )
+
+        try:
+            apps = await self._aselect_sources_llm(question, candidates)
+        except BaseException:
+            wide_task.cancel()
+            raise
+        selected_sources, metadata_filter = self._build_source_filter(apps, matched_categories)
+        timings["source_selection_ms"] = _elapsed_ms(step)
+
+        wide_docs, timings["speculative_retrieval_ms"] = await wide_task
+        return selected_sources, metadata_filter, self._speculative_docs(wide_docs, n_wide, metadata_filter)
+
+    def _speculative_docs(
+        self,
+        wide_docs: list[dict[str, Any]],
+        n_wide: int,
+        metadata_filter: dict[str, Any] | None,
+    ) -> list[dict[str, Any]] | None:
+        """Filtered top-k from a wide speculative retrieval, or None if it may be incomplete."""
+        n_results = self._retrieve_k
+        if metadata_filter is None:
+            return wide_docs[:n_results]
+
+        kept = [doc for doc in wide_docs if _matches_filter(doc["metadata"], metadata_filter)]
+        # Exact if enough survived, or the threshold (not n_wide) cut the wide list
+        if len(kept) >= n_results or len(wide_docs) < n_wide:
+            logger.debug(f"Speculative retrieval hit ({len(kept)}/{len(wide_docs)} kept)")
+            return kept[:n_results]
 
+        logger.debug(f"Speculative retrieval miss ({len(kept)}/{len(wide_docs)} kept)")
+        return None
+
+    def _match_sources(
+        self,
+        question: str,
+        app_names: set[str],
+        categories: set[str] | None = None,
+    ) -> tuple[tuple[list[str], dict[str, Any] | None] | None, set[str], list[str]]:
+        """Try to resolve sources with the local matcher.
+
+        Args:
+            question: User question.
+            app_names: Known app names.
+            categories: Known categories (looked up if not given).
+
+        Returns:
+            Tuple of (resolved (sources, filter) or None if the LLM must decide,
+            app names to offer the LLM, categories matched alongside them that
+            the filter built from the LLM's choice keeps).
+        """
+        if self.source_matcher is None:
+            return None, app_names, []
+
+        if categories is None:
+            categories = self.vector_store.get_all_metadata_values("category")
+        self.source_matcher.refresh(app_names, categories)
+        match = self.source_matcher.match(question)
+        if not match["ambiguous"]:
+            logger.debug(f"Locally matched sources: {match}")
+            return self._build_source_filter(match["apps"], match["categories"]), app_names, match["categories"]
+
+        logger.debug(f"Ambiguous sources {match['candidates']}, asking LLM")
+        return None, set(match["candidates"]) | set(match["apps"]), match["categories"]
+
+    @staticmethod
+    def _build_source_filter(
+        apps: list[str],
+        categories: list[str],
+    ) -> tuple[list[str], dict[str, Any] | None]:
+        """Build a Chroma where-filter from selected apps and categories."""
+        clauses = []
+        if apps:
+            clauses.append({"app_name": {"$in": apps}})
+        if categories:
+            clauses.append({"category": {"$in": categories}})
+
+        if not clauses:
+            return [], None
+        return apps + categories, clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def _select_sources_llm(self, question: str, app_names: set[str]) -> list[str]:
+        """Use LLM to select relevant sources."""
+        response = self.llm.invoke_structured(self._source_selection_prompt(question, app_names))
+        return self._selected_sources(response)
+
+    async def _aselect_sources_llm(self, question: str, app_names: set[str]) -> list[str]:
+        """Async version of ``_select_sources_llm``."""
+        response = await self.llm.ainvoke_structured(self._source_selection_prompt(question, app_names))
+        return self._selected_sources(response)
+
+    @staticmethod
+    def _source_selection_prompt(question: str, app_names: set[str]) -> str:
+        """Fill the source selection prompt template."""
         prompt = PromptTemplate(
             template=SOURCE_SELECTION_PROMPT,
             input_variables=["sources", "query"],
         )
 
-        formatted = prompt.format(
+        return prompt.format(
             sources=", ".join(sorted(app_names)),
             query=question,
         )
 
-        response = self.llm.invoke_structured(formatted)
-        
+    @staticmethod
+    def _selected_sources(response: list[str]) -> list[str]:
+        """Interpret the LLM's source selection ("none" means no filter)."""
         # invoke_structured returns a list
         if not response or (isinstance(response, list) and len(response) == 1 and response[0].lower() == "none"):
             return []
@@ -121,8 +1149,15 @@ class RAGService:
 
         return response
 
-    def _format_context(self, docs: list[dict[str, Any]]) -> str:
-        """Format retrieved documents into context string."""
+    def _format_context(self, docs: list[dict[str, Any]]) -> tuple[str, dict[str, int]]:
+        """Format retrieved documents into context string.
+
+        Returns:
+            Tuple of (context, packing stats; empty without a context packer).
+        """
+        if self.context_packer is not None:
+            return self.context_packer.pack(docs)
+
         formatted_docs = []
         for doc in docs:
             meta = doc["metadata"]
@@ -131,15 +1166,18 @@ class RAGService:
             text = doc["text"]
             formatted_docs.append(f"[{app} - {rating}★]\n{text}")
 
-        return "\n\n".join(formatted_docs)
+        return "\n\n".join(formatted_docs), {}
 
-    def _generate_answer(self, question: str, context: str) -> str:
-        """Generate answer using LLM."""
+    def _format_prompt(self, question: str, context: str) -> str:
+        """Fill the RAG prompt template."""
         prompt = PromptTemplate(
             template=RAG_PROMPT,
             input_variables=["context", "question"],
         )
 
-        formatted = prompt.format(context=context, question=question)
-        return self.llm.invoke(formatted)
+        return prompt.format(context=context, question=question)
+
+    def _generate_answer(self, question: str, context: str) -> str:
+        """Generate answer using LLM."""
+        return self.llm.invoke(self._format_prompt(question, context))
     
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""Re-rankers scoring retrieved candidates against the query."""
+
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Any
+
+from src.config.logging import get_logger
+from src.services.lexical_index import tokenize
+
+logger = get_logger(__name__)
+
+
+class Reranker(ABC):
+    """Re-orders retrieved docs by a query/document relevance score.
+
+    Subclasses implement ``score_batch``. Scores are cached per
+    (query, doc id, text) so repeated and overlapping queries only score
+    new candidates, and all uncached candidates are scored in one batch.
+    """
+
+    name = "base"
+
+    def __init__(self, cache_entries: int = 10_000):
+        """Initialize the re-ranker.
+
+        Args:
+            cache_entries: Max cached (query, doc) scores (least recently used evicted; 0 disables).
+        """
+        self.cache_entries = cache_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def score_batch(self, query: str, texts: list[str]) -> list[float]:
+        """Score texts against a query (higher = more relevant)."""
+
+    def rerank(
+        self,
+        query: str,
+        docs: list[dict[str, Any]],
+        top_k: int,
+    ) -> list[dict[str, Any]]:
+        """Re-order docs by score and keep the best.
+
+        Args:
+            query: Search query.
+            docs: Retrieved docs with 'id' and 'text', best first.
+            top_k: Docs to keep.
+
+        Returns:
+            Up to top_k docs with a 'rerank_score', best first (ties keep retrieval order).
+        """
+        if not docs:
+            return []
+
+        query_key = " ".join(query.lower().split())
+        keys = [(query_key, doc.get("id"), hash(doc["text"])) for doc in docs]
+        scores: list[float | None] = [None] * len(docs)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[i] = self._cache[key]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        if missing:
+            fresh = self.score_batch(query, [docs[i]["text"] for i in missing])
+            with self._lock:
+                for i, score in zip(missing, fresh):
+                    scores[i] = float(score)
+                    if self.cache_entries:
+                        self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+
+        with self._lock:
+            self.hits += len(docs) - len(missing)
+            self.misses += len(missing)
+        logger.debug(f"Re-ranked {len(docs)} candidates with {self.name} ({len(missing)} scored)")
+
+        order = sorted(range(len(docs)), key=lambda i: -scores[i])[:top_k]
+        return [{**docs[i], "rerank_score": scores[i]} for i in order]
+
+    def stats(self) -> dict[str, Any]:
+        """Return scorer name, cached scores and cache hit/miss counters."""
+        with self._lock:
+            return {
+                "reranker": self.name,
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class LexicalReranker(Reranker):
+    """Scores docs by how many query terms they contain (no model, microseconds per doc).
+
+    Each query term contributes tf / (tf + 1), so covering more distinct
+    terms beats repeating one, and the sum is divided by the number of
+    query terms.
+    """
+
+    name = "lexical"
+
+    def score_batch(self, query: str, texts: list[str]) -> list[float]:
+        """Score texts by saturated query term coverage."""
+        terms = set(tokenize(query))
+        if not terms:
+            return [0.0] * len(texts)
+
+        scores = []
+        for text in texts:
+            counts = Counter(tokenize(text))
+            matched = sum(counts[t] / (counts[t] + 1) for t in terms if t in counts)
+            scores.append(matched / len(terms))
+        return scores
+
+
+class CrossEncoderReranker(Reranker):
+    """Scores (query, doc) pairs with a local cross-encoder on CPU.
+
+    The model (sentence-transformers) is loaded on first use, and all
+    candidates of a query are scored in one ``predict`` call.
+    """
+
+    name = "cross_encoder"
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 32,
+        max_length: int = 512,
+        cache_entries: int = 10_000,
+    ):
+        """Initialize the re-ranker.
+
+        Args:
+            model_name: Hugging Face cross-encoder model.
+            batch_size: Pairs per forward pass.
+            max_length: Max tokens per (query, doc) pair.
+            cache_entries: Max cached (query, doc) scores.
+        """
+        super().__init__(cache_entries=cache_entries)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def score_batch(self, query: str, texts: list[str]) -> list[float]:
+        """Score texts with the cross-encoder in one batch."""
+        scores = self._get_model().predict(
+            [(query, text) for text in texts],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+        return [float(score) for score in scores]
+
+    def _get_model(self) -> Any:
+        """Load the cross-encoder on first use."""
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    from sentence_transformers import CrossEncoder
+                except ImportError as e:
+                    raise ValueError(
+                        "Cross-encoder re-ranking requires sentence-transformers to be installed."
+                    ) from e
+
+                logger.info(f"Loading cross-encoder: {self.model_name}")
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+            return self._model
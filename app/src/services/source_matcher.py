@@ -0,0 +1,158 @@
+"""Local source selection: match app and category names in a question."""
+
+import re
+import threading
+from typing import Any
+
+from src.config.logging import get_logger
+
+logger = get_logger(__name__)
+
+_TOKEN_RE = re.compile(r"[^\w]+")
+
+# Separators after which app store names usually carry a tagline
+_TAGLINE_RE = re.compile(r"\s*(?::|\s-\s|\s–\s|\s—\s|\|)\s*")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace to single spaces."""
+    return " ".join(_TOKEN_RE.sub(" ", text.lower()).split())
+
+
+def _deletions(phrase: str) -> set[str]:
+    """All strings one character deletion away from a phrase."""
+    return {phrase[:i] + phrase[i + 1:] for i in range(len(phrase))}
+
+
+class SourceMatcher:
+    """Precomputed phrase index over app names, aliases and categories.
+
+    Questions are scanned for the longest known phrase at each token
+    position (exact match first, then one-edit typo match via a
+    symmetric-deletion index), so most questions resolve without an LLM
+    call. A phrase that names several apps, or only matches an app with a
+    typo (ordinary words like "stream" are one edit from "Steam"), is
+    reported as ambiguous so the LLM confirms it.
+    """
+
+    def __init__(
+        self,
+        aliases: dict[str, str] | None = None,
+        min_fuzzy_length: int = 5,
+    ):
+        """Initialize an empty matcher.
+
+        Args:
+            aliases: Extra alias -> app name mappings.
+            min_fuzzy_length: Shortest phrase (in characters) matched with typos.
+        """
+        self.aliases = aliases or {}
+        self.min_fuzzy_length = min_fuzzy_length
+        self.app_names: frozenset[str] = frozenset()
+        self.categories: frozenset[str] = frozenset()
+        self._index: tuple[dict[str, set], dict[str, set], int] = ({}, {}, 0)
+        self._lock = threading.Lock()
+
+    def refresh(self, app_names: set[str], categories: set[str]) -> None:
+        """Rebuild the index if the known apps or categories changed."""
+        app_names = frozenset(app_names)
+        categories = frozenset(categories)
+        if app_names == self.app_names and categories == self.categories:
+            return
+
+        with self._lock:
+            exact: dict[str, set[tuple[str, str]]] = {}
+
+            def add(phrase: str, target: tuple[str, str]) -> None:
+                key = _normalize(phrase)
+                if key:
+                    exact.setdefault(key, set()).add(target)
+
+            for app in app_names:
+                add(app, ("app", app))
+                short = _TAGLINE_RE.split(app, maxsplit=1)[0]
+                if len(short) >= 3:
+                    add(short, ("app", app))
+            for alias, app in self.aliases.items():
+                if app in app_names:
+                    add(alias, ("app", app))
+            for category in categories:
+                add(category.replace("_", " "), ("category", category))
+
+            fuzzy: dict[str, set[tuple[str, str]]] = {}
+            for phrase, targets in exact.items():
+                if len(phrase) < self.min_fuzzy_length:
+                    continue
+                for variant in _deletions(phrase) | {phrase}:
+                    fuzzy.setdefault(variant, set()).update(targets)
+
+            max_tokens = max((len(p.split()) for p in exact), default=0)
+            self._index = (exact, fuzzy, max_tokens)
+            self.app_names = app_names
+            self.categories = categories
+
+        logger.info(f"Source matcher indexed {len(app_names)} apps, {len(categories)} categories")
+
+    def match(self, question: str) -> dict[str, Any]:
+        """Find apps and categories named in a question.
+
+        Args:
+            question: User question.
+
+        Returns:
+            Dict with matched "apps" and "categories", "ambiguous" (a phrase
+            named several apps or was a typo match) and the "candidates" of
+            ambiguous phrases.
+        """
+        exact, fuzzy, max_tokens = self._index
+        tokens = _normalize(question).split()
+
+        apps: set[str] = set()
+        categories: set[str] = set()
+        candidates: set[str] = set()
+
+        i = 0
+        while i < len(tokens):
+            for n in range(min(max_tokens, len(tokens) - i), 0, -1):
+                phrase = " ".join(tokens[i : i + n])
+                targets = exact.get(phrase)
+                typo = targets is None
+                if typo and len(phrase) >= self.min_fuzzy_length:
+                    targets = self._fuzzy_lookup(fuzzy, phrase)
+                if not targets:
+                    continue
+
+                matched_apps = {name for kind, name in targets if kind == "app"}
+                if typo:
+                    # Only ever a suggestion: typo matches never filter by themselves
+                    if not matched_apps:
+                        continue
+                    candidates |= matched_apps
+                    i += n
+                    break
+                if len(matched_apps) > 1:
+                    candidates |= matched_apps
+                else:
+                    apps |= matched_apps
+                categories |= {name for kind, name in targets if kind == "category"}
+                i += n
+                break
+            else:
+                i += 1
+
+        return {
+            "apps": sorted(apps),
+            "categories": sorted(categories),
+            "ambiguous": bool(candidates),
+            "candidates": sorted(candidates),
+        }
+
+    @staticmethod
+    def _fuzzy_lookup(fuzzy: dict[str, set], phrase: str) -> set | None:
+        """Targets within one edit of a phrase, if any."""
+        targets: set = set()
+        for variant in _deletions(phrase) | {phrase}:
+            found = fuzzy.get(variant)
+            if found:
+                targets |= found
+        return targets or None
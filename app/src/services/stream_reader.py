@@ -0,0 +1,89 @@
+"""File-like reader fed incrementally from another thread."""
+
+import io
+import queue
+import threading
+
+# Marks end of input in the chunk queue
+_EOF = b""
+
+
+class ByteQueueReader(io.RawIOBase):
+    """Readable binary stream backed by a bounded queue of byte chunks.
+
+    A producer (e.g. an async request body loop) calls ``feed``/``finish``;
+    a consumer thread reads it like a file, so parsers such as
+    ``pd.read_csv`` can process data as it arrives without a spill file.
+    """
+
+    def __init__(self, max_chunks: int = 16, poll_seconds: float = 0.1):
+        """Initialize the reader.
+
+        Args:
+            max_chunks: Max buffered chunks before ``feed`` blocks (backpressure).
+            poll_seconds: How often blocked calls re-check for abort.
+        """
+        super().__init__()
+        self._queue: queue.Queue[bytes] = queue.Queue(max_chunks)
+        self._poll_seconds = poll_seconds
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._aborted = threading.Event()
+
+    def readable(self) -> bool:
+        """Return True (stream is readable)."""
+        return True
+
+    def feed(self, data: bytes) -> bool:
+        """Append a chunk, blocking while the queue is full.
+
+        Returns:
+            False if the reader was aborted and the chunk was dropped.
+        """
+        if not data:
+            return not self._aborted.is_set()
+        return self._put(bytes(data))
+
+    def finish(self) -> bool:
+        """Signal end of input."""
+        return self._put(_EOF)
+
+    def abort(self) -> None:
+        """Stop both sides: pending and future reads/feeds fail fast."""
+        self._aborted.set()
+
+    def readinto(self, b) -> int:
+        """Fill a buffer with the next available bytes (0 at end of input)."""
+        while not self._buffer:
+            if self._eof:
+                return 0
+            chunk = self._get()
+            if chunk == _EOF:
+                self._eof = True
+            else:
+                self._buffer = memoryview(chunk)
+
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def _put(self, item: bytes) -> bool:
+        """Blocking put that gives up once aborted."""
+        while not self._aborted.is_set():
+            try:
+                self._queue.put(item, timeout=self._poll_seconds)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self) -> bytes:
+        """Blocking get that raises once aborted."""
+        while True:
+            if self._aborted.is_set():
+                raise IOError("Stream aborted")
+            try:
+                return self._queue.get(timeout=self._poll_seconds)
+            except queue.Empty:
+                continue
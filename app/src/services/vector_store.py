@@ -1,18 +1,43 @@
 """ChromaDB vector store service."""
 
+import asyncio
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import chromadb
-from chromadb.api import ClientAPI
+from chromadb.api import AsyncClientAPI, ClientAPI
+from chromadb.api.models.AsyncCollection import AsyncCollection
 from chromadb.config import Settings as ChromaSettings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
 
 from src.config.logging import get_logger
 from src.config.settings import ChromaClientType
+from src.services.embedding_cache import EmbeddingCache
+from src.services.exact_search import CandidateSet, ExactSearch
+from src.services.facets import FacetIndex
+from src.services.lexical_index import LexicalIndex, reciprocal_rank_fusion
 
 logger = get_logger(__name__)
 
+# Identifies Chroma's DefaultEmbeddingFunction in embedding cache keys
+EMBEDDING_MODEL_ID = "chroma-default/all-MiniLM-L6-v2"
+
+
+# Collection metadata key holding a random token replaced before each write (or
+# at the start and end of a write session), so persisted indexes and caches can
+# tell whether the collection changed, in this process or another one
+WRITE_TOKEN_KEY = "write_token"
+
+
+def _query_include(include_embeddings: bool) -> list[str]:
+    """Fields requested from a Chroma query."""
+    include = ["documents", "metadatas", "distances"]
+    return include + ["embeddings"] if include_embeddings else include
+
 
 class VectorStore:
     """Wrapper for ChromaDB operations."""
@@ -27,6 +52,12 @@ class VectorStore:
         chroma_cloud_api_key: str | None = None,
         chroma_tenant_id: str | None = None,
         chroma_database: str | None = None,
+        facet_fields: list[str] | None = None,
+        facet_index_path: Path | None = None,
+        version_refresh_seconds: float = 5.0,
+        embedding_cache: EmbeddingCache | None = None,
+        lexical_index: LexicalIndex | None = None,
+        exact_search: ExactSearch | None = None,
     ):
         """Initialize ChromaDB client and collection.
 
@@ -39,12 +70,44 @@ class VectorStore:
             chroma_cloud_api_key: ChromaDB cloud API key.
             chroma_tenant_id: ChromaDB cloud tenant ID.
             chroma_database: ChromaDB cloud database name.
+            facet_fields: Metadata fields to keep a value -> count index for.
+            facet_index_path: Optional file to persist the facet index to.
+            version_refresh_seconds: How often ``data_version`` re-reads the write token.
+            embedding_cache: Optional cache consulted before the embedding function.
+            lexical_index: Optional BM25 index kept in sync for hybrid queries.
+            exact_search: Optional brute-force search for small filtered candidate sets.
         """
+        self.client_type = client_type
+        self.host = host
+        self.port = port
         self.client = self._create_client(client_type, persist_path, host, port, chroma_cloud_api_key, chroma_tenant_id, chroma_database)
+        self.embedding_function = DefaultEmbeddingFunction()
+        self.embedding_cache = embedding_cache
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
+            embedding_function=self.embedding_function,
             metadata={"hnsw:space": "cosine"},
         )
+        self.facets = FacetIndex(facet_fields or [], path=facet_index_path)
+        self.lexical = lexical_index
+        self.exact_search = exact_search
+        # Bumped on every write so caches can tell when results may have changed
+        self.generation = 0
+        # Last write token read for data_version, and when (monotonic)
+        self.version_refresh_seconds = version_refresh_seconds
+        self._version_token: str | None = None
+        self._version_read_at: float | None = None
+        self._version_lock = threading.Lock()
+        self._facets_lock = threading.Lock()
+        self._lexical_lock = threading.Lock()
+        # Open write sessions and whether the token was replaced in the current one
+        self._write_lock = threading.Lock()
+        self._sessions = 0
+        self._session_token: str | None = None
+        # Async HTTP client for the serving path (HTTP client type only, created on first use)
+        self._async_client: AsyncClientAPI | None = None
+        self._async_collection: AsyncCollection | None = None
+        self._async_lock = asyncio.Lock()
         logger.info(
             f"✅ ChromaDB initialized ({client_type.value}): {collection_name} ({self.collection.count()} documents)"
         )
@@ -94,6 +157,7 @@ class VectorStore:
         metadatas: list[dict[str, Any]] | None = None,  # Can be None, default None
         ids: list[str] | None = None,
         batch_size: int = 500,  # TODO: Subject to change
+        embeddings: list[Any] | None = None,
     ) -> int:
         """Add documents to the collection in batches.
 
@@ -102,6 +166,7 @@ class VectorStore:
             metadatas: Optional metadata for each document.
             ids: Optional IDs (generated if not provided).
             batch_size: Documents per batch.
+            embeddings: Optional precomputed embeddings (computed by Chroma if not provided).
 
         Returns:
             Number of documents added.
@@ -115,6 +180,8 @@ class VectorStore:
 
         total = len(documents)
         added = 0
+        if total:
+            self._record_write()
         for i in range(0, total, batch_size):  # Each batch
             end = min(i + batch_size, total)
             try:
@@ -122,22 +189,228 @@ class VectorStore:
                     documents=documents[i:end],
                     metadatas=metadatas[i:end],
                     ids=ids[i:end],
+                    embeddings=self._batch_embeddings(documents, embeddings, i, end),
                 )
                 added += (end - i)
+                self.generation += 1
+                if self.facets.built:
+                    self.facets.add(metadatas[i:end])
+                if self.lexical is not None and self.lexical.built:
+                    self.lexical.add(ids[i:end], documents[i:end], metadatas[i:end])
                 logger.info(f"   ✅ Batch {i}:{end} added")
             except Exception as e:
                 logger.error(f"❌ Batch {i}:{end} failed: {e}")
+                self._save_facets()
                 raise
 
+        self._save_facets()
         logger.info(f"Added {added} documents. Collection count: {self.collection.count()}")
         return added
 
+    def upsert_documents(
+        self,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        ids: list[str],
+        batch_size: int = 500,
+        embeddings: list[Any] | None = None,
+    ) -> int:
+        """Insert or replace documents by id in batches.
+
+        Args:
+            documents: List of text documents.
+            metadatas: Metadata for each document.
+            ids: Document IDs (existing ids are overwritten).
+            batch_size: Documents per batch.
+            embeddings: Optional precomputed embeddings.
+
+        Returns:
+            Number of documents written.
+        """
+        total = len(documents)
+        written = 0
+        if total:
+            self._record_write()
+        try:
+            for i in range(0, total, batch_size):
+                end = min(i + batch_size, total)
+                previous = self.get_metadatas(ids[i:end]) if self.facets.built else {}
+                self.collection.upsert(
+                    documents=documents[i:end],
+                    metadatas=metadatas[i:end],
+                    ids=ids[i:end],
+                    embeddings=self._batch_embeddings(documents, embeddings, i, end),
+                )
+                if self.facets.built:
+                    self.facets.remove(list(previous.values()))
+                    self.facets.add(metadatas[i:end])
+                if self.lexical is not None and self.lexical.built:
+                    self.lexical.add(ids[i:end], documents[i:end], metadatas[i:end])
+                written += end - i
+                self.generation += 1
+                logger.info(f"   ✅ Batch {i}:{end} upserted")
+        except Exception as e:
+            logger.error(f"❌ Upsert failed after {written} documents: {e}")
+            raise
+        finally:
+            self._save_facets()
+
+        return written
+
+    def delete_documents(self, ids: list[str], batch_size: int = 500) -> int:
+        """Delete documents by id.
+
+        Args:
+            ids: Document IDs to delete (unknown ids are ignored).
+            batch_size: IDs per delete call.
+
+        Returns:
+            Number of documents deleted.
+        """
+        deleted = 0
+        for i in range(0, len(ids), batch_size):
+            existing = self.get_metadatas(ids[i : i + batch_size])
+            if not existing:
+                continue
+            if not deleted:
+                self._record_write()
+            self.collection.delete(ids=list(existing))
+            self.generation += 1
+            if self.facets.built:
+                self.facets.remove(list(existing.values()))
+            if self.lexical is not None and self.lexical.built:
+                self.lexical.remove(list(existing))
+            deleted += len(existing)
+
+        if deleted:
+            self._save_facets()
+            logger.info(f"🗑️ Deleted {deleted} documents")
+        return deleted
+
+    def get_metadatas(self, ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Get stored metadata for the given ids.
+
+        Args:
+            ids: Document IDs to look up.
+
+        Returns:
+            Dict mapping each existing id to its metadata.
+        """
+        if not ids:
+            return {}
+        results = self.collection.get(ids=ids, include=["metadatas"])
+        return {
+            doc_id: meta or {}
+            for doc_id, meta in zip(results["ids"], results["metadatas"])
+        }
+
+    def get_documents(self, ids: list[str]) -> dict[str, str]:
+        """Get stored texts for the given ids.
+
+        Args:
+            ids: Document IDs to look up.
+
+        Returns:
+            Dict mapping each existing id to its text.
+        """
+        if not ids:
+            return {}
+        results = self.collection.get(ids=ids, include=["documents"])
+        return dict(zip(results["ids"], results["documents"]))
+
+    def update_metadatas(
+        self,
+        ids: list[str],
+        metadatas: list[dict[str, Any]],
+        batch_size: int = 500,
+    ) -> int:
+        """Replace the metadata of existing documents, keeping their text and embeddings.
+
+        Args:
+            ids: Document IDs (must exist).
+            metadatas: New metadata for each document.
+            batch_size: Documents per batch.
+
+        Returns:
+            Number of documents updated.
+        """
+        total = len(ids)
+        updated = 0
+        if total:
+            self._record_write()
+        try:
+            for i in range(0, total, batch_size):
+                end = min(i + batch_size, total)
+                previous = self.get_metadatas(ids[i:end]) if self.facets.built else {}
+                self.collection.update(ids=ids[i:end], metadatas=metadatas[i:end])
+                if self.facets.built:
+                    self.facets.remove(list(previous.values()))
+                    self.facets.add(metadatas[i:end])
+                if self.lexical is not None and self.lexical.built:
+                    self.lexical.update_metadatas(ids[i:end], metadatas[i:end])
+                updated += end - i
+                self.generation += 1
+        finally:
+            self._save_facets()
+
+        logger.info(f"Updated metadata of {updated} documents")
+        return updated
+
+    def iter_ids(self, where: dict[str, Any] | None = None, page_size: int = 5000) -> Iterator[str]:
+        """Yield every document id in the collection, one page at a time.
+
+        Args:
+            where: Optional metadata filter.
+            page_size: IDs fetched per request.
+        """
+        offset = 0
+        while True:
+            page = self.collection.get(where=where, include=[], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            yield from page["ids"]
+            offset += len(page["ids"])
+            if len(page["ids"]) < page_size:
+                break
+
+    def _batch_embeddings(
+        self,
+        documents: list[str],
+        embeddings: list[Any] | None,
+        start: int,
+        end: int,
+    ) -> list[Any] | None:
+        """Embeddings for documents[start:end] (None lets Chroma embed)."""
+        if embeddings is not None:
+            return embeddings[start:end]
+        if self.embedding_cache is not None:
+            return self.embed(documents[start:end])
+        return None
+
+    def embed(self, texts: list[str]) -> list[Any]:
+        """Embed texts with the collection's embedding function.
+
+        Goes through the embedding cache when one is configured.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            One embedding vector per text.
+        """
+        if not texts:
+            return []  # Chroma's embedding functions reject empty input
+        if self.embedding_cache is not None:
+            return self.embedding_cache.embed(texts, self.embedding_function)
+        return self.embedding_function(texts)
+
     def query(
         self,
         query_text: str,
         n_results: int = 5,
         threshold: float = 0.8,  # TODO:Subject to change, normal default is 0.7
         where: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
     ) -> list[dict[str, Any]]:
         """Query the collection with distance threshold filtering.
 
@@ -146,32 +419,307 @@ class VectorStore:
             n_results: Max results to return.
             threshold: Max distance (lower = stricter). Cosine: 0=identical, 2=opposite.
             where: Optional metadata filter.
+            include_embeddings: Also return each doc's stored 'embedding'.
+
+        Returns:
+            List of dicts with 'id', 'text', 'metadata', 'distance'.
+        """
+        if self._exact_applies(where):
+            return self._exact_query(
+                self.embed([query_text]), n_results, threshold, where, include_embeddings
+            )[0]
+
+        if self.embedding_cache is not None:
+            query_args = {"query_embeddings": self.embed([query_text])}
+        else:
+            query_args = {"query_texts": [query_text]}
+
+        results = self.collection.query(
+            **query_args,
+            n_results=n_results,
+            where=where,
+            include=_query_include(include_embeddings),
+        )
+        return self._to_docs(results, threshold)
+
+    def hybrid_query(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        threshold: float = 0.8,
+        where: dict[str, Any] | None = None,
+        candidates: int | None = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Query with vector and BM25 search combined by reciprocal rank fusion.
+
+        Args:
+            query_text: Search query.
+            n_results: Max results to return.
+            threshold: Max distance for vector candidates (lexical hits are not thresholded).
+            where: Optional metadata filter.
+            candidates: Candidates taken from each ranking (default 4 * n_results).
+            include_embeddings: Also return each doc's stored 'embedding'.
+
+        Returns:
+            List of dicts with 'id', 'text', 'metadata', 'distance' (None for
+            lexical-only hits) and fused 'score', best first.
+        """
+        candidates = candidates or n_results * 4
+        docs = self.query(
+            query_text, n_results=candidates, threshold=threshold, where=where,
+            include_embeddings=include_embeddings,
+        )
+        return self.fuse_lexical(query_text, docs, n_results, where, candidates, include_embeddings)
+
+    async def ahybrid_query(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        threshold: float = 0.8,
+        where: dict[str, Any] | None = None,
+        candidates: int | None = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Async version of ``hybrid_query``."""
+        candidates = candidates or n_results * 4
+        docs = await self.aquery(
+            query_text, n_results=candidates, threshold=threshold, where=where,
+            include_embeddings=include_embeddings,
+        )
+        return await asyncio.to_thread(
+            self.fuse_lexical, query_text, docs, n_results, where, candidates, include_embeddings
+        )
+
+    def fuse_lexical(
+        self,
+        query_text: str,
+        docs: list[dict[str, Any]],
+        n_results: int = 5,
+        where: dict[str, Any] | None = None,
+        candidates: int | None = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Fuse vector results with BM25 results for the same query.
+
+        Args:
+            query_text: Search query.
+            docs: Vector results, best first.
+            n_results: Max results to return.
+            where: Metadata filter the vector results were retrieved with.
+            candidates: Lexical candidates to fuse (default 4 * n_results).
+            include_embeddings: Also fetch the stored 'embedding' of lexical-only hits.
+
+        Returns:
+            Fused docs as in ``hybrid_query`` (vector docs unchanged without a lexical index).
+        """
+        if self.lexical is None:
+            return docs[:n_results]
+        self._ensure_lexical()
+
+        hits = self.lexical.search(query_text, candidates or n_results * 4, where)
+        fused = reciprocal_rank_fusion([[doc["id"] for doc in docs], [doc_id for doc_id, _ in hits]])[:n_results]
+
+        by_id = {doc["id"]: doc for doc in docs}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in by_id]
+        if missing:
+            include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+            fetched = self.collection.get(ids=missing, include=include)
+            for j, (doc_id, text, meta) in enumerate(
+                zip(fetched["ids"], fetched["documents"], fetched["metadatas"])
+            ):
+                by_id[doc_id] = {"id": doc_id, "text": text, "metadata": meta, "distance": None}
+                if include_embeddings:
+                    by_id[doc_id]["embedding"] = fetched["embeddings"][j]
+
+        logger.debug(f"Hybrid retrieval: {len(docs)} vector + {len(hits)} lexical candidates, {len(missing)} lexical-only")
+        return [{**by_id[doc_id], "score": score} for doc_id, score in fused if doc_id in by_id]
+
+    async def aquery(
+        self,
+        query_text: str,
+        n_results: int = 5,
+        threshold: float = 0.8,
+        where: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Async version of ``query``.
+
+        HTTP stores are queried through Chroma's async client, with the query
+        embedding computed in a worker thread. Local (persistent) and cloud
+        stores have no async client, so the sync query runs in a worker thread.
+
+        Args:
+            query_text: Search query.
+            n_results: Max results to return.
+            threshold: Max distance (lower = stricter).
+            where: Optional metadata filter.
+            include_embeddings: Also return each doc's stored 'embedding'.
 
         Returns:
             List of dicts with 'text', 'metadata', 'distance'.
         """
+        if self.client_type != ChromaClientType.HTTP or self._exact_applies(where):
+            return await asyncio.to_thread(
+                self.query, query_text, n_results, threshold, where, include_embeddings
+            )
+
+        collection = await self._get_async_collection()
+        query_embeddings = await asyncio.to_thread(self.embed, [query_text])
+        results = await collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=_query_include(include_embeddings),
+        )
+        return self._to_docs(results, threshold)
+
+    def query_many(
+        self,
+        query_embeddings: list[Any],
+        n_results: int = 5,
+        threshold: float = 0.8,
+        where: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """Run several queries sharing one metadata filter in a single request.
+
+        Args:
+            query_embeddings: One embedding per query (see ``embed``).
+            n_results: Max results per query.
+            threshold: Max distance (lower = stricter).
+            where: Optional metadata filter applied to every query.
+            include_embeddings: Also return each doc's stored 'embedding'.
+
+        Returns:
+            One list of docs (as in ``query``) per query embedding.
+        """
+        if self._exact_applies(where):
+            return self._exact_query(query_embeddings, n_results, threshold, where, include_embeddings)
+
         results = self.collection.query(
-            query_texts=[query_text],
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=_query_include(include_embeddings),
+        )
+        return [self._to_docs(results, threshold, i) for i in range(len(query_embeddings))]
+
+    async def aquery_many(
+        self,
+        query_embeddings: list[Any],
+        n_results: int = 5,
+        threshold: float = 0.8,
+        where: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """Async version of ``query_many``."""
+        if self.client_type != ChromaClientType.HTTP or self._exact_applies(where):
+            return await asyncio.to_thread(
+                self.query_many, query_embeddings, n_results, threshold, where, include_embeddings
+            )
+
+        collection = await self._get_async_collection()
+        results = await collection.query(
+            query_embeddings=query_embeddings,
             n_results=n_results,
             where=where,
-            include=["documents", "metadatas", "distances"],
+            include=_query_include(include_embeddings),
         )
+        return [self._to_docs(results, threshold, i) for i in range(len(query_embeddings))]
 
+    def _exact_applies(self, where: dict[str, Any] | None) -> bool:
+        """Whether a filtered query should use exact search (facet counts say it is small)."""
+        if self.exact_search is None or not where:
+            return False
+        if self.facets.fields:
+            self._ensure_facets()
+        return self.exact_search.applies(where, self.facets)
+
+    def _exact_query(
+        self,
+        query_embeddings: list[Any],
+        n_results: int,
+        threshold: float,
+        where: dict[str, Any],
+        include_embeddings: bool = False,
+    ) -> list[list[dict[str, Any]]]:
+        """Exact cosine search over the (cached) embeddings of a filter's candidates."""
+        candidate_set = self.exact_search.candidates(
+            where,
+            self.data_version(),
+            lambda: self._load_candidates(where),
+        )
+        results = self.exact_search.search(
+            candidate_set, query_embeddings, n_results, threshold, include_embeddings
+        )
+        logger.debug(f"Exact search over {len(candidate_set)} candidates")
+        return results
+
+    def _load_candidates(self, where: dict[str, Any], page_size: int = 5000) -> CandidateSet:
+        """Fetch ids, texts, metadata and stored embeddings of all documents matching a filter."""
+        ids: list[str] = []
+        documents: list[str] = []
+        metadatas: list[dict[str, Any]] = []
+        embeddings: list[Any] = []
+        offset = 0
+        while True:
+            page = self.collection.get(
+                where=where,
+                include=["documents", "metadatas", "embeddings"],
+                limit=page_size,
+                offset=offset,
+            )
+            if not page["ids"]:
+                break
+            ids.extend(page["ids"])
+            documents.extend(page["documents"])
+            metadatas.extend(page["metadatas"])
+            embeddings.extend(page["embeddings"])
+            offset += len(page["ids"])
+            if len(page["ids"]) < page_size:
+                break
+        return CandidateSet(ids, documents, metadatas, embeddings)
+
+    async def _get_async_collection(self) -> AsyncCollection:
+        """Connect the async HTTP client and open the collection on first use."""
+        async with self._async_lock:
+            if self._async_collection is None:
+                if self._async_client is None:
+                    self._async_client = await chromadb.AsyncHttpClient(
+                        host=self.host,
+                        port=self.port,
+                        settings=ChromaSettings(anonymized_telemetry=False),
+                    )
+                self._async_collection = await self._async_client.get_collection(
+                    name=self.collection.name,
+                    embedding_function=self.embedding_function,
+                )
+            return self._async_collection
+
+    def _to_docs(self, results: dict[str, Any], threshold: float, i: int = 0) -> list[dict[str, Any]]:
+        """Convert the i-th query of a Chroma result into docs within the distance threshold."""
         docs = []
-        if results["documents"] and results["documents"][0]:
-            for text, meta, dist in zip(
-                results["documents"][0],
-                results["metadatas"][0],
-                results["distances"][0],
+        embeddings = results.get("embeddings")
+        if results["documents"] and results["documents"][i]:
+            for j, (doc_id, text, meta, dist) in enumerate(
+                zip(
+                    results["ids"][i],
+                    results["documents"][i],
+                    results["metadatas"][i],
+                    results["distances"][i],
+                )
             ):
                 if dist <= threshold:
-                    docs.append(
-                        {
-                            "text": text,
-                            "metadata": meta,
-                            "distance": dist,
-                        }
-                    )
+                    doc = {
+                        "id": doc_id,
+                        "text": text,
+                        "metadata": meta,
+                        "distance": dist,
+                    }
+                    if embeddings is not None:
+                        doc["embedding"] = embeddings[i][j]
+                    docs.append(doc)
 
         logger.debug(f"Retrieved {len(docs)} documents (threshold: {threshold})")
         return docs
@@ -185,6 +733,10 @@ class VectorStore:
         Returns:
             Set of unique values for the given field.
         """
+        if self.facets.covers(field):
+            self._ensure_facets()
+            return self.facets.values(field)
+
         results = self.collection.get(include=["metadatas"])
         return {
             meta.get(field)
@@ -192,6 +744,164 @@ class VectorStore:
             if meta.get(field) is not None
         }
 
+    def get_metadata_counts(self, field: str) -> dict[Any, int]:
+        """Get document counts per value of an indexed metadata field.
+
+        Args:
+            field: Metadata field name (must be a facet field).
+
+        Returns:
+            Dict mapping each value to its document count.
+        """
+        if not self.facets.covers(field):
+            raise ValueError(f"Field is not indexed: {field}")
+        self._ensure_facets()
+        return self.facets.counts(field)
+
+    async def aget_all_metadata_values(self, field: str) -> set[str]:
+        """Async version of ``get_all_metadata_values``.
+
+        Served from memory when the facet index is loaded, otherwise the
+        collection scan runs in a worker thread.
+        """
+        if self.facets.covers(field) and self.facets.built:
+            return self.facets.values(field)
+        return await asyncio.to_thread(self.get_all_metadata_values, field)
+
+    def _ensure_facets(self) -> None:
+        """Load or build the facet index on first use (once, however many threads ask)."""
+        if self.facets.built:
+            return
+        with self._facets_lock:
+            if self.facets.built:
+                return
+            write_token = self._stored_write_token()
+            if not self.facets.load(self.collection.count(), write_token):
+                self.facets.write_token = write_token
+                self.facets.build(self.collection)
+
+    def _ensure_lexical(self) -> None:
+        """Load or build the lexical index on first use (once, however many threads ask)."""
+        if self.lexical is None or self.lexical.built:
+            return
+        with self._lexical_lock:
+            if self.lexical.built:
+                return
+            write_token = self._stored_write_token()
+            if not self.lexical.load(self.collection.count(), write_token):
+                self.lexical.write_token = write_token
+                self.lexical.build(self.collection)
+
+    def _stored_write_token(self) -> str | None:
+        """Read the collection's write token (fresh, it may have been written by another process)."""
+        return self._stored_metadata().get(WRITE_TOKEN_KEY)
+
+    def data_version(self) -> tuple[str | None, int]:
+        """Version of the collection's contents, for cache keys.
+
+        Combines the persisted write token, re-read at most every
+        ``version_refresh_seconds`` so writes by other processes are noticed,
+        with this process's write generation, which changes immediately.
+        """
+        read_at = self._version_read_at
+        if read_at is None or time.monotonic() - read_at >= self.version_refresh_seconds:
+            with self._version_lock:
+                if self._version_read_at == read_at:
+                    self._version_token = self._stored_write_token()
+                    self._version_read_at = time.monotonic()
+        return self._version_token, self.generation
+
+    @contextmanager
+    def write_session(self) -> Iterator[None]:
+        """Group writes (e.g. one ingest run) under one write token.
+
+        The token is replaced before the session's first write and once more
+        when the last open session ends, instead of before every write call
+        (two Chroma round trips each). Indexes are persisted at the end, so a
+        crash mid-session leaves them stale rather than wrongly current.
+        """
+        with self._write_lock:
+            self._sessions += 1
+        try:
+            yield
+        finally:
+            with self._write_lock:
+                self._sessions -= 1
+                last = not self._sessions
+                if last and self._session_token is not None:
+                    # Readers elsewhere may have cached results mid-session
+                    self._rotate_write_token()
+                if last:
+                    self._session_token = None
+            if last:
+                self.save_indexes()
+
+    def _save_facets(self) -> None:
+        """Persist the facet index after a write (deferred to the end of a write session)."""
+        if not self._sessions:
+            self.facets.save()
+
+    def _record_write(self) -> None:
+        """Replace the collection's write token before a write (once per write session).
+
+        Run before the write so a crash in between only costs a rebuild. An
+        in-process index that missed another process's write (its token no
+        longer matches the stored one) is dropped and rebuilt on next use.
+        """
+        with self._write_lock:
+            if self._sessions and self._session_token is not None:
+                return
+            token = self._rotate_write_token()
+            if self._sessions:
+                self._session_token = token
+
+    def _rotate_write_token(self) -> str:
+        """Replace the stored write token, dropping in-process indexes that missed another write.
+
+        Returns:
+            The new token (the in-process indexes now reflect it).
+        """
+        metadata = self._stored_metadata()
+        stored = metadata.get(WRITE_TOKEN_KEY)
+        token = self._replace_write_token(metadata)
+        for index in (self.facets, self.lexical):
+            if index is None or not index.built:
+                continue
+            if index.write_token != stored:
+                logger.info(f"{type(index).__name__} missed a write from another process, rebuilding on next use")
+                index.built = False
+            index.write_token = token
+        return token
+
+    def _stored_metadata(self) -> dict[str, Any]:
+        """Read the collection metadata (fresh, it may have been written by another process)."""
+        collection = self.client.get_collection(self.collection.name, embedding_function=self.embedding_function)
+        return dict(collection.metadata or {})
+
+    def _replace_write_token(self, metadata: dict[str, Any]) -> str:
+        """Store a new random write token in the collection metadata and return it.
+
+        ``modify`` replaces the metadata, so the other keys are written back.
+        Chroma rejects ``hnsw:*`` keys there; the distance space is kept in
+        the collection configuration regardless.
+        """
+        token = uuid.uuid4().hex
+        kept = {key: value for key, value in metadata.items() if not key.startswith("hnsw:")}
+        self.collection.modify(metadata={**kept, WRITE_TOKEN_KEY: token})
+        return token
+
+    def load_indexes(self) -> None:
+        """Load or build the in-process indexes so writes keep them in sync."""
+        if self.facets.fields:
+            self._ensure_facets()
+        self._ensure_lexical()
+
+    def save_indexes(self) -> None:
+        """Persist the in-process indexes (the lexical index is saved here, not per write)."""
+        self.facets.save()
+        if self.lexical is not None:
+            self.lexical.save()
+
     def count(self) -> int:
         """Return document count in collection."""
         return self.collection.count()
@@ -201,8 +911,22 @@ class VectorStore:
         self.client.delete_collection(self.collection.name)
         self.collection = self.client.get_or_create_collection(
             name=self.collection.name,
+            embedding_function=self.embedding_function,
             metadata={"hnsw:space": "cosine"},
         )
+        with self._write_lock:
+            write_token = self._replace_write_token(dict(self.collection.metadata or {}))
+            if self._sessions:
+                self._session_token = write_token
+        self.generation += 1
+        self._async_collection = None  # Recreated collection has a new id
+        self.facets.reset()
+        self.facets.write_token = write_token
+        if self.lexical is not None:
+            self.lexical.reset()
+            self.lexical.write_token = write_token
+        if not self._sessions:
+            self.save_indexes()
         logger.info("🗑️ Collection cleared")
 
 
@@ -0,0 +1,59 @@
+"""Shared test fixtures."""
+
+import hashlib
+import os
+from pathlib import Path
+
+# Keep test runs from writing log files (read when src.config.logging is imported)
+os.environ.setdefault("LOG_TO_FILE", "false")
+
+import numpy as np
+import pytest
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from src.config.settings import ChromaClientType
+from src.services import vector_store as vector_store_module
+from src.services.vector_store import VectorStore
+
+
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Offline stand-in for Chroma's default model: hashed bag of words."""
+
+    def __init__(self, dim: int = 32):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for text in input:
+            vector = np.zeros(self.dim, dtype=np.float32)
+            for word in text.lower().split():
+                vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1
+            embeddings.append(vector / (np.linalg.norm(vector) or 1.0))
+        return embeddings
+
+    @staticmethod
+    def name() -> str:
+        return "test-hash"
+
+    def get_config(self) -> dict:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: dict) -> "HashEmbeddingFunction":
+        return HashEmbeddingFunction(**config)
+
+
+@pytest.fixture
+def offline_embeddings(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make VectorStores created in the test embed with HashEmbeddingFunction."""
+    monkeypatch.setattr(vector_store_module, "DefaultEmbeddingFunction", HashEmbeddingFunction)
+
+
+@pytest.fixture
+def vector_store(tmp_path: Path, offline_embeddings: None) -> VectorStore:
+    """Persistent Chroma store in a temp dir, embedding offline."""
+    return VectorStore(
+        client_type=ChromaClientType.PERSISTENT,
+        collection_name="test-reviews",
+        persist_path=tmp_path / "chroma",
+    )
@@ -0,0 +1,93 @@
+"""Tests for agent event streaming."""
+
+import asyncio
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+from src.services.agent import AgentService
+from src.services.fake_llm import FakeChatModel
+from src.services.llm import LimitedChatModel
+from src.services.llm_limiter import ConcurrencyLimiter
+
+
+def fake_model() -> FakeChatModel:
+    return FakeChatModel(latency_seconds=0, tokens_per_second=1e6)
+
+
+class FakeRAGService:
+    """Answers with its own LLM call, as RAGService does inside search_reviews."""
+
+    def __init__(self):
+        self.llm = fake_model()
+
+    def query(self, question: str, filter_by_source: bool = True) -> dict:
+        return {"answer": self.llm.invoke("inner answer").content, "sources": ["Alpha"], "num_docs": 1}
+
+    async def aquery(self, question: str, filter_by_source: bool = True) -> dict:
+        return {"answer": (await self.llm.ainvoke("inner answer")).content, "sources": ["Alpha"], "num_docs": 1}
+
+
+EXPECTED_ANSWER = "inner answer\n\n[Based on 1 reviews from: Alpha]"
+
+
+def agent_service() -> AgentService:
+    return AgentService(fake_model(), FakeRAGService(), ingest_service=None, vector_store=None)
+
+
+def test_stream_emits_only_agent_model_tokens():
+    events = list(agent_service().stream("What do users think of Alpha?", "thread-1"))
+
+    assert ("tool", {"name": "search_reviews"}) in events
+    assert "".join(data for event, data in events if event == "token") == EXPECTED_ANSWER
+    assert events[-1] == ("done", {"thread_id": "thread-1"})
+
+
+def test_astream_emits_only_agent_model_tokens():
+    async def collect() -> list:
+        return [event async for event in agent_service().astream("What do users think of Alpha?", "thread-2")]
+
+    events = asyncio.run(collect())
+
+    assert "".join(data for event, data in events if event == "token") == EXPECTED_ANSWER
+
+
+def test_stream_event_skips_complete_message_already_streamed():
+    model_node = {"langgraph_node": "model"}
+    streamed: set[str] = set()
+
+    assert AgentService._stream_event(AIMessageChunk(content="Hi", id="run-1"), model_node, streamed) == ("token", "Hi")
+    assert AgentService._stream_event(AIMessage(content="Hi", id="run-1"), model_node, streamed) is None
+    assert AgentService._stream_event(AIMessage(content="Hello", id="run-2"), model_node, streamed) == ("token", "Hello")
+
+
+def test_stream_event_ignores_llm_calls_inside_tools():
+    tools_node = {"langgraph_node": "tools"}
+
+    assert AgentService._stream_event(AIMessageChunk(content="inner", id="run-3"), tools_node, set()) is None
+    assert AgentService._stream_event(
+        ToolMessage(content="result", name="search_reviews", tool_call_id="call-1"), tools_node, set()
+    ) == ("tool", {"name": "search_reviews"})
+
+
+def test_limited_model_streams_agent_calls_within_limiter_slots():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    service = AgentService(
+        LimitedChatModel(inner=fake_model(), limiter=limiter),
+        FakeRAGService(),
+        ingest_service=None,
+        vector_store=None,
+    )
+
+    events = list(service.stream("What do users think of Alpha?", "thread-3"))
+
+    assert "".join(data for event, data in events if event == "token") == EXPECTED_ANSWER
+    assert limiter.stats()["acquired"] == 2  # Tool call, then the final answer
+    assert limiter.stats()["active"] == 0
+
+
+def test_limited_model_async_invoke_takes_a_slot():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    model = LimitedChatModel(inner=fake_model(), limiter=limiter)
+
+    assert asyncio.run(model.ainvoke("hello there")).content == "hello there"
+    assert limiter.stats()["acquired"] == 1
@@ -0,0 +1,68 @@
+"""Tests for the SQLite LLM response and embedding caches."""
+
+from pathlib import Path
+
+import numpy as np
+
+from src.services.embedding_cache import EmbeddingCache
+from src.services.llm_cache import LLMResponseCache
+
+
+def last_used(cache, table: str, key: str) -> float:
+    return cache._conn.execute(f"SELECT last_used FROM {table} WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_llm_cache_hit_touches_only_stale_entries(tmp_path: Path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", touch_interval=60)
+    cache.put("a", "answer")
+    stored = last_used(cache, "responses", "a")
+
+    assert cache.get("a") == "answer"
+    assert last_used(cache, "responses", "a") == stored
+
+    cache._conn.execute("UPDATE responses SET last_used = last_used - 120")
+    assert cache.get("a") == "answer"
+    assert last_used(cache, "responses", "a") > stored - 120
+
+
+def test_llm_cache_evicts_least_recently_used_below_limit(tmp_path: Path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", max_entries=10, evict_to=0.5)
+    for i in range(11):
+        cache.put(f"k{i}", i)
+        cache._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (i, f"k{i}"))
+
+    assert cache.size() == 5
+    assert cache.get("k10") == 10
+    assert cache.get("k0") is None
+
+
+def test_llm_cache_recounts_before_evicting(tmp_path: Path):
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", max_entries=3)
+    for _ in range(5):
+        cache.put("same", "answer")  # Replacements overcount the estimate
+
+    assert cache.get("same") == "answer"
+    assert cache.size() == 1
+
+
+def test_embedding_cache_hit_touches_only_stale_entries(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", model_id="test", touch_interval=60)
+    embed = lambda texts: [np.ones(4) for _ in texts]
+    cache.embed(["hello"], embed)
+    key = cache.key("hello")
+    stored = last_used(cache, "embeddings", key)
+
+    cache.embed(["hello"], embed)
+    assert last_used(cache, "embeddings", key) == stored
+
+    cache._conn.execute("UPDATE embeddings SET last_used = last_used - 120")
+    cache.embed(["hello"], embed)
+    assert last_used(cache, "embeddings", key) > stored - 120
+    assert cache.stats()["hits"] == 2
+
+
+def test_embedding_cache_evicts_down_to_evict_to(tmp_path: Path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite", model_id="test", max_entries=10, evict_to=0.5)
+    cache.embed([f"text {i}" for i in range(11)], lambda texts: [np.ones(4) for _ in texts])
+
+    assert cache.size() == 5
@@ -0,0 +1,44 @@
+"""Tests for ingest checkpoint fingerprints."""
+
+import shutil
+from pathlib import Path
+
+from src.services.checkpoints import FINGERPRINT_SAMPLE_BYTES, CheckpointStore
+
+
+def write_bytes(path: Path, size: int) -> Path:
+    path.write_bytes(bytes(i % 251 for i in range(size)))
+    return path
+
+
+def test_fingerprint_ignores_name_and_mtime(tmp_path: Path):
+    original = write_bytes(tmp_path / "a.csv", 3 * FINGERPRINT_SAMPLE_BYTES)
+    copy = tmp_path / "upload.tmp"
+    shutil.copyfile(original, copy)
+
+    assert CheckpointStore.fingerprint(copy) == CheckpointStore.fingerprint(original)
+
+
+def test_fingerprint_changes_with_size_and_ends(tmp_path: Path):
+    path = write_bytes(tmp_path / "a.csv", 3 * FINGERPRINT_SAMPLE_BYTES)
+    before = CheckpointStore.fingerprint(path)
+
+    with open(path, "r+b") as f:
+        f.seek(-1, 2)
+        f.write(b"x")
+    edited_tail = CheckpointStore.fingerprint(path)
+
+    with open(path, "ab") as f:
+        f.write(b"\n")
+    appended = CheckpointStore.fingerprint(path)
+
+    assert len({before, edited_tail, appended}) == 3
+
+
+def test_fingerprint_of_small_file_covers_all_bytes(tmp_path: Path):
+    first = tmp_path / "a.csv"
+    second = tmp_path / "b.csv"
+    first.write_bytes(b"id,text\n1,good\n")
+    second.write_bytes(b"id,text\n1,bad!\n")
+
+    assert CheckpointStore.fingerprint(first) != CheckpointStore.fingerprint(second)
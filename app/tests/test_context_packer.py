@@ -0,0 +1,107 @@
+"""Tests for token-budgeted context packing."""
+
+from src.services.context_packer import ContextPacker, approx_tokens
+
+
+def doc(text: str, app: str = "Alpha", **metadata) -> dict:
+    return {"text": text, "metadata": {"app_name": app, "rating": 4, **metadata}}
+
+
+def words(text: str) -> int:
+    return len(text.split())
+
+
+def test_approx_tokens():
+    assert approx_tokens("") == 0
+    assert approx_tokens("hi") == 1
+    assert approx_tokens("x" * 40) == 10
+
+
+def test_chunks_of_a_review_are_merged_in_order_without_overlap():
+    docs = [
+        doc("support never answered my emails", review_id="r1", chunk_index=1),
+        doc("other review entirely", review_id="r2", chunk_index=0),
+        doc("the app kept crashing and support never answered", review_id="r1", chunk_index=0),
+    ]
+
+    context, stats = ContextPacker().pack(docs)
+
+    assert context == (
+        "[Alpha - 4★]\nthe app kept crashing and support never answered my emails"
+        "\n\n[Alpha - 4★]\nother review entirely"
+    )
+    assert stats["chunks"] == 3
+    assert stats["passages"] == 2
+
+
+def test_non_consecutive_chunks_are_marked_as_a_gap():
+    docs = [
+        doc("first part of the review", review_id="r1", chunk_index=0),
+        doc("third part of the review", review_id="r1", chunk_index=2),
+    ]
+
+    context, _ = ContextPacker().pack(docs)
+
+    assert context.endswith("first part of the review … third part of the review")
+
+
+def test_same_review_id_in_other_apps_is_kept_apart():
+    docs = [doc("great budgeting", "Alpha", review_id="1"), doc("slow transfers", "Beta", review_id="1")]
+
+    _, stats = ContextPacker().pack(docs)
+
+    assert stats["passages"] == 2
+
+
+def test_duplicate_and_contained_passages_are_dropped():
+    docs = [
+        doc("The app crashes  on LOGIN every morning"),
+        doc("the app crashes on login every morning"),
+        doc("crashes on login"),
+        doc("transfers are fast"),
+    ]
+
+    context, stats = ContextPacker().pack(docs)
+
+    assert stats["duplicates"] == 2
+    assert stats["passages"] == 2
+    assert "transfers are fast" in context
+
+
+def test_budget_truncates_last_passage_at_a_sentence_boundary():
+    packer = ContextPacker(max_tokens=20, count_tokens=words, min_passage_tokens=3)
+    docs = [
+        doc("one two three four five six"),
+        doc("Login is slow. Transfers fail often. Support is friendly and quick to help out."),
+        doc("never reached"),
+    ]
+
+    context, stats = packer.pack(docs)
+
+    assert context == "[Alpha - 4★]\none two three four five six\n\n[Alpha - 4★]\nLogin is slow. Transfers fail often. …"
+    assert stats["truncated"] == 1
+    assert stats["passages"] == 2
+    assert stats["tokens_packed"] <= 20
+    assert stats["tokens_saved"] == stats["tokens_retrieved"] - stats["tokens_packed"]
+
+
+def test_passage_is_skipped_when_too_little_budget_remains():
+    packer = ContextPacker(max_tokens=12, count_tokens=words, min_passage_tokens=5)
+    docs = [doc("one two three four five six seven"), doc("a long second review that cannot fit at all")]
+
+    context, stats = packer.pack(docs)
+
+    assert context == "[Alpha - 4★]\none two three four five six seven"
+    assert (stats["passages"], stats["truncated"]) == (1, 0)
+
+
+def test_empty_input():
+    assert ContextPacker().pack([]) == ("", {
+        "chunks": 0,
+        "passages": 0,
+        "duplicates": 0,
+        "truncated": 0,
+        "tokens_retrieved": 0,
+        "tokens_packed": 0,
+        "tokens_saved": 0,
+    })
@@ -0,0 +1,118 @@
+"""Tests for exact cosine search over small filtered candidate sets."""
+
+import numpy as np
+import pytest
+
+from src.config.settings import ChromaClientType
+from src.services.exact_search import CandidateSet, ExactSearch
+from src.services.facets import FacetIndex
+from src.services.vector_store import VectorStore
+
+
+def candidate_set(*embeddings: list[float]) -> CandidateSet:
+    ids = [str(i) for i in range(len(embeddings))]
+    return CandidateSet(ids, [f"doc {i}" for i in ids], [{} for _ in ids], list(embeddings))
+
+
+def facet_index(values: dict[str, int]) -> FacetIndex:
+    facets = FacetIndex(["app_name"])
+    facets.reset()
+    facets.add([{"app_name": app} for app, count in values.items() for _ in range(count)])
+    return facets
+
+
+def test_search_returns_top_k_nearest_in_order():
+    candidates = candidate_set([1, 0], [0, 1], [1, 1], [-1, 0])
+
+    results = ExactSearch.search(candidates, [[1, 0.1]], n_results=2, threshold=2.0)[0]
+
+    assert [doc["id"] for doc in results] == ["0", "2"]
+    assert results[0]["distance"] < results[1]["distance"]
+
+
+def test_threshold_drops_top_k_results_without_refilling():
+    candidates = candidate_set([1, 0], [1, 1], [0, 1], [-1, 0])
+
+    # The second nearest is past the threshold; farther candidates are not used instead
+    results = ExactSearch.search(candidates, [[1, 0]], n_results=2, threshold=0.2)[0]
+
+    assert [doc["id"] for doc in results] == ["0"]
+    assert results[0]["distance"] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_search_handles_k_above_candidates_and_multiple_queries():
+    candidates = candidate_set([1, 0], [0, 1])
+
+    results = ExactSearch.search(candidates, [[0, 2], [3, 0]], n_results=10, threshold=2.0, include_embeddings=True)
+
+    assert [[doc["id"] for doc in docs] for docs in results] == [["1", "0"], ["0", "1"]]
+    assert np.linalg.norm(results[0][0]["embedding"]) == pytest.approx(1.0)
+    assert ExactSearch.search(candidate_set(), [[1, 0]], 5, 2.0) == [[]]
+
+
+def test_estimate_bounds_filter_size_from_facets():
+    facets = facet_index({"A": 3, "B": 5, "C": 7})
+
+    assert ExactSearch.estimate({"app_name": {"$in": ["A", "B", "missing"]}}, facets) == 8
+    assert ExactSearch.estimate({"app_name": {"$eq": "C"}}, facets) == 7
+    assert ExactSearch.estimate({"$or": [{"app_name": "A"}, {"app_name": "C"}]}, facets) == 10
+    assert ExactSearch.estimate({"$and": [{"app_name": "B"}, {"category": "Finance"}]}, facets) == 5
+    assert ExactSearch.estimate({"category": "Finance"}, facets) is None
+    assert ExactSearch.estimate({"app_name": {"$ne": "A"}}, facets) is None
+
+
+def test_applies_only_to_small_known_filters():
+    search = ExactSearch(max_candidates=5)
+    facets = facet_index({"A": 3, "B": 5})
+
+    assert search.applies({"app_name": "A"}, facets)
+    assert not search.applies({"app_name": {"$in": ["A", "B"]}}, facets)
+    assert not search.applies(None, facets)
+    assert not search.applies({"app_name": "A"}, FacetIndex(["app_name"]))  # Not built
+
+
+def test_candidates_are_cached_per_generation_with_lru_eviction():
+    search = ExactSearch(cache_entries=2)
+    loads = []
+
+    def loader(name: str):
+        def load() -> CandidateSet:
+            loads.append(name)
+            return candidate_set([1, 0])
+        return load
+
+    first = search.candidates({"app_name": "A"}, 1, loader("A"))
+    assert search.candidates({"app_name": "A"}, 1, loader("A")) is first
+    search.candidates({"app_name": "A"}, 2, loader("A"))  # Store was written
+    search.candidates({"app_name": "B"}, 2, loader("B"))
+    search.candidates({"app_name": "C"}, 2, loader("C"))  # Evicts A
+    search.candidates({"app_name": "A"}, 2, loader("A"))
+
+    assert loads == ["A", "A", "B", "C", "A"]
+
+
+@pytest.mark.usefixtures("offline_embeddings")
+def test_store_exact_query_matches_index_query(tmp_path):
+    def open_store(name: str, exact_search: ExactSearch | None) -> VectorStore:
+        return VectorStore(
+            client_type=ChromaClientType.PERSISTENT,
+            collection_name=name,
+            persist_path=tmp_path / "chroma",
+            facet_fields=["app_name"],
+            exact_search=exact_search,
+        )
+
+    # More noise, more distance: the ranking has no ties
+    texts = ["slow login " + "noise " * i for i in range(20)]
+    metadatas = [{"app_name": "A" if i % 2 else "B"} for i in range(len(texts))]
+    stores = [open_store("exact", ExactSearch()), open_store("indexed", None)]
+    for store in stores:
+        store.add_documents(texts, metadatas, ids=[str(i) for i in range(len(texts))])
+
+    where = {"app_name": {"$in": ["A"]}}
+    exact, indexed = (store.query("slow login", n_results=6, threshold=0.85, where=where) for store in stores)
+
+    assert stores[0]._exact_applies(where)
+    assert [doc["id"] for doc in exact] == [doc["id"] for doc in indexed] == ["1", "3", "5", "7", "9"]
+    assert [doc["distance"] for doc in exact] == pytest.approx([doc["distance"] for doc in indexed], abs=1e-4)
+    assert stores[0].query("slow login", where={"app_name": "missing"}) == []
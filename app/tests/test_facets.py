@@ -0,0 +1,81 @@
+"""Tests for the persisted metadata facet index."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import ChromaClientType
+from src.services.vector_store import VectorStore
+
+pytestmark = pytest.mark.usefixtures("offline_embeddings")
+
+
+def open_store(tmp_path: Path) -> VectorStore:
+    """A store over the shared temp collection with its own persisted facet index."""
+    return VectorStore(
+        client_type=ChromaClientType.PERSISTENT,
+        collection_name="test-reviews",
+        persist_path=tmp_path / "chroma",
+        facet_fields=["app_name"],
+        facet_index_path=tmp_path / "facets.json",
+    )
+
+
+def test_persisted_index_is_stale_after_upsert_elsewhere(tmp_path: Path):
+    writer = open_store(tmp_path)
+    writer.add_documents(["slow login", "great charts"], [{"app_name": "A"}, {"app_name": "B"}], ids=["1", "2"])
+    writer.load_indexes()
+
+    # Another process moves a document to a different app without changing the count
+    other = open_store(tmp_path)
+    other.upsert_documents(["slow login"], [{"app_name": "C"}], ids=["1"])
+
+    assert open_store(tmp_path).get_metadata_counts("app_name") == {"B": 1, "C": 1}
+
+
+def test_persisted_index_loads_when_unchanged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    writer = open_store(tmp_path)
+    writer.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    writer.load_indexes()
+
+    reader = open_store(tmp_path)
+    monkeypatch.setattr(reader.facets, "build", lambda collection: pytest.fail("index rebuilt"))
+    assert reader.get_metadata_counts("app_name") == {"A": 1}
+
+
+def test_index_that_missed_another_write_is_rebuilt(tmp_path: Path):
+    first = open_store(tmp_path)
+    first.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    first.load_indexes()
+
+    open_store(tmp_path).upsert_documents(["slow login"], [{"app_name": "B"}], ids=["1"])
+    first.add_documents(["great charts"], [{"app_name": "A"}], ids=["2"])
+
+    assert first.get_metadata_counts("app_name") == {"A": 1, "B": 1}
+
+
+def test_concurrent_first_use_builds_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    store = open_store(tmp_path)
+    store.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+
+    builds = []
+    build = store.facets.build
+    barrier = threading.Barrier(4)
+
+    def counting_build(collection):
+        builds.append(collection)
+        build(collection)
+
+    def first_use():
+        barrier.wait()
+        store.get_metadata_counts("app_name")
+
+    monkeypatch.setattr(store.facets, "build", counting_build)
+    threads = [threading.Thread(target=first_use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
@@ -0,0 +1,160 @@
+"""Tests for incremental ingestion."""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.services.ingest import IngestionService
+from src.services.pipeline import IngestionPipeline
+from src.services.vector_store import VectorStore
+
+
+def write_reviews(path: Path, app_name: str, review_ids: list[int]) -> Path:
+    """Write a review CSV with one row per review id."""
+    pd.DataFrame(
+        {
+            "enriched_text": [f"APP: {app_name} USER REVIEW: review {i} of {app_name}" for i in review_ids],
+            "review_id": review_ids,
+            "app_name": app_name,
+            "category": "Finance",
+            "rating": 4,
+            "review_date": "2024-01-01",
+            "helpful_count": 0,
+        }
+    ).to_csv(path, index=False)
+    return path
+
+
+def app_ids(vector_store: VectorStore, app_name: str) -> set[str]:
+    return set(vector_store.iter_ids(where={"app_name": app_name}))
+
+
+def test_prune_missing_leaves_other_sources_alone(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store)
+    first = write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2, 3])
+    second = write_reviews(tmp_path / "beta.csv", "Beta", [1, 2])
+
+    service.ingest_file(first, incremental=True, prune_missing=True)
+    result = service.ingest_file(second, incremental=True, prune_missing=True)
+
+    assert result["chunks_deleted"] == 0
+    assert app_ids(vector_store, "Alpha") == {"com.Alpha_1_chunk_0", "com.Alpha_2_chunk_0", "com.Alpha_3_chunk_0"}
+    assert app_ids(vector_store, "Beta") == {"com.Beta_1_chunk_0", "com.Beta_2_chunk_0"}
+
+
+def test_prune_missing_deletes_rows_dropped_from_the_same_source(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store)
+    service.ingest_file(write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2, 3]), incremental=True)
+    service.ingest_file(write_reviews(tmp_path / "beta.csv", "Beta", [1, 2]), incremental=True)
+
+    result = service.ingest_file(
+        write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 3]),
+        incremental=True,
+        prune_missing=True,
+    )
+
+    assert result["chunks_deleted"] == 1
+    assert result["chunks_unchanged"] == 2
+    assert app_ids(vector_store, "Alpha") == {"com.Alpha_1_chunk_0", "com.Alpha_3_chunk_0"}
+    assert len(app_ids(vector_store, "Beta")) == 2
+
+
+def test_incremental_does_not_prune_unless_asked(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store)
+    service.ingest_file(write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2, 3]), incremental=True)
+
+    result = service.ingest_file(write_reviews(tmp_path / "alpha.csv", "Alpha", [1]), incremental=True)
+
+    assert result["chunks_deleted"] == 0
+    assert len(app_ids(vector_store, "Alpha")) == 3
+
+
+def test_prune_missing_requires_incremental_without_limit(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store)
+    path = write_reviews(tmp_path / "alpha.csv", "Alpha", [1])
+
+    with pytest.raises(ValueError):
+        service.ingest_file(path, prune_missing=True)
+    with pytest.raises(ValueError):
+        service.ingest_file(path, incremental=True, limit=1, prune_missing=True)
+
+
+def test_pipelined_incremental_rerun_skips_unchanged_batches(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store, pipeline=IngestionPipeline(chunk_workers=1, embed_workers=1))
+    path = write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2, 3, 4])
+    service.ingest_file(path, incremental=True, batch_size=2)
+
+    result = service.ingest_file(path, incremental=True, batch_size=2)
+
+    assert result["rows_loaded"] == 4
+    assert result["chunks_added"] == 0
+    assert result["chunks_unchanged"] == 4
+
+
+def test_renamed_export_is_not_rewritten(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store)
+    path = write_reviews(tmp_path / "reviews.csv", "Alpha", [1, 2, 3])
+    service.ingest_file(path, incremental=True, source="export-2024-01-01.csv")
+
+    result = service.ingest_file(path, incremental=True, source="export-2024-01-02.csv")
+
+    assert (result["chunks_added"], result["chunks_updated"], result["chunks_unchanged"]) == (0, 0, 3)
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_metadata_change_is_written_without_embedding(
+    tmp_path: Path,
+    vector_store: VectorStore,
+    monkeypatch: pytest.MonkeyPatch,
+    pipelined: bool,
+):
+    pipeline = IngestionPipeline(chunk_workers=1, embed_workers=1) if pipelined else None
+    service = IngestionService(vector_store, pipeline=pipeline)
+    path = write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2, 3])
+    service.ingest_file(path, incremental=True)
+    pd.read_csv(path).assign(rating=2).to_csv(path, index=False)
+
+    embedded = []
+    embed = vector_store.embed
+    monkeypatch.setattr(vector_store, "embed", lambda texts: embedded.extend(texts) or embed(texts))
+    monkeypatch.setattr(vector_store, "upsert_documents", lambda *args, **kwargs: pytest.fail("chunks rewritten"))
+    result = service.ingest_file(path, incremental=True)
+
+    assert (result["chunks_added"], result["chunks_updated"], result["chunks_unchanged"]) == (0, 3, 0)
+    assert embedded == []
+    assert {meta["rating"] for meta in vector_store.get_metadatas(list(app_ids(vector_store, "Alpha"))).values()} == {2}
+
+
+def test_text_change_is_re_embedded(tmp_path: Path, vector_store: VectorStore):
+    service = IngestionService(vector_store)
+    path = write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2])
+    service.ingest_file(path, incremental=True)
+    df = pd.read_csv(path)
+    df.loc[0, "enriched_text"] = "APP: Alpha USER REVIEW: now it crashes"
+    df.to_csv(path, index=False)
+
+    result = service.ingest_file(path, incremental=True)
+
+    assert (result["chunks_added"], result["chunks_updated"], result["chunks_unchanged"]) == (1, 0, 1)
+    assert vector_store.get_documents(["com.Alpha_1_chunk_0"]) == {"com.Alpha_1_chunk_0": "now it crashes"}
+
+
+def test_ingest_run_replaces_the_write_token_at_start_and_end(
+    tmp_path: Path,
+    vector_store: VectorStore,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    service = IngestionService(vector_store, pipeline=IngestionPipeline(chunk_workers=2, embed_workers=1))
+    modifies = []
+    modify = vector_store.collection.modify
+    monkeypatch.setattr(vector_store.collection, "modify", lambda **kwargs: modifies.append(kwargs) or modify(**kwargs))
+
+    service.ingest_file(write_reviews(tmp_path / "alpha.csv", "Alpha", list(range(10))), batch_size=2)
+    service.ingest_file(write_reviews(tmp_path / "alpha.csv", "Alpha", [1, 2]), incremental=True, prune_missing=True)
+
+    assert len(modifies) == 4
+
+
+def test_embed_empty_batch(vector_store: VectorStore):
+    assert vector_store.embed([]) == []
@@ -0,0 +1,216 @@
+"""Tests for the BM25 lexical index and its persistence."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import ChromaClientType
+from src.services.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from src.services.vector_store import VectorStore
+
+
+
+def open_store(tmp_path: Path) -> VectorStore:
+    """A store over the shared temp collection with its own persisted lexical index."""
+    return VectorStore(
+        client_type=ChromaClientType.PERSISTENT,
+        collection_name="test-reviews",
+        persist_path=tmp_path / "chroma",
+        lexical_index=LexicalIndex(["app_name"], path=tmp_path / "lexical.npz"),
+    )
+
+
+def new_index(path: Path | None = None, **kwargs) -> LexicalIndex:
+    """An empty, built index filtering on app_name."""
+    index = LexicalIndex(["app_name"], path=path, **kwargs)
+    index.reset()
+    return index
+
+
+def ids(results: list[tuple[str, float]]) -> list[str]:
+    return [doc_id for doc_id, _ in results]
+
+
+def test_tokenize_keeps_versions_and_drops_stopwords():
+    assert tokenize("The app crashed after v2.3.1 and it's slow") == ["app", "crashed", "after", "v2.3.1", "slow"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]])
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+
+
+def test_bm25_ranks_by_term_frequency_and_rarity():
+    index = new_index()
+    index.add(
+        ["1", "2", "3"],
+        ["login login fails", "login works fine today", "payment fails"],
+        [{"app_name": "A"}] * 3,
+    )
+
+    assert ids(index.search("login")) == ["1", "2"]
+    assert ids(index.search("payment fails")) == ["3", "1"]
+    assert index.search("the") == []
+
+
+def test_add_replaces_existing_ids():
+    index = new_index()
+    index.add(["1"], ["slow login"])
+    index.add(["1"], ["fast payment"])
+
+    assert index.total == 1
+    assert index.search("login") == []
+    assert ids(index.search("payment")) == ["1"]
+
+
+def test_where_filter_restricts_results():
+    index = new_index()
+    index.add(
+        ["1", "2", "3"],
+        ["slow login", "slow login", "slow login"],
+        [{"app_name": "A"}, {"app_name": "B"}, {}],
+    )
+
+    assert ids(index.search("login", where={"app_name": {"$in": ["A"]}})) == ["1"]
+    assert set(ids(index.search("login", where={"$or": [{"app_name": "A"}, {"app_name": {"$eq": "B"}}]}))) == {"1", "2"}
+    assert index.search("login", where={"app_name": {"$in": ["C"]}}) == []
+    assert index.search("login", where={"category": "Finance"}) == []
+    assert index.search("login", where={"app_name": {"$ne": "A"}}) == []
+
+
+def test_update_metadatas_recodes_filter_fields():
+    index = new_index()
+    index.add(["1", "2"], ["slow login", "slow login"], [{"app_name": "A"}, {"app_name": "A"}])
+    index.update_metadatas(["1", "missing"], [{"app_name": "B"}, {"app_name": "B"}])
+
+    assert ids(index.search("login", where={"app_name": "B"})) == ["1"]
+    assert ids(index.search("login", where={"app_name": "A"})) == ["2"]
+
+
+def test_removed_documents_are_tombstoned_until_compaction():
+    index = new_index()
+    index.add(["1", "2"], ["slow login", "slow payment"], [{"app_name": "A"}] * 2)
+    index.remove(["1", "missing"])
+
+    assert index.search("login") == []
+    assert ids(index.search("slow")) == ["2"]
+    assert index.total == 1
+    assert index._dead == 1
+    assert len(index._ids) == 2
+
+
+def test_compaction_drops_dead_slots_and_keeps_scores():
+    n = 1600
+    texts = [f"review {i} about {'login' if i % 2 else 'payment'} speed" for i in range(n)]
+    metas = [{"app_name": f"app{i % 3}"} for i in range(n)]
+    index = new_index()
+    index.add([str(i) for i in range(n)], texts, metas)
+
+    removed = [str(i) for i in range(1200)]
+    index.remove(removed[:1000])
+    assert index._dead == 1000  # Not past the minimum yet
+    index.remove(removed[1000:])
+
+    assert index._dead == 0
+    assert len(index._ids) == index.total == 400
+    fresh = new_index()
+    fresh.add([str(i) for i in range(1200, n)], texts[1200:], metas[1200:])
+    where = {"app_name": {"$in": ["app1"]}}
+    assert index.search("login speed", 50, where) == pytest.approx(fresh.search("login speed", 50, where))
+
+
+def test_compaction_waits_for_the_dead_share():
+    index = new_index(compact_ratio=0.5)
+    index.add([str(i) for i in range(3000)], ["slow login"] * 3000)
+    index.remove([str(i) for i in range(1200)])
+
+    assert index._dead == 1200  # 40% of slots, below the ratio
+    index.remove([str(i) for i in range(1200, 1600)])
+    assert index._dead == 0
+    assert len(index._ids) == 1400
+
+
+def test_save_compacts_and_round_trips(tmp_path: Path):
+    path = tmp_path / "lexical.npz"
+    index = new_index(path)
+    index.add(["1", "2", "3"], ["slow login", "slow payment", "login crash"], [{"app_name": "A"}, {"app_name": "B"}, {}])
+    index.remove(["2"])
+    index.write_token = "token"
+    index.save()
+    assert index._dead == 0
+
+    loaded = LexicalIndex(["app_name"], path=path)
+    assert not loaded.load(2, "other")
+    assert not loaded.load(3, "token")
+    assert loaded.load(2, "token")
+    for query, where in [("login", None), ("slow", None), ("login", {"app_name": "A"})]:
+        assert loaded.search(query, where=where) == pytest.approx(index.search(query, where=where))
+
+
+@pytest.mark.usefixtures("offline_embeddings")
+def test_persisted_index_is_stale_after_upsert_elsewhere(tmp_path: Path):
+    writer = open_store(tmp_path)
+    writer.add_documents(["slow login screen", "great budget charts"], [{"app_name": "A"}] * 2, ids=["1", "2"])
+    writer.load_indexes()
+
+    # Another process rewrites a document's text without changing the count
+    other = open_store(tmp_path)
+    other.upsert_documents(["crashes on payment"], [{"app_name": "A"}], ids=["1"])
+
+    reader = open_store(tmp_path)
+    reader.load_indexes()
+    assert [doc_id for doc_id, _ in reader.lexical.search("payment")] == ["1"]
+    assert reader.lexical.search("login") == []
+
+
+@pytest.mark.usefixtures("offline_embeddings")
+def test_persisted_index_loads_when_unchanged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    writer = open_store(tmp_path)
+    writer.add_documents(["slow login screen"], [{"app_name": "A"}], ids=["1"])
+    writer.load_indexes()
+
+    reader = open_store(tmp_path)
+    monkeypatch.setattr(reader.lexical, "build", lambda collection: pytest.fail("index rebuilt"))
+    reader.load_indexes()
+    assert [doc_id for doc_id, _ in reader.lexical.search("login")] == ["1"]
+
+
+@pytest.mark.usefixtures("offline_embeddings")
+def test_index_that_missed_another_write_is_rebuilt(tmp_path: Path):
+    first = open_store(tmp_path)
+    first.add_documents(["slow login screen"], [{"app_name": "A"}], ids=["1"])
+    first.load_indexes()
+
+    open_store(tmp_path).add_documents(["crashes on payment"], [{"app_name": "A"}], ids=["2"])
+    first.add_documents(["great budget charts"], [{"app_name": "A"}], ids=["3"])
+
+    first.load_indexes()
+    assert {doc_id for doc_id, _ in first.lexical.search("payment charts")} == {"2", "3"}
+
+
+@pytest.mark.usefixtures("offline_embeddings")
+def test_concurrent_first_use_builds_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    store = open_store(tmp_path)
+    store.add_documents(["slow login screen"], [{"app_name": "A"}], ids=["1"])
+
+    builds = []
+    build = store.lexical.build
+    barrier = threading.Barrier(4)
+
+    def counting_build(collection):
+        builds.append(collection)
+        build(collection)
+
+    def first_use():
+        barrier.wait()
+        store.fuse_lexical("login", [], 5)
+
+    monkeypatch.setattr(store.lexical, "build", counting_build)
+    threads = [threading.Thread(target=first_use) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
@@ -0,0 +1,16 @@
+"""Tests for LLM response parsing."""
+
+from src.services.llm import LLMClient
+
+
+def test_parse_structured_drops_think_block():
+    assert LLMClient._parse_structured("<think>Venmo? maybe</think>Venmo, Cash App") == ["Venmo", "Cash App"]
+
+
+def test_parse_structured_drops_unterminated_think_block():
+    # Cut off by the fast tier's max tokens before the answer
+    assert LLMClient._parse_structured("<think>The user asks about Venmo, so") == []
+
+
+def test_parse_structured_skips_empty_items():
+    assert LLMClient._parse_structured("Venmo, ,Cash App,") == ["Venmo", "Cash App"]
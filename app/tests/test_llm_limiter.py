@@ -0,0 +1,198 @@
+"""Tests for the LLM concurrency limiter and request coalescing."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.llm_limiter import ConcurrencyLimiter, LLMQueueTimeout, SingleFlight, _Waiter
+
+
+def wait_until(condition, timeout: float = 2.0) -> None:
+    """Poll until condition() holds (threads need a moment to queue)."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_released_slot_goes_to_oldest_waiter():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    limiter.acquire()
+    order = []
+
+    def queued(name: str) -> None:
+        limiter.acquire()
+        order.append(name)
+        limiter.release()
+
+    threads = []
+    for name in ["first", "second", "third"]:
+        thread = threading.Thread(target=queued, args=(name,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: limiter.stats()["queued"] == len(threads))
+
+    limiter.release()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["first", "second", "third"]
+    assert limiter.stats()["active"] == 0
+
+
+def test_new_arrival_cannot_jump_the_queue():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    limiter.acquire()
+    thread = threading.Thread(target=limiter.acquire)
+    thread.start()
+    wait_until(lambda: limiter.stats()["queued"] == 1)
+
+    limiter.release()  # Handed to the waiter, never free in between
+    thread.join()
+
+    assert limiter.stats()["active"] == 1
+    assert not limiter.try_acquire()
+
+
+def test_try_acquire_only_takes_a_free_slot():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release()
+    assert limiter.try_acquire()
+
+
+def test_queue_timeout_leaves_the_queue():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+    limiter.acquire()
+
+    with pytest.raises(LLMQueueTimeout):
+        limiter.acquire()
+
+    stats = limiter.stats()
+    assert (stats["queued"], stats["timeouts"], stats["active"]) == (0, 1, 1)
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+def test_per_call_timeout_is_capped_by_queue_timeout():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+    limiter.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(LLMQueueTimeout):
+        limiter.acquire(timeout=5)
+    assert time.monotonic() - started < 1
+
+
+def test_slot_granted_as_the_wait_times_out_is_kept():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    limiter.acquire()
+    waiter = _Waiter(event=threading.Event())
+    assert not limiter._enter(waiter)
+
+    # The release lands between the wait timing out and the waiter leaving the queue
+    limiter.release()
+    limiter._abandon(waiter, 0.01)
+
+    stats = limiter.stats()
+    assert (stats["active"], stats["queued"], stats["timeouts"]) == (1, 0, 0)
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+def test_async_waiters_are_served_in_order():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    order = []
+
+    async def queued(name: str) -> None:
+        async with limiter.aslot():
+            order.append(name)
+
+    async def main():
+        await limiter.aacquire()
+        tasks = []
+        for name in ["first", "second", "third"]:
+            tasks.append(asyncio.create_task(queued(name)))
+            await asyncio.sleep(0)  # Let the task queue before the next one
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == ["first", "second", "third"]
+    assert limiter.stats()["active"] == 0
+
+
+def test_async_queue_timeout():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=0.05)
+
+    async def main():
+        await limiter.aacquire()
+        with pytest.raises(LLMQueueTimeout):
+            await limiter.aacquire()
+
+    asyncio.run(main())
+    assert limiter.stats()["queued"] == 0
+    assert limiter.stats()["timeouts"] == 1
+
+
+def test_cancelled_waiter_returns_a_slot_granted_to_it():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+
+    async def main():
+        await limiter.aacquire()
+        task = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0)
+        limiter.release()  # Granted to the task, which is cancelled before it resumes
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+
+    async def main():
+        await limiter.aacquire()
+        task = asyncio.create_task(limiter.aacquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        limiter.release()
+
+    asyncio.run(main())
+    stats = limiter.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow() -> str:
+        started.set()
+        release.wait()
+        return "answer"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+    follower.start()
+    wait_until(lambda: flight.shared == 1)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert results == ["answer", "answer"]
+    assert flight.stats() == {"calls": 1, "shared": 1}
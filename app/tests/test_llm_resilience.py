@@ -0,0 +1,270 @@
+"""Tests for LLM deadlines, retries and hedged requests."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.llm_limiter import ConcurrencyLimiter
+from src.services.llm_resilience import LLMDeadlineExceeded, ResiliencePolicy, is_retryable, track_llm_calls
+
+
+def hedging_policy(hedge_after: float, **kwargs) -> ResiliencePolicy:
+    """Policy that hedges after ``hedge_after`` seconds from the first call on."""
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=1, backoff_base=0.01, **kwargs)
+    policy._latencies.append(hedge_after)
+    return policy
+
+
+class SlowThenFast:
+    """Upstream whose first request hangs and later ones answer right away."""
+
+    def __init__(self, slow_seconds: float = 1.0):
+        self.slow_seconds = slow_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(self.slow_seconds)
+            return "slow"
+        return "fast"
+
+    async def acall(self) -> str:
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(self.slow_seconds)
+            return "slow"
+        return "fast"
+
+
+def wait_until(condition, timeout: float = 3.0) -> None:
+    """Poll until condition() holds (abandoned attempts end in the background)."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_losing_hedge_keeps_its_slot_until_it_ends():
+    limiter = ConcurrencyLimiter(max_concurrent=2)
+    policy = hedging_policy(0.05)
+    upstream = SlowThenFast(slow_seconds=0.3)
+
+    assert policy.call(upstream, limiter=limiter) == "fast"
+    assert policy.totals["hedges"] == 1
+    assert policy.totals["hedge_wins"] == 1
+    # The losing attempt is still waiting on the provider, so still counts
+    assert limiter.stats()["active"] == 1
+    assert policy.stats()["abandoned_attempts"] == 1
+    wait_until(lambda: limiter.stats()["active"] == 0)
+    assert policy.stats()["abandoned_attempts"] == 0
+
+
+def test_hedge_clock_excludes_queue_wait():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    policy = hedging_policy(0.2)
+    limiter.acquire()
+    threading.Timer(0.3, limiter.release).start()
+
+    # Queued for 0.3s (past the hedge delay), then answers within it
+    assert policy.call(lambda: time.sleep(0.1) or "ok", limiter=limiter) == "ok"
+    assert policy.totals["hedges"] == 0
+
+
+def test_no_hedge_without_a_free_slot():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    policy = hedging_policy(0.05)
+    upstream = SlowThenFast(slow_seconds=0.2)
+
+    assert policy.call(upstream, limiter=limiter) == "slow"
+    assert policy.totals["hedges"] == 0
+    assert upstream.calls == 1
+
+
+def test_hung_attempt_keeps_its_slot_past_the_deadline():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    policy = ResiliencePolicy(deadline=0.1)
+    hung = threading.Event()
+
+    with pytest.raises(LLMDeadlineExceeded):
+        policy.call(lambda: hung.wait(5), limiter=limiter)
+    assert policy.totals["deadline_exceeded"] == 1
+
+    # The provider still has the request, so the next call cannot reach it
+    reached = []
+    with pytest.raises(LLMDeadlineExceeded):
+        policy.call(lambda: reached.append(True), limiter=limiter)
+    assert reached == []
+
+    hung.set()
+    wait_until(lambda: limiter.stats()["active"] == 0)
+    assert policy.call(lambda: "ok", limiter=limiter) == "ok"
+
+
+def test_no_hedge_while_abandoned_attempts_run():
+    limiter = ConcurrencyLimiter(max_concurrent=3)
+    policy = hedging_policy(0.05, deadline=0.1)
+    hung = threading.Event()
+
+    with pytest.raises(LLMDeadlineExceeded):
+        policy.call(lambda: hung.wait(5), limiter=limiter)  # Hedged once, both abandoned
+    assert policy.totals["hedges"] == 1
+    assert limiter.stats()["active"] == 2
+
+    upstream = SlowThenFast(slow_seconds=0.1)
+    assert policy.call(upstream, limiter=limiter, deadline=1) == "slow"
+    assert policy.totals["hedges"] == 1
+
+    hung.set()
+    wait_until(lambda: limiter.stats()["active"] == 0)
+
+
+def test_deadline_bounds_queue_wait():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    policy = ResiliencePolicy(deadline=0.1)
+    limiter.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        policy.call(lambda: "never", limiter=limiter)
+    assert time.monotonic() - started < 1
+
+
+def test_async_hedge_wins_and_releases_slots():
+    limiter = ConcurrencyLimiter(max_concurrent=2)
+    policy = hedging_policy(0.05)
+    upstream = SlowThenFast()
+
+    async def main():
+        result = await policy.acall(upstream.acall, limiter=limiter)
+        await asyncio.sleep(0)  # Let the cancelled loser unwind
+        return result
+
+    assert asyncio.run(main()) == "fast"
+    assert policy.totals["hedge_wins"] == 1
+    assert limiter.stats()["active"] == 0
+
+
+class Throttled(Exception):
+    """Provider error carrying an HTTP status, like the OpenAI client's."""
+
+    status_code = 429
+
+
+class FailingTimes:
+    """Upstream that raises ``error`` for the first ``failures`` attempts."""
+
+    def __init__(self, failures: int, error: Exception):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def test_is_retryable_checks_status_code_and_cause():
+    botocore_error = Exception("boom")
+    botocore_error.response = {"Error": {"Code": "ThrottlingException"}}
+    wrapped = ValueError("Error raised by bedrock service")
+    wrapped.__cause__ = botocore_error
+
+    assert is_retryable(Throttled())
+    assert is_retryable(wrapped)
+    assert is_retryable(ValueError("Rate limit reached, try again"))
+    assert not is_retryable(ValueError("invalid prompt"))
+
+
+def test_retryable_errors_are_retried_and_counted():
+    policy = ResiliencePolicy(backoff_base=0.01)
+    upstream = FailingTimes(2, Throttled())
+
+    with track_llm_calls() as usage:
+        assert policy.call(upstream) == "ok"
+
+    assert upstream.calls == 3
+    assert policy.totals["retries"] == 2
+    assert usage.to_dict() == {"calls": 1, "attempts": 3, "retries": 2, "hedges": 0}
+
+
+def test_other_errors_are_not_retried():
+    policy = ResiliencePolicy(backoff_base=0.01)
+    upstream = FailingTimes(1, ValueError("invalid prompt"))
+
+    with pytest.raises(ValueError):
+        policy.call(upstream)
+    assert upstream.calls == 1
+
+
+def test_retries_stop_after_max_retries():
+    policy = ResiliencePolicy(max_retries=2, backoff_base=0.01)
+    upstream = FailingTimes(5, Throttled())
+
+    with pytest.raises(Throttled):
+        policy.call(upstream)
+    assert upstream.calls == 3
+
+
+def test_no_retry_when_backoff_would_pass_the_deadline():
+    policy = ResiliencePolicy(deadline=0.5, backoff_base=1.0)
+    upstream = FailingTimes(1, Throttled())
+
+    with pytest.raises(Throttled):
+        policy.call(upstream)
+    assert upstream.calls == 1
+
+
+def test_no_hedge_before_enough_latency_samples():
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=5)
+    policy._latencies.extend([0.01] * 4)
+    upstream = SlowThenFast(slow_seconds=0.1)
+
+    assert policy.call(upstream) == "slow"
+    assert policy.totals["hedges"] == 0
+    assert policy.stats()["hedge_after_ms"] is not None  # The fifth sample arms hedging
+
+
+def test_async_deadline_cancels_attempt_and_releases_slot():
+    limiter = ConcurrencyLimiter(max_concurrent=1)
+    policy = ResiliencePolicy(deadline=0.1)
+    cancelled = []
+
+    async def hang():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        with pytest.raises(LLMDeadlineExceeded):
+            await policy.acall(hang, limiter=limiter)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert cancelled == [True]
+    assert limiter.stats()["active"] == 0
+    assert policy.totals["deadline_exceeded"] == 1
+
+
+def test_async_deadline_bounds_queue_wait():
+    limiter = ConcurrencyLimiter(max_concurrent=1, queue_timeout=5)
+    policy = ResiliencePolicy(deadline=0.1)
+    limiter.acquire()
+
+    async def answer():
+        return "never"
+
+    started = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        asyncio.run(policy.acall(answer, limiter=limiter))
+    assert time.monotonic() - started < 1
+    assert limiter.stats()["queued"] == 0
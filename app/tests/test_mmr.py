@@ -0,0 +1,35 @@
+"""Tests for maximal marginal relevance selection."""
+
+import numpy as np
+
+from src.services.mmr import mmr_select
+
+QUERY = [1.0, 0.0]
+# A near-duplicate of the best match, and a less relevant but different doc
+BEST, DUPLICATE, DIFFERENT = [1.0, 0.0], [0.99, 0.01], [0.6, 0.8]
+
+
+def test_pure_relevance_keeps_similarity_order():
+    assert mmr_select(QUERY, [DIFFERENT, DUPLICATE, BEST], k=3, lambda_mult=1.0) == [2, 1, 0]
+
+
+def test_diversity_skips_near_duplicates():
+    assert mmr_select(QUERY, [BEST, DUPLICATE, DIFFERENT], k=2, lambda_mult=0.3) == [0, 2]
+
+
+def test_first_pick_is_most_relevant_whatever_lambda():
+    assert mmr_select(QUERY, [DIFFERENT, BEST], k=1, lambda_mult=0.0) == [1]
+
+
+def test_selects_each_candidate_once_when_k_exceeds_candidates():
+    embeddings = np.random.default_rng(0).normal(size=(6, 8))
+
+    selected = mmr_select(embeddings[0], list(embeddings), k=10)
+
+    assert sorted(selected) == list(range(6))
+
+
+def test_empty_inputs_and_zero_vectors():
+    assert mmr_select(QUERY, [], k=3) == []
+    assert mmr_select(QUERY, [BEST], k=0) == []
+    assert sorted(mmr_select(QUERY, [[0.0, 0.0], BEST], k=2)) == [0, 1]
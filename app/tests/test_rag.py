@@ -0,0 +1,156 @@
+"""Tests for RAG retrieval and batch queries."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import ChromaClientType
+from src.services.answer_cache import AnswerCache
+from src.services.rag import RAGService
+from src.services.source_matcher import SourceMatcher
+from src.services.vector_store import VectorStore
+
+
+class FlakyLLM:
+    """Answers every prompt except those asking about crashes."""
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        if "Question: why does it crash?" in prompt:
+            raise RuntimeError("upstream failed")
+        return "an answer"
+
+    async def ainvoke(self, prompt: str, **kwargs) -> str:
+        return self.invoke(prompt)
+
+
+@pytest.fixture
+def rag(vector_store: VectorStore) -> RAGService:
+    vector_store.add_documents(
+        ["the app crashes on login", "transfers are fast"],
+        [{"app_name": "Alpha", "category": "Finance"}] * 2,
+        ids=["1", "2"],
+    )
+    return RAGService(FlakyLLM(), vector_store, threshold=2.0)
+
+
+QUESTIONS = ["why does it crash?", "are transfers fast?"]
+
+
+def test_query_many_reports_failed_question_and_answers_the_rest(rag: RAGService):
+    results = rag.query_many(QUESTIONS, filter_by_source=False)
+
+    assert results[0] == {"index": 0, "question": QUESTIONS[0], "error": "upstream failed"}
+    assert results[1]["answer"] == "an answer"
+
+
+def test_aquery_many_reports_failed_question_and_answers_the_rest(rag: RAGService):
+    async def collect() -> list[dict]:
+        return [result async for result in rag.aquery_many(QUESTIONS, filter_by_source=False)]
+
+    results = sorted(asyncio.run(collect()), key=lambda r: r["index"])
+
+    assert results[0] == {"index": 0, "question": QUESTIONS[0], "error": "upstream failed"}
+    assert results[1]["answer"] == "an answer"
+
+
+class RecordingReranker:
+    """Keeps candidates in reverse order and records each call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def rerank(self, question: str, docs: list[dict], top_k: int) -> list[dict]:
+        self.calls += 1
+        return list(reversed(docs))[:top_k]
+
+
+def test_aquery_refines_when_fetch_k_equals_top_k(vector_store: VectorStore):
+    vector_store.add_documents(["transfers are fast", "transfers are slow"], [{"app_name": "Alpha"}] * 2, ids=["1", "2"])
+    reranker = RecordingReranker()
+    rag = RAGService(FlakyLLM(), vector_store, top_k=2, threshold=2.0, fetch_k=2, reranker=reranker)
+
+    rag.query("are transfers fast?", filter_by_source=False)
+    result = asyncio.run(rag.aquery("are transfers fast?", filter_by_source=False))
+
+    assert reranker.calls == 2
+    assert "rerank_ms" in result["timings"]
+
+
+class PickingLLM(FlakyLLM):
+    """Picks the first app offered for source selection."""
+
+    def invoke_structured(self, prompt: str, **kwargs) -> list[str]:
+        return ["Wallet - Pay"]
+
+    async def ainvoke_structured(self, prompt: str, **kwargs) -> list[str]:
+        return self.invoke_structured(prompt)
+
+
+def test_ambiguous_match_keeps_matched_categories(vector_store: VectorStore):
+    vector_store.add_documents(
+        ["pay fees", "budget fees", "bank fees"],
+        [
+            {"app_name": "Wallet - Pay", "category": "Shopping"},
+            {"app_name": "Wallet - Budget", "category": "Shopping"},
+            {"app_name": "Bank", "category": "Finance"},
+        ],
+        ids=["1", "2", "3"],
+    )
+    rag = RAGService(PickingLLM(), vector_store, source_matcher=SourceMatcher())
+    question = "wallet fees compared to finance apps"
+    expected = (
+        ["Wallet - Pay", "Finance"],
+        {"$or": [{"app_name": {"$in": ["Wallet - Pay"]}}, {"category": {"$in": ["Finance"]}}]},
+    )
+    app_names = vector_store.get_all_metadata_values("app_name")
+    categories = vector_store.get_all_metadata_values("category")
+
+    assert rag._select_batch_sources(question, app_names, categories) == expected
+    assert asyncio.run(rag._aselect_batch_sources(question, app_names, categories)) == expected
+    selected, where, _ = rag._select_sources_and_retrieve(question, {})
+    assert (selected, where) == expected
+
+
+class DecliningLLM(FlakyLLM):
+    """Selects no source and records the apps it was offered."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke_structured(self, prompt: str, **kwargs) -> list[str]:
+        self.prompts.append(prompt)
+        return ["none"]
+
+
+@pytest.mark.parametrize("question", ["why does the stream keep buffering?", "apps with a black screen on launch"])
+def test_typo_match_is_confirmed_by_the_llm(vector_store: VectorStore, question: str):
+    vector_store.add_documents(
+        ["store keeps buffering", "black screen on launch"],
+        [{"app_name": "Steam", "category": "Games"}, {"app_name": "Slack", "category": "Business"}],
+        ids=["1", "2"],
+    )
+    llm = DecliningLLM()
+    rag = RAGService(llm, vector_store, source_matcher=SourceMatcher())
+
+    selected, where, _ = rag._select_sources_and_retrieve(question, {})
+
+    assert (selected, where) == ([], None)
+    assert len(llm.prompts) == 1
+
+
+def test_answer_cache_misses_after_another_process_writes(tmp_path: Path, vector_store: VectorStore):
+    vector_store.add_documents(["transfers are fast"], [{"app_name": "Alpha"}], ids=["1"])
+    reader = VectorStore(
+        client_type=ChromaClientType.PERSISTENT,
+        collection_name="test-reviews",
+        persist_path=tmp_path / "chroma",
+        version_refresh_seconds=0,
+    )
+    rag = RAGService(FlakyLLM(), reader, threshold=2.0, answer_cache=AnswerCache(similarity_threshold=None))
+    assert rag.query("are transfers fast?", filter_by_source=False).get("cache_hit") is None
+    assert rag.query("are transfers fast?", filter_by_source=False)["cache_hit"] == "exact"
+
+    vector_store.add_documents(["transfers are slow"], [{"app_name": "Alpha"}], ids=["2"])
+
+    assert rag.query("are transfers fast?", filter_by_source=False).get("cache_hit") is None
@@ -0,0 +1,14 @@
+"""Tests for the re-rankers."""
+
+import pytest
+
+from src.services.reranker import Reranker
+
+
+def test_reranker_without_score_batch_fails_on_creation():
+    class Unfinished(Reranker):
+        name = "unfinished"
+
+    with pytest.raises(TypeError, match="score_batch"):
+        Unfinished()
+
@@ -0,0 +1,49 @@
+"""Tests for local source matching."""
+
+import pytest
+
+from src.services.source_matcher import SourceMatcher
+
+
+@pytest.fixture
+def matcher() -> SourceMatcher:
+    matcher = SourceMatcher(aliases={"gcal": "Google Calendar"})
+    matcher.refresh({"Steam", "Slack", "Google Calendar", "Wallet - Pay", "Wallet - Budget"}, {"Finance"})
+    return matcher
+
+
+def test_exact_names_aliases_and_categories_resolve(matcher: SourceMatcher):
+    match = matcher.match("Does Slack sync with gcal better than finance apps?")
+
+    assert match["apps"] == ["Google Calendar", "Slack"]
+    assert match["categories"] == ["Finance"]
+    assert not match["ambiguous"]
+
+
+@pytest.mark.parametrize(
+    "question, candidate",
+    [
+        ("why does the stream keep buffering?", "Steam"),
+        ("apps with a black screen on launch", "Slack"),
+    ],
+)
+def test_typo_match_is_only_a_candidate(matcher: SourceMatcher, question: str, candidate: str):
+    match = matcher.match(question)
+
+    assert match["apps"] == []
+    assert match["ambiguous"]
+    assert match["candidates"] == [candidate]
+
+
+def test_typo_match_keeps_exact_matches(matcher: SourceMatcher):
+    match = matcher.match("is Slack faster than Stean?")
+
+    assert match["apps"] == ["Slack"]
+    assert match["candidates"] == ["Steam"]
+
+
+def test_shared_short_name_is_ambiguous(matcher: SourceMatcher):
+    match = matcher.match("wallet fees")
+
+    assert match["ambiguous"]
+    assert match["candidates"] == ["Wallet - Budget", "Wallet - Pay"]
@@ -0,0 +1,133 @@
+"""Tests for the vector store's write token and write sessions."""
+
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import ChromaClientType
+from src.services.exact_search import ExactSearch
+from src.services.vector_store import WRITE_TOKEN_KEY, VectorStore
+
+pytestmark = pytest.mark.usefixtures("offline_embeddings")
+
+
+def open_store(tmp_path: Path, **kwargs) -> VectorStore:
+    """A store over the shared temp collection with its own persisted facet index."""
+    return VectorStore(
+        client_type=ChromaClientType.PERSISTENT,
+        collection_name="test-reviews",
+        persist_path=tmp_path / "chroma",
+        facet_fields=["app_name"],
+        facet_index_path=tmp_path / "facets.json",
+        **kwargs,
+    )
+
+
+def count_modifies(store: VectorStore, monkeypatch: pytest.MonkeyPatch) -> list[dict]:
+    """Record every collection metadata write."""
+    calls = []
+    modify = store.collection.modify
+
+    def recording_modify(**kwargs):
+        calls.append(kwargs)
+        return modify(**kwargs)
+
+    monkeypatch.setattr(store.collection, "modify", recording_modify)
+    return calls
+
+
+def test_write_session_replaces_the_token_at_start_and_end(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    store = open_store(tmp_path)
+    store.load_indexes()
+    modifies = count_modifies(store, monkeypatch)
+
+    with store.write_session():
+        store.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+        store.upsert_documents(["fast login"], [{"app_name": "B"}], ids=["1"])
+        store.add_documents(["great charts"], [{"app_name": "A"}], ids=["2"])
+        store.delete_documents(["2"])
+
+    assert len(modifies) == 2
+    # Persisted at the end of the session, and current
+    reader = open_store(tmp_path)
+    monkeypatch.setattr(reader.facets, "build", lambda collection: pytest.fail("index rebuilt"))
+    assert reader.get_metadata_counts("app_name") == {"B": 1}
+
+
+def test_writes_outside_a_session_each_replace_the_token(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    store = open_store(tmp_path)
+    modifies = count_modifies(store, monkeypatch)
+
+    store.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    store.upsert_documents(["fast login"], [{"app_name": "B"}], ids=["1"])
+
+    assert len(modifies) == 2
+
+
+def test_index_is_stale_after_a_session_cut_short(tmp_path: Path):
+    store = open_store(tmp_path)
+    store.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    store.load_indexes()
+
+    session = store.write_session()
+    session.__enter__()  # The process dies before the session ends
+    store.upsert_documents(["slow login"], [{"app_name": "B"}], ids=["1"])
+
+    assert open_store(tmp_path).get_metadata_counts("app_name") == {"B": 1}
+
+
+def test_write_token_keeps_other_collection_metadata(tmp_path: Path):
+    store = open_store(tmp_path)
+    store.collection.modify(metadata={"owner": "reviews-team"})
+    store.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    store.add_documents(["fast payments"], [{"app_name": "A"}], ids=["2"])
+
+    metadata = store.client.get_collection("test-reviews").metadata
+    assert metadata["owner"] == "reviews-team"
+    assert WRITE_TOKEN_KEY in metadata
+
+
+def test_collection_stays_cosine_after_token_writes(tmp_path: Path):
+    store = open_store(tmp_path)
+    store.clear()
+    store.add_documents(["slow login", "fast payments"], [{"app_name": "A"}] * 2, ids=["1", "2"])
+
+    assert store.client.get_collection("test-reviews").configuration["hnsw"]["space"] == "cosine"
+    assert store.query("slow login", threshold=2.0)[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_data_version_follows_writes_by_another_process(tmp_path: Path):
+    reader = open_store(tmp_path, version_refresh_seconds=0)
+    writer = open_store(tmp_path)
+    before = reader.data_version()
+
+    writer.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    assert reader.data_version() != before
+
+    # Seen again once the session ends, even though it rotated before its writes
+    with writer.write_session():
+        writer.add_documents(["fast login"], [{"app_name": "A"}], ids=["2"])
+        during = reader.data_version()
+        writer.add_documents(["great charts"], [{"app_name": "A"}], ids=["3"])
+    assert reader.data_version() != during
+
+
+def test_data_version_rereads_the_token_only_after_the_refresh_interval(tmp_path: Path):
+    reader = open_store(tmp_path, version_refresh_seconds=3600)
+    before = reader.data_version()
+
+    open_store(tmp_path).add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+
+    assert reader.data_version() == before
+
+
+def test_exact_search_reloads_candidates_after_another_process_writes(tmp_path: Path):
+    reader = open_store(tmp_path, version_refresh_seconds=0, exact_search=ExactSearch())
+    writer = open_store(tmp_path)
+    writer.add_documents(["slow login"], [{"app_name": "A"}], ids=["1"])
+    assert [r["id"] for r in reader.query("slow login", threshold=2.0, where={"app_name": "A"})] == ["1"]
+
+    writer.add_documents(["slow login again"], [{"app_name": "A"}], ids=["2"])
+
+    results = reader.query("slow login", threshold=2.0, where={"app_name": "A"})
+    assert sorted(r["id"] for r in results) == ["1", "2"]